@@ -2,26 +2,80 @@ from measurement import Measurement
 from model import Model
 #from response_surface import response_surface
 from solution import Solution
+from response_stack import ResponseStack
+from surface_store import ResponseSurfaceStore
+from registry import MeasurementRegistry
+from sampling import parameter_samples,StreamingStatistics
+from impact import ImpactMatrix
+from parameter_table import as_parameter_table
+from solvers import solvers
+import parallel
+import archive
 
 import numpy as np
+import os
 import copy
 import math
+import time
+import traceback
 import matplotlib
 import matplotlib.pyplot as plt
 
 def load_project(name='project'):
-    """Loads a Project from a pickled representation on disk.
+    """Loads a Project from disk.
     
-    :param name: The name of the project to be loaded. This function will load the project from <name>.save
+    :param name: The name of the project to be loaded. This function will open the project archive <name>.mumpce, or load the pickled project from <name>.save if there is no archive or if the pickle is newer. See :py:func:`Project.save`
     
     """
     import pickle
+    archive_name = name + archive.ARCHIVE_EXTENSION
     filename = name + '.save'
+    if os.path.isdir(archive_name):
+        if not os.path.isfile(filename) or os.path.getmtime(archive_name) >= os.path.getmtime(filename):
+            return archive.load_archive(archive_name)
     with open(filename,'rb') as f:
         pj = pickle.load(f)
     
     return pj
 
+#: The fields of the structured array returned by :py:func:`Project.validation_table`
+validation_dtype = np.dtype([('name',object),
+                             ('status',object),
+                             ('value',float),
+                             ('uncertainty',float),
+                             ('optimized_value',float),
+                             ('optimized_uncertainty',float),
+                             ('model_value',float),
+                             ('model_uncertainty',float),
+                             ('consistency',float),
+                             ('weighted_consistency',float),
+                            ])
+
+def format_validation_table(table):
+    """Formats the table from :py:func:`Project.validation_table` as text, one line per measurement. Values and uncertainties that are not defined are printed as 0.
+    
+    :param table: The table
+    :type table: ndarray, structured
+    :returns: output
+    :rtype: str
+    """
+    header_args = ('Name',
+                   'Value','Unc',
+                   'OptVal','OptUnc',
+                   'MdlVal','MdlUnc'
+                  )
+    lines = ['','{:20s}  {:6s} {:6s} {:6s} {:6s} {:6s} {:6s}'.format(*header_args)]
+    
+    values = np.nan_to_num(table['value'])
+    uncertainties = np.nan_to_num(table['uncertainty'])
+    for row,print_value,print_unc in zip(table,values,uncertainties):
+        print_args = (row['name'],
+                      float(print_value),float(print_unc),
+                      float(row['optimized_value']),float(row['optimized_uncertainty']),
+                      float(row['model_value']),float(row['model_uncertainty'])
+                     )
+        lines += ['{:20s}: {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} '.format(*print_args)]
+    return '\n'.join(lines)
 
 class Project(object):
     """This is the top level Project class for the MUM-PCE code. 
@@ -82,10 +136,10 @@ class Project(object):
         if measurement_list is None:
             self.measurement_list = []
         
-        #: The list of model parameter information. If the measurement list exists when the Project is instantiated, Project will retrive this information from the first measurement.
+        #: The :py:class:`.ParameterTable` of model parameter information. If the measurement list exists when the Project is instantiated, Project will retrive this information from the first measurement.
         self.model_parameter_info = None
         if measurement_list is not None:
-            self.model_parameter_info = np.array(self.measurement_list[0].model.model_parameter_info)
+            self.model_parameter_info = as_parameter_table(self.measurement_list[0].model.model_parameter_info)
         
         #Inconsistent measurements will be removed from the measurement list and added to this list 
         self.removed_list = []
@@ -129,8 +183,21 @@ class Project(object):
         #: The solution object generated by optimization and uncertainty constraint. Normally not defined at project creation.
         self.solution = solution
         
+        #Compiled response surface stacks, rebuilt on demand by _response_stack
+        self._stacks = {}
+        
+        #The index of the measurements in all of the lists, see _get_registry
+        self._registry = MeasurementRegistry()
+        
         return
     
+    def __getstate__(self):
+        #The compiled response surface stacks, the registry and the impact matrix can be rebuilt from the measurements, so do not save them
+        state = self.__dict__.copy()
+        for name in ('_stacks','_registry','_impacts'):
+            state.pop(name,None)
+        return state
+    
     def __str__(self):
         project_str = self.name + '\n'
         
@@ -147,20 +214,75 @@ class Project(object):
         
         return project_str + measurement_str + solution_str
     
+    def _measurement_lists(self):
+        return [getattr(self,list_name,None) for list_name in MeasurementRegistry.list_names]
+    
+    def _get_registry(self):
+        """Returns the :py:class:`.MeasurementRegistry` of this project, rebuilding it if the lists have been changed outside of the Project's methods
+        """
+        #Projects saved before the registry existed will not have this attribute
+        registry = getattr(self,'_registry',None)
+        if registry is None:
+            registry = self._registry = MeasurementRegistry()
+        lists = self._measurement_lists()
+        if not registry.is_current(lists):
+            registry.rebuild(lists)
+        return registry
+    
+    def _move_measurement(self,meas,new_list,old_list=None,old_index=None):
+        """Records in the registry that meas was appended to the list self.<new_list>, after being taken from position old_index of the list self.<old_list>
+        """
+        list_names = MeasurementRegistry.list_names
+        old_number = None
+        if old_list is not None:
+            old_number = list_names.index(old_list)
+        self._registry.move(meas,self._measurement_lists(),list_names.index(new_list),old_number,old_index)
+        return
+    
     @property
     def items(self):
-        items = []
-        for meas_list in [self.measurement_list,self.application_list,self.removed_list,self.low_information]:
-            if meas_list is not None:
-                items += meas_list
-        return items
+        """All of the measurements in the measurement list, application list, removed list and low information list, in that order. This list is kept by the Project and must not be changed"""
+        return self._get_registry().items
     
     @property
     def names(self):
-        names = {}
-        for item in self.items:
-            names[item.name] = item
-        return names
+        """A map from each measurement's name to the measurement. This dict is kept by the Project and must not be changed"""
+        return self._get_registry().names
+    
+    def select(self,status=None,model_type=None,**ranges):
+        """Finds the measurements that meet all of the given criteria
+        
+        For example, to find the active measurements whose model is a flame speed model and whose initial temperature is between 300 K and 400 K::
+           
+           my_project.select(status='Active',model_type='FlameSpeed',T=(300,400))
+        
+        :key status: If not None, only measurements with this status ('Active', 'Application', 'Inconsistent' or 'Low Information') are returned
+        :key model_type: If not None, only measurements whose model class has this name are returned
+        :key ranges: For each experimental condition reported by :py:func:`.Model.conditions`, such as T or P, a (low,high) pair. Either limit can be None
+        :type status: str
+        :type model_type: str
+        :returns: The measurements, in the order of :py:attr:`items`
+        :rtype: list of :py:class:`.Measurement`
+        """
+        registry = self._get_registry()
+        selected = None
+        candidates = []
+        if status is not None:
+            candidates += [registry.with_status(status)]
+        if model_type is not None:
+            candidates += [registry.of_type(model_type)]
+        for condition,(low,high) in ranges.items():
+            candidates += [registry.in_range(condition,low,high)]
+        
+        for candidate in candidates:
+            ids = set([id(meas) for meas in candidate])
+            if selected is None:
+                selected = ids
+            else:
+                selected &= ids
+        if selected is None:
+            return list(registry.items)
+        return [meas for meas in registry.items if id(meas) in selected]
     
     @property
     def active(self):
@@ -185,40 +307,48 @@ class Project(object):
         return #items[x]
     
     def __setitem__(self,key,newmeas):
-        if type(newmeas) is mumpce.measurement:
+        if isinstance(newmeas,Measurement):
             try:
                 self.measurement_list[key] = newmeas
             except IndexError:
                 self.application_list[key - len(self.measurement_list)] = newmeas
+            #The lists have the same lengths, so the registry must be told to rebuild
+            self._get_registry().rebuild(self._measurement_lists())
         else:
-            raise(ValueError,'Cannot replace measurement with non-measurement')
+            raise ValueError('Cannot replace measurement with non-measurement')
         return
     
     def __add__(self,newmeas):
         self._add_measurement(newmeas)
     
     def _add_measurement(self,newmeas):
-        if type(newmeas) is mumpce.measurement:
+        if isinstance(newmeas,Measurement):
+            self._get_registry()
             self.measurement_list += [newmeas]
+            self._move_measurement(newmeas,'measurement_list')
         else:
-            raise(ValueError,'Cannot add non-measurement to measurement list')
+            raise ValueError('Cannot add non-measurement to measurement list')
     
     def add_application(self,newmeas):
-        if type(newmeas) is mumpce.measurement:
+        if isinstance(newmeas,Measurement):
+            self._get_registry()
+            newmeas._status = 'Application'
             self.application_list += [newmeas]
+            self._move_measurement(newmeas,'application_list')
         else:
-            raise(ValueError,'Cannot add non-measurement to application list')        
+            raise ValueError('Cannot add non-measurement to application list')
     
     def __iter__(self):
         return iter(self.items)
         
-    def save(self,project_name=None,save_meas=False):
-        """Pickles the project and saves the pickled representation to a binary file.
+    def save(self,project_name=None,save_meas=False,archive_format=False):
+        """Saves the project to disk.
         
-        This function will use the :py:module:`pickle` module to save the project's current state, including all measurements and project metadata.
+        This function will use the :py:module:`pickle` module to save the project's current state, including all measurements and project metadata. If archive_format is True, the project is instead saved as a project archive, see :py:mod:`archive`. The archive stores the project metadata, the :py:class:`.Solution` arrays, the arrays of each measurement, and the model of each measurement in separate files, so that :py:func:`load_project` can open the project without reading every measurement.
         
-        :key project_name: The name of the project. If not None, the project will be saved to <project_name>.save, otherwise <self.name>.save.
+        :key project_name: The name of the project. If not None, the project will be saved to <project_name>.save (or <project_name>.mumpce), otherwise <self.name>.save (or <self.name>.mumpce).
         :key save_meas: Whether to save the measurements individually. If True, calls :py:func:`save_meas`.
+        :key archive_format: Whether to save a project archive rather than a pickled representation of the project. Default False
         """
         
         import pickle
@@ -229,13 +359,17 @@ class Project(object):
         else:
             name = self.name
         
-        filename = name + '.save'
-        
-        for meas in self:
-            meas.prepare_for_save()
-        
-        with open(filename,'wb') as f:
-            pickle.dump(self,f)
+        if archive_format:
+            #Only the models that have been used since the project was opened are prepared and written
+            archive.save_archive(self,name + archive.ARCHIVE_EXTENSION)
+        else:
+            filename = name + '.save'
+            
+            for meas in self:
+                meas.prepare_for_save()
+            
+            with open(filename,'wb') as f:
+                pickle.dump(self,f)
         
         print('Project ' + name +' saved successfully')
         
@@ -257,13 +391,48 @@ class Project(object):
         for meas in self.measurement_list + self.application_list:
             meas.load()
     
-    def find_sensitivity(self):
+    def find_sensitivity(self,executor=None,max_workers=None,chunk_size=None):
         """For each measurement in the measurement and application lists, evaluates and stores the sensitivity 
+        
+        If either executor or max_workers is given, the sensitivity analyses are run in parallel. The parameters of each measurement are split into chunks of chunk_size, and the chunks of all of the measurements are submitted as separate tasks to the same executor, each with its own copy of the model. The results are put back together into each measurement's sensitivity_list in the original parameter order. A measurement for which any task failed is reported and left unchanged.
+        
+        :key executor: The executor that will run the tasks, such as a :py:class:`concurrent.futures.ProcessPoolExecutor`. If None and max_workers is given, a process pool is created for this call
+        :key max_workers: The number of worker processes to create if executor is None
+        :key chunk_size: The number of parameters in each task. If None, each measurement is one task
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :type max_workers: int
+        :type chunk_size: int
+        :returns: The names of the measurements that failed, with the error for each, or None if the measurements were run serially
+        :rtype: dict
         """
-        for meas in self.measurement_list + self.application_list:
-            print (meas.name)
-            meas.evaluate_sensitivity()
-        return
+        measurement_list = self.measurement_list + self.application_list
+        if executor is None and max_workers is None:
+            for meas in measurement_list:
+                print (meas.name)
+                meas.evaluate_sensitivity()
+            return
+        
+        #Erase the Cantera objects so that the measurements can be sent to the workers
+        task_list = []
+        task_ranges = []
+        for meas in measurement_list:
+            meas.prepare_for_save()
+            meas_tasks = meas.sensitivity_tasks(chunk_size=chunk_size)
+            task_ranges += [slice(len(task_list),len(task_list) + len(meas_tasks))]
+            task_list += meas_tasks
+        
+        results,errors = parallel.run_tasks(parallel.sensitivity_task,task_list,executor,max_workers)
+        
+        failed = {}
+        for meas,task_range in zip(measurement_list,task_ranges):
+            meas_results = results[task_range]
+            meas_errors = [error for error in errors[task_range] if error is not None]
+            if meas_errors:
+                print('{} sensitivity analysis failed:\n{}'.format(meas.name,meas_errors[0]))
+                failed[meas.name] = meas_errors[0]
+                continue
+            meas.set_sensitivity(meas_results)
+        return failed
     
     def set_active_parameters(self,active_parameters=None,active_parameter_uncertainties=None):
         """For each measurement in the measurement and application lists, sets the active parameter and parameter uncertainty lists to be the same as the Project's. 
@@ -299,16 +468,19 @@ class Project(object):
                 if parameter < meas.model.number_parameters: 
                     a_params += [parameter]
                     a_uncerts += [uncertainty]
-            meas.active_parameters = np.array(a_params)
+            meas.active_parameters = np.array(a_params,dtype=int)
             meas.parameter_uncertainties=np.array(a_uncerts)
+            meas._projection = None #The active parameters have changed, so the cached projection is invalid
         return
     
-    def find_active_parameters(self,sensitivity_cutoff):
+    def find_active_parameters(self,sensitivity_cutoff,screening=False,**kwargs):
         """Determines the active parameters for this project based on the sensitivities of the measurements to the model
         parameters, weighted by the uncertainty factors
         
         :param sensitivity_cutoff: The sensitivity cutoff :math:`S_c`
+        :key screening: If True, find the active parameters of each measurement by perturbing groups of parameters with :py:func:`.Measurement.screen_parameters` instead of from its full sensitivity list. Any other keyword arguments are passed to :py:func:`.Measurement.screen_parameters`
         :type sensitivity_cutoff: float
+        :type screening: bool
                 
         .. |br| raw:: html
            
@@ -317,36 +489,63 @@ class Project(object):
         |br| For each parameter :math:`i` and measurement :math:`r`, an impact factor :math:`I_{i,r}` is calculated as :math:`I_{i,r} = S_{i,r}  \ln(f_i)` where :math:`S_{i,r}` is the sensitivity of the rth measurement to the ith parameter and :math:`f_i` is the uncertainty factor of the ith parameter.
         
         Active parameters are those such that :math:`I_{i,r} > \max_i(I_{i,r}) S_c`, where :math:`S_c` is the sensitivity cutoff.
+        
+        Unless screening is used, the impact factors are taken from :func:`impact_matrix`, which is only built the first time, so that calling this method again with another cutoff takes very little time.
 
 
         """
-        #Create an empty array of the active parameters
-        self.active_parameters = np.array([],dtype=int)
-        for meas in self.measurement_list:
-            print (meas.name)
-            #Create the list of parameters for this measurement
-            all_parameters = np.arange(meas.model.number_parameters,dtype=int)
-            
-            #Check to see if the sensitivity list exists for this measurement
-            #If it does not exist, evaluate the sensi
-            if meas.sensitivity_list is None:
-                meas.evaluate_sensitivity()
-                
-            impact_factor_list = meas.sensitivity_list * np.log(self.parameter_uncertainties[:meas.model.number_parameters]    )
-            
-            #Get the sensitivities for this measurement
-            #computed_val,sensitivity_list = meas.model.sensitivity(perturbation=0.1,parameter_list=all_parameters)
-            
-            #Find the maximum sensitivity and determine the active parameters for this experiment
-            max_sens = abs(impact_factor_list).max()*sensitivity_cutoff
-            active_parameters_this = all_parameters[abs(impact_factor_list) > max_sens]
-            
-            self.active_parameters = np.union1d(self.active_parameters,active_parameters_this)
+        if screening:
+            #Create an empty array of the active parameters
+            self.active_parameters = np.array([],dtype=int)
+            for meas in self.measurement_list:
+                print (meas.name)
+                active_parameters_this,impact_factors = meas.screen_parameters(self.parameter_uncertainties,sensitivity_cutoff,**kwargs)
+                self.active_parameters = np.union1d(self.active_parameters,active_parameters_this)
+        else:
+            impacts = self.impact_matrix(min_ratio=min(sensitivity_cutoff,1.0e-3))
+            self.active_parameters = impacts.active_parameters(sensitivity_cutoff)
         self.active_parameter_uncertainties = self.parameter_uncertainties[self.active_parameters]
-    
-#    active_parameters_reactions += [active_paramters_this]
         return
     
+    def impact_matrix(self,min_ratio=1.0e-3):
+        """Returns the :py:class:`.ImpactMatrix` of the measurement list, from which :func:`find_active_parameters` finds the active parameters
+        
+        The matrix is built once and kept until the measurement list, the sensitivity list of any measurement, or the parameter uncertainties change, so that trying several cutoffs, or asking for the parameters with the largest impact on a measurement, does not repeat any work. Measurements that do not have a sensitivity list yet are evaluated first.
+        
+        :key min_ratio: The largest ratio of an impact factor to the largest impact factor of its measurement that is dropped from the matrix. A kept matrix built with a smaller min_ratio is also returned
+        :type min_ratio: float
+        :returns: impacts
+        :rtype: :py:class:`.ImpactMatrix`
+        """
+        impacts = getattr(self,'_impacts',None)
+        if impacts is None or not self._impact_inputs_unchanged(impacts[0]) or impacts[1].min_ratio > min_ratio:
+            for meas in self.measurement_list:
+                #Check to see if the sensitivity list exists for this measurement
+                #If it does not exist, evaluate the sensitivity
+                if meas.sensitivity_list is None:
+                    print (meas.name)
+                    meas.evaluate_sensitivity()
+            #Keep copies of the inputs, so that arrays that are changed in place are noticed
+            signature = (list(self.measurement_list),
+                         [np.array(meas.sensitivity_list,dtype=float) for meas in self.measurement_list],
+                         np.array(self.parameter_uncertainties,dtype=float))
+            impacts = self._impacts = (signature,ImpactMatrix(self.measurement_list,self.parameter_uncertainties,min_ratio))
+        return impacts[1]
+    
+    def _impact_inputs_unchanged(self,signature):
+        #Compares the measurements, sensitivities, and parameter uncertainties with the copies kept with the impact matrix
+        measurements,sensitivities,uncertainties = signature
+        if len(measurements) != len(self.measurement_list):
+            return False
+        if not np.array_equal(uncertainties,self.parameter_uncertainties):
+            return False
+        for meas,meas_kept,sensitivity in zip(self.measurement_list,measurements,sensitivities):
+            if meas is not meas_kept or meas.sensitivity_list is None:
+                return False
+            if not np.array_equal(sensitivity,meas.sensitivity_list):
+                return False
+        return True
+    
     def optimize_parameters(self):
         pass
     
@@ -357,7 +556,7 @@ class Project(object):
         :type filename: str
         """
         self.measurement_list = self.initialize_function(filename,self.model,**kwargs)
-        self.model_parameter_info = self.measurement_list[0].model.model_parameter_info
+        self.model_parameter_info = as_parameter_table(self.measurement_list[0].model.model_parameter_info)
         return
     
     def application_initialize(self,filename):
@@ -372,55 +571,194 @@ class Project(object):
         #self.model_parameter_info = self.measurement_list[0].model.model_parameter_info
         return
     
-    def make_response(self):
+    def make_response(self,executor=None,max_workers=None,by_point=True,resume=True):
         """Creates the response surface for each measurement. The exact behavior of this method depends on the :func:`make_response` method of the individual measurements.
+        
+        If either executor or max_workers is given, the response surfaces are built in parallel using the functions in :py:mod:`parallel`. By default, each response surface is split into the 2N+1 independent sensitivity analyses listed by :py:func:`.Measurement.response_points` (unless the measurement class has its own make_response method), and the analyses for all of the measurements are submitted to the same executor. A worker that finishes takes the next waiting analysis from any measurement, so one slow measurement does not leave the other workers idle. Each measurement's response surface is assembled as soon as all of its analyses are finished. If by_point is False, each measurement is instead a single task that runs :py:func:`.Measurement.make_response`.
+        
+        Each worker process builds its own Cantera Solution, and the response surfaces are copied back into the measurements. A measurement whose response surface could not be built is reported and left unchanged, and the other measurements are not affected.
+        
+        As in :py:func:`.Measurement.make_response`, each finished analysis is written to the measurement's checkpoint journal, and analyses already in the journal are not run again.
+        
+        :key executor: The executor that will run the tasks, such as a :py:class:`concurrent.futures.ProcessPoolExecutor`. If None and max_workers is given, a process pool is created for this call. If by_point is True, the executor must run its tasks in separate processes, because the tasks for one measurement each perturb their own copy of its model
+        :key max_workers: The number of worker processes to create if executor is None
+        :key by_point: Whether to split each response surface into one task per point
+        :key resume: Whether to reuse the analyses in each measurement's checkpoint journal
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :type max_workers: int
+        :type by_point: bool
+        :type resume: bool
+        :returns: The names of the measurements that failed, with the error for each, or None if the measurements were run serially
+        :rtype: dict
         """
-        for meas in self.measurement_list + self.application_list:
-            meas.make_response()
-        return
+        measurement_list = self.measurement_list + self.application_list
+        if executor is None and max_workers is None:
+            for meas in measurement_list:
+                meas.make_response(resume=resume)
+            return
+        
+        #Erase the Cantera objects so that the measurements can be sent to the workers
+        for meas in measurement_list:
+            meas.prepare_for_save()
+        
+        failed = {}
+        def report_failure(meas,error):
+            print('{} response surface failed:\n{}'.format(meas.name,error))
+            failed[meas.name] = error
+        
+        if not by_point:
+            task_list = [(meas,resume) for meas in measurement_list]
+            responses,errors = parallel.run_tasks(parallel.make_response_task,task_list,executor,max_workers)
+            for meas,response,error in zip(measurement_list,responses,errors):
+                if error is not None:
+                    report_failure(meas,error)
+                    continue
+                meas.response = response
+            return failed
+        
+        #Measurements that build their response surfaces in their own way, such as RxnMeasurement, are run as a single task
+        by_point_list = [type(meas).make_response is Measurement.make_response for meas in measurement_list]
+        
+        #Read the checkpoint journals and list the analyses that still need to be run
+        journals = []
+        completed_list = []
+        pending_list = []
+        task_groups = []
+        for meas,meas_by_point in zip(measurement_list,by_point_list):
+            if not meas_by_point:
+                journals += [None]
+                completed_list += [None]
+                pending_list += [None]
+                task_groups += [[(parallel.make_response_task,(meas,resume))]]
+                continue
+            try:
+                journal = meas.response_journal()
+                completed = journal.start(resume)
+                pending = [point for point in meas.response_points() if point not in completed]
+            except Exception:
+                #Leave this measurement out and carry on with the others
+                report_failure(meas,traceback.format_exc())
+                journal,completed,pending = None,None,None
+            journals += [journal]
+            completed_list += [completed]
+            pending_list += [pending]
+            if journal is None:
+                task_groups += [[]]
+            else:
+                task_groups += [[(parallel.response_point_task,(meas,) + point) for point in pending]]
+        
+        def point_done(meas_number,task_num,result):
+            if by_point_list[meas_number]:
+                point = pending_list[meas_number][task_num]
+                completed_list[meas_number][point] = result
+                journals[meas_number].append(point,*result)
+        
+        def measurement_done(meas_number,results,errors):
+            meas = measurement_list[meas_number]
+            meas_errors = [error for error in errors if error is not None]
+            if meas_errors:
+                report_failure(meas,meas_errors[0])
+                return
+            if meas.name in failed:
+                return
+            if not by_point_list[meas_number]:
+                meas.response = results[0]
+                return
+            try:
+                completed = completed_list[meas_number]
+                meas.set_response_points([completed[point] for point in meas.response_points()])
+            except Exception:
+                report_failure(meas,traceback.format_exc())
+        
+        parallel.run_task_groups(task_groups,measurement_done,executor,max_workers,task_done=point_done)
+        return failed
     
-    def _obj_fun(self,x):
+    def store_responses(self,path=None):
+        """Moves the response surfaces of every measurement into a memory-mapped :py:class:`.ResponseSurfaceStore`
+        
+        Each measurement's response surface is replaced by a :py:class:`.StoredResponseSurface` that reads its terms from the store. Use this for projects whose response surfaces take up too much memory: :py:func:`run_optimization`, :py:func:`validate_solution` and :py:func:`calculate_entropy` will then read the second order terms from disk in blocks. A response surface that is made after this call is held in memory again, so the store should be made again after :py:func:`make_response`.
+        
+        :key path: The store directory. If None, the store is written to <self.name>.responses
+        :type path: str
+        :returns: store
+        :rtype: :py:class:`.ResponseSurfaceStore`
+        """
+        if path is None:
+            path = self.name + '.responses'
+        
+        measurements = [meas for meas in self.items if meas.response is not None]
+        store = ResponseSurfaceStore.create(path,[meas.response for meas in measurements])
+        for row,meas in enumerate(measurements):
+            meas.response = store.surface(row)
+        
+        #The stacks hold the old response surfaces
+        self._stacks = {}
+        return store
+    
+    def _response_stack(self,measurement_list,stack_name='measurements'):
+        """Returns the compiled :py:class:`.ResponseStack` for a list of measurements.
+        
+        The stack is cached under stack_name and is only rebuilt when the measurements in the list, the contents of their response surfaces, or the active parameters have changed since it was built. The measured values and uncertainties are read again every time, since they can be changed without changing the response surfaces.
+        
+        :param measurement_list: The measurements whose response surfaces will be stacked
+        :key stack_name: The name under which the stack is cached
+        :type measurement_list: list of measurement objects
+        :type stack_name: str
+        :returns: stack
+        :rtype: :py:class:`.ResponseStack`
+        """
+        #Projects pickled before the stacks existed will not have this attribute
+        stacks = getattr(self,'_stacks',None)
+        if stacks is None:
+            stacks = self._stacks = {}
+        
+        stack = stacks.get(stack_name)
+        if stack is None or not stack.is_current(measurement_list,self.active_parameters):
+            stack = ResponseStack(measurement_list,self.active_parameters)
+            stacks[stack_name] = stack
+        else:
+            stack.read_measurements()
+        return stack
+    
+    def _obj_fun(self,x,stack=None):
         num_params = self.active_parameters.shape[0]
-        num_expts = len(self.measurement_list)
+        
+        if stack is None:
+            stack = self._response_stack(self.measurement_list)
+        num_expts = stack.num_expts
         
         f = np.empty(num_params + num_expts)
         df = np.zeros((num_params + num_expts,num_params))
         
-        inv_covar = self.solution.alpha_i
+        #The square root of the prior precision matrix
+        sqrt_precision = self.solution.alpha_i
         initial_guess = self.solution.x_i
         
-        full_shape = self.active_parameters[-1] + 1
-        x_full = np.zeros(full_shape) #Make a full x that has placeholder values for all parameters
-        x_full[self.active_parameters] = x #Put the active x values into x_full
-
         #Set the parts of the objective function that depend on x
-        f[0:num_params] = np.dot(inv_covar,(x - initial_guess))
-        df[0:num_params,0:num_params] = inv_covar
-        for exp_num,meas in enumerate(self.measurement_list):
-
-            df_num = np.zeros(full_shape) #Full derivative vector
-            
-            x_in = x_full[meas.active_parameters] #Pass an x to the 
-            
-            f_num,df_num[meas.active_parameters] = meas.sensitivity_response(x_in)
-            
-            f_exp = meas.value
-            w = 1/meas.uncertainty
-            
-            f[exp_num + num_params] = (f_num - f_exp)*w
-            df[exp_num + num_params,:] = df_num[self.active_parameters]*w
+        f[0:num_params] = np.dot(sqrt_precision,(x - initial_guess))
+        df[0:num_params,0:num_params] = sqrt_precision
+        
+        #Evaluate all of the response surfaces at once
+        f[num_params:],df[num_params:,:] = stack.residuals(x)
                 
         return f,df
-    def run_optimization(self,initial_guess=None,initial_covariance=None):
+    def run_optimization(self,initial_guess=None,initial_covariance=None,solver='auto'):
         """Finds the constrained model and its uncertainty and creates the :py:func:`.Solution` object.
         
         :param initial_guess: The prior parameter values. If not specified, the default is the zero vector
-        :param initial_covariance: The prior parameter covariance. If not specified, the default is :math:`I/4`, where I is the identity matrix
+        :param initial_covariance: The prior parameter covariance, either a matrix, a vector of variances for a diagonal prior, or a list of diagonal blocks as described in :py:func:`.prior_factor`. If not specified, the default is :math:`I/4`, where I is the identity matrix
+        :key solver: The solver used to find the optimum. Either a function with the call signature described in :py:mod:`solvers` or the name of one of the following:
+        
+           * 'auto': Use 'linear' if all second order terms are negligible and 'newton' otherwise, falling back to 'lm' if 'newton' does not converge (default)
+           * 'linear': A single linear least-squares solve, exact for linear response surfaces
+           * 'newton': A trust-region Newton method using the analytic Hessian of the response surfaces
+           * 'lm': The Levenberg-Marquardt algorithm
         :type inital_guess: numpy.ndarray,  len(self.active_parameters)
-        :type initial_covariance: numpy.ndarray, len(self.active_parameters) x len(self.active_parameters) 
+        :type initial_covariance: numpy.ndarray, len(self.active_parameters) x len(self.active_parameters), numpy.ndarray, len(self.active_parameters), or list
+        :type solver: str or function
         
         
-        This function finds the optimal set of model parameters based on the experimental measurements and uncertainties provided in the measurement list. It uses the Levenberg-Marquardt algorithm to solve the optimization problem:
+        This function finds the optimal set of model parameters based on the experimental measurements and uncertainties provided in the measurement list. It solves the optimization problem:
         
         .. math::
             
@@ -443,13 +781,15 @@ class Project(object):
         * :math:`\Sigma_{\\text{init}}` is the prior parameter covariance matrix
         
         
+        
+        The solver name, number of iterations, and time taken are stored in the :py:class:`.Solution`.
+        
         """
         #def run_optimization(initial_guess,measurement_list):
         
         #Create a local pointer to the measurement list
         measurement_list = self.measurement_list
         
-        from scipy import optimize as spopt
         print (self.active_parameters.shape)
         num_params = self.active_parameters.shape[0]#initial_guess.shape[0]
         num_expts = len(self.measurement_list)
@@ -460,22 +800,18 @@ class Project(object):
             assert initial_guess.shape[0] == num_params
         else:
             initial_guess = np.zeros(num_params)
-        if initial_covariance is not None:
-            assert initial_covariance.shape[0] == num_params
-            #Compute the inverse covariance matrix
-            inv_covar = np.linalg.inv(initial_covariance)
-        else:
-            inv_covar = 4*np.eye(num_params)
+        if initial_covariance is None:
+            initial_covariance = 0.25*np.ones(num_params)
         
         #f = np.zeros(num_params + num_expts)
         #df = np.zeros((num_params + num_expts,num_params))
         
-        #Store the initial guess and initial inverse covariance in a Solution object
+        #Store the initial guess and the square root of the initial inverse covariance in a Solution object
         #This will make it available to the obj_fun routine
         self.solution = Solution(initial_guess,
-                                 covariance_x=inv_covar,
                                  initial_x=initial_guess,
-                                 initial_covariance=inv_covar)
+                                 initial_covariance=initial_covariance)
+        assert self.solution.alpha_i.shape[0] == num_params
         
         #def obj_fun(x):
         #    #Set the parts of the objective function that depend on x
@@ -493,25 +829,35 @@ class Project(object):
         #        df[exp_num + num_params,:] = df_num*w
         #        
         #    return f,df
-        opt_output = spopt.root(self._obj_fun,initial_guess,method='lm',jac=True)
+        #Compile the response surfaces once so that every iteration is a few batched array operations
+        stack = self._response_stack(measurement_list)
+        
+        if callable(solver):
+            solver_function = solver
+            solver_name = getattr(solver,'__name__',str(solver))
+        else:
+            solver_function = solvers[solver]
+            solver_name = solver
+        
+        time_start = time.time()
+        opt_output = solver_function(lambda x: self._obj_fun(x,stack),initial_guess,stack)
+        solve_time = time.time() - time_start
         #solution = spopt.root(obj_fun,initial_guess,method='lm')
         
         print (opt_output.message)
         
         optimal_parameters = np.array(opt_output.x)
         
-        residuals,final_jac = self._obj_fun(optimal_parameters)
+        residuals,final_jac = self._obj_fun(optimal_parameters,stack)
         
-        icov = np.dot(final_jac.T,final_jac)
-        cov = np.linalg.inv(icov)
-        
-        self.solution = Solution(optimal_parameters,
-                                 covariance_x=cov,
-                                 initial_x=initial_guess,
-                                 initial_covariance=inv_covar)
+        #The R factor of the stacked Jacobian is the square root of the precision matrix, J^T J = R^T R
+        self.solution.update(new_x=optimal_parameters,new_factor=np.linalg.qr(final_jac,mode='r'))
+        self.solution.solver = opt_output.get('solver',solver_name)
+        self.solution.iterations = opt_output.get('nit')
+        self.solution.solve_time = solve_time
         
         #print optimal_parameters
-        return optimal_parameters,cov
+        return optimal_parameters,self.solution.cov
     
     def validate_solution(self):
         """Calculates predicted measurement values and uncertainties based on the constrained model.
@@ -526,89 +872,194 @@ class Project(object):
         
         * :math:`W_i = \|Z_i\| (\\frac{\sigma_{i,\\text{exp}}}{\sigma_{i,\\text{opt}}})^2`
         
-        The method will then store these values as attributes of each measurement object.
+        The method will then store these values as attributes of each measurement object. The values are calculated by :func:`validation_table` and formatted by :func:`format_validation_table`.
+        
+        :returns: A table of the measured, optimized, and model values and uncertainties
+        :rtype: str
+        """
+        table = self.validation_table()
+        return format_validation_table(table)
+    
+    def validation_table(self):
+        """Calculates predicted measurement values and uncertainties and consistency scores based on the constrained model, without formatting any output.
+        
+        The values are calculated as described in :func:`validate_solution` for all measurements and applications in one batch, using the compiled :py:class:`.ResponseStack`, and stored as attributes of each measurement object. They are also returned as a NumPy structured array with one row for each item in :py:attr:`items` and these fields:
         
+        * name, status: The name and status of the measurement
+        * value, uncertainty: The measured value and its uncertainty, nan if not defined
+        * optimized_value, optimized_uncertainty: The response surface value and its uncertainty based on the constrained model
+        * model_value, model_uncertainty: The response surface value and its uncertainty based on the unconstrained model
+        * consistency, weighted_consistency: The consistency scores :math:`Z` and :math:`W`, only defined for the measurements in the measurement list and nan for the other items
+        
+        The table can be formatted with :func:`format_validation_table` or converted to a DataFrame with pandas.DataFrame(table)
+        
+        :returns: table
+        :rtype: ndarray, structured
         """
+        items = self.items
+        stack = self._response_stack(items,'items')
+        optimized_values,optimized_uncertainties = stack.evaluate_uncertainty(self.solution.x,self.solution.cov)
+        model_uncertainties = stack.model_uncertainty()
+        
+        #The measurement list comes first in the items
         num_expts = len(self.measurement_list)
-        header_args = ('Name',
-                       'Value','Unc',
-                       'OptVal','OptUnc',
-                       'MdlVal','MdlUnc'
-                      )
-        #print('{:20s}  {:6s} {:6s} {:6s} {:6s} {:6s} {:6s}'.format(*header_args))
-        
-        carriage_return = '\n'
-        output = ''
-        
-        header = '{:20s}  {:6s} {:6s} {:6s} {:6s} {:6s} {:6s}'.format(*header_args)
-        output = carriage_return.join((output,header))
-        
-        full_shape = self.active_parameters[-1] + 1
-        
-        x_full = np.zeros(full_shape) #Make a full x that has placeholder values for all parameters
-        x_full[self.active_parameters] = self.solution.x #Put the active x values into x_full
-        cov_full = np.zeros((full_shape,full_shape))
-        for c_x,p_x in enumerate(self.active_parameters):
-            for c_y,p_y in enumerate(self.active_parameters):
-                cov_full[p_x,p_y] = self.solution.cov[c_x,c_y]
-        
-        for (exp_num,meas) in enumerate(self):
-            a = meas.response.a
-            b = meas.response.b
-            
-            x_in = x_full[meas.active_parameters]
-            cov_in = cov_full[meas.active_parameters][:,meas.active_parameters]
-            
-            #Calculate optimized values, base model uncertainties, and optimized uncertainties
-            meas.optimized_value,meas.optimized_uncertainty = meas.evaluate_uncertainty(x_in,cov_in)
-            meas.model_uncertainty = math.sqrt( np.dot(a,a.T)+2*np.trace( np.dot(b,b) ) )/2
-            
-            #meas.consistency =  (meas.optimized_value - meas.value) / (2 * meas.uncertainty)
-            
-            #uncertainty_ratio = meas.optimized_uncertainty / meas.uncertainty
-            
-            #meas.weighted_consistency = abs(meas.consistency) * uncertainty_ratio ** 2
-            
-            print_value = meas.value
-            print_unc   = meas.uncertainty
-            if meas.value is None:
-                print_value = 0
-            if meas.uncertainty is None:
-                print_unc = 0
-            
-            print_args = (meas.name,
-                          float(print_value),float(print_unc),
-                          float(meas.optimized_value),float(meas.optimized_uncertainty),
-                          float(meas.response.z),float(meas.model_uncertainty)
-                         )
-            #for arg in print_args:
-            #    print arg,type(arg)                
-            #    if type(arg) == type(np.array([])): print arg.shape
-            #    
-            #print('{:20s}: {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} '.format(*print_args))
-            line = '{:20s}: {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} {: 6.2f} '.format(*print_args)
-            output = carriage_return.join((output,line))
-        for (exp_num,meas) in enumerate(self.measurement_list):
-            meas.consistency =  (meas.optimized_value - meas.value) / (2 * meas.uncertainty)
-            uncertainty_ratio = meas.optimized_uncertainty / meas.uncertainty
-            meas.weighted_consistency = abs(meas.consistency) * uncertainty_ratio ** 2
-            
-        #print(output)
-        return output
+        consistency = np.full(len(items),np.nan)
+        weighted_consistency = np.full(len(items),np.nan)
+        consistency[:num_expts] = (optimized_values[:num_expts] - stack.value[:num_expts]) / (2 * stack.uncertainty[:num_expts])
+        uncertainty_ratio = optimized_uncertainties[:num_expts] / stack.uncertainty[:num_expts]
+        weighted_consistency[:num_expts] = np.abs(consistency[:num_expts]) * uncertainty_ratio ** 2
+        
+        table = np.zeros(len(items),dtype=validation_dtype)
+        table['name'] = [meas.name for meas in items]
+        table['status'] = [meas._status for meas in items]
+        table['value'] = stack.value
+        table['uncertainty'] = stack.uncertainty
+        table['optimized_value'] = optimized_values
+        table['optimized_uncertainty'] = optimized_uncertainties
+        table['model_value'] = stack.z
+        table['model_uncertainty'] = model_uncertainties
+        table['consistency'] = consistency
+        table['weighted_consistency'] = weighted_consistency
+        
+        for exp_num,meas in enumerate(items):
+            meas.optimized_value = optimized_values[exp_num]
+            meas.optimized_uncertainty = optimized_uncertainties[exp_num]
+            meas.model_uncertainty = model_uncertainties[exp_num]
+            if exp_num < num_expts:
+                meas.consistency = consistency[exp_num]
+                meas.weighted_consistency = weighted_consistency[exp_num]
+        
+        return table
+    
+    def propagate_uncertainty(self,num_samples=2**20,chunk_size=None,sobol=False,seed=None,quantiles=(0.025,0.5,0.975),num_bins=1024):
+        """Finds the distribution of every response surface value under the constrained model by Monte Carlo sampling.
+        
+        Unlike :func:`validation_table`, which uses the linearized uncertainty :math:`J_i^T\Sigma J_i`, this method draws parameter vectors :math:`x = x_{\\text{opt}} + \\alpha\\xi` from the :py:class:`.Solution` and evaluates the response surfaces of all measurements and applications on each chunk of samples with :py:func:`.ResponseStack.evaluate_samples`. The statistics are gathered chunk by chunk by :py:class:`.StreamingStatistics`, so only one chunk of samples is held in memory.
+        
+        :key num_samples: The number of parameter vectors
+        :key chunk_size: The number of parameter vectors evaluated at once. If None, a power of 2 is chosen so that a chunk of response values takes up no more than :py:attr:`.ResponseStack.block_bytes` bytes
+        :key sobol: If True, draw the samples from a scrambled Sobol sequence. num_samples and chunk_size should then be powers of 2
+        :key seed: The seed of the random generator or of the scrambling
+        :key quantiles: The probabilities of the quantiles to estimate
+        :key num_bins: The number of histogram bins used to estimate the quantiles of each response
+        :type num_samples: int
+        :type chunk_size: int
+        :type sobol: bool
+        :type seed: int
+        :type quantiles: list of floats
+        :type num_bins: int
+        :returns: A NumPy structured array with one row for each item in :py:attr:`items` and the fields name, status, mean, std, skewness, kurtosis (the excess kurtosis), minimum, maximum, and quantiles, which holds one column for each of the requested probabilities
+        :rtype: ndarray, structured
+        """
+        items = self.items
+        stack = self._response_stack(items,'items')
+        num_items = len(items)
+        
+        if chunk_size is None:
+            #The evaluation needs the response values and the products of the parameters for each sample
+            sample_bytes = 8 * (num_items + stack.pad_size * (stack.pad_size + 1) // 2 + len(self.active_parameters))
+            chunk_size = 2 ** max(0,int(math.log(max(stack.block_bytes // sample_bytes,1),2)))
+        
+        statistics = StreamingStatistics(num_items,num_bins=num_bins)
+        for samples in parameter_samples(self.solution,num_samples,chunk_size,sobol=sobol,seed=seed):
+            statistics.update(stack.evaluate_samples(samples))
+        
+        quantiles = np.atleast_1d(quantiles)
+        table = np.zeros(num_items,dtype=[('name',object),
+                                          ('status',object),
+                                          ('mean',float),
+                                          ('std',float),
+                                          ('skewness',float),
+                                          ('kurtosis',float),
+                                          ('minimum',float),
+                                          ('maximum',float),
+                                          ('quantiles',float,(len(quantiles),)),
+                                         ])
+        table['name'] = [meas.name for meas in items]
+        table['status'] = [meas._status for meas in items]
+        table['mean'] = statistics.mean
+        table['std'] = statistics.std
+        table['skewness'] = statistics.skewness
+        table['kurtosis'] = statistics.kurtosis
+        table['minimum'] = statistics.minimum
+        table['maximum'] = statistics.maximum
+        table['quantiles'] = statistics.quantiles(quantiles)
+        return table
     
-    def remove_inconsistent_measurements(self):
+    def remove_inconsistent_measurements(self,incremental=False,solver='auto'):
         """Finds and removes inconsistent measurements
         
         This method will find that measurement with the largest weighted consistency and remove that measurement from the measurement list. Measurments removed in this way are added to the removed list and are still accessible.
         
         The consistency score :math:`Z` and weighted consistency score :math:`W` are calculated using :func:`validate_solution` 
+        
+        :key incremental: If False, the constrained model is found from scratch with :func:`run_optimization` after every removal. If True, the removed measurement is dropped from the compiled response surface stack rather than recompiling it, each new optimization starts from the previous solution, and only the consistency scores of the remaining measurements are recalculated between removals. :func:`validate_solution` is recalculated once no more measurements are removed.
+        :key solver: The solver to use for the optimization, see :func:`run_optimization`
+        :type incremental: bool
+        :type solver: str or function
+        
+        In incremental mode, the covariance matrix is recalculated from the Jacobian of the remaining response surfaces at the new solution, as :func:`run_optimization` does, so the scores that choose the next removal are evaluated at the new solution even when the response surfaces are not linear. If the warm-started solver does not converge, the constrained model is found from scratch with :func:`run_optimization` instead.
         """
+        if not incremental:
+            optimized = False
+            while optimized is False:
+                z,cov = self.run_optimization(solver=solver)
+                self.validation_table()
+                optimized = self._remove_inconsistent()
+            return
+        
+        if callable(solver):
+            solver_function = solver
+        else:
+            solver_function = solvers[solver]
+        
+        self.run_optimization(solver=solver)
         optimized = False
         while optimized is False:
-            z,cov = self.run_optimization()
-            self.validate_solution()
+            self._calculate_consistency()
+            stack = self._response_stack(self.measurement_list)
+            
+            number_removed = len(self.removed_list)
             optimized = self._remove_inconsistent()
+            if len(self.removed_list) == number_removed:
+                break
+            meas_remove = self.removed_list[-1]
             
+            #Drop the measurement from the compiled stack rather than rebuilding it
+            stack.remove(stack.measurements.index(meas_remove))
+            
+            #Warm start the optimization from the previous solution
+            time_start = time.time()
+            opt_output = solver_function(lambda x: self._obj_fun(x,stack),self.solution.x,stack)
+            if not opt_output.success:
+                print (opt_output.message)
+                print ('Warm-started optimization did not converge, solving from scratch')
+                self.run_optimization(solver=solver)
+                continue
+            optimal_parameters = np.array(opt_output.x)
+            
+            #The covariance depends on where the gradients are evaluated, so recalculate it at the new solution
+            residuals,final_jac = self._obj_fun(optimal_parameters,stack)
+            self.solution.update(new_x=optimal_parameters,new_factor=np.linalg.qr(final_jac,mode='r'))
+            self.solution.iterations = opt_output.get('nit')
+            self.solution.solve_time = time.time() - time_start
+        
+        self.validation_table()
+        return
+    
+    def _calculate_consistency(self):
+        """Calculates the optimized values, optimized uncertainties, and consistency scores of the measurements in the measurement list only, without formatting any output.
+        """
+        stack = self._response_stack(self.measurement_list)
+        optimized_values,optimized_uncertainties = stack.evaluate_uncertainty(self.solution.x,self.solution.cov)
+        
+        consistency = (optimized_values - stack.value) / (2 * stack.uncertainty)
+        weighted_consistency = np.abs(consistency) * (optimized_uncertainties / stack.uncertainty) ** 2
+        
+        for meas,values in zip(self.measurement_list,zip(optimized_values,optimized_uncertainties,consistency,weighted_consistency)):
+            meas.optimized_value,meas.optimized_uncertainty,meas.consistency,meas.weighted_consistency = values
+        return
+    
     def _remove_inconsistent(self):
 
         #Collect the consistency scores and weighted consistency scores
@@ -619,9 +1070,11 @@ class Project(object):
         for exp_num in np.argsort(wscores)[::-1]:
             #Check to see if the currect measurement is inconsistent. If it is, move it to the removed list and break from the loop
             if abs(zscores[exp_num]) > 1:
+                self._get_registry()
                 meas_remove = self.measurement_list.pop(exp_num)
                 meas_remove._status = 'Inconsistent'
                 self.removed_list += [meas_remove]
+                self._move_measurement(meas_remove,'removed_list','measurement_list',exp_num)
                 
                 unc_ratio = meas_remove.optimized_uncertainty / meas_remove.uncertainty
                 
@@ -636,7 +1089,7 @@ class Project(object):
         print('No inconsistent measurements')
         return True
     
-    def calculate_entropy(self):
+    def calculate_entropy(self,block_size=None):
         """Determines the rate of change of information entropy for each measurement with respect to the uncertainty in each other measurement. 
         
         This function calculates the derivative :math:`\\frac{d \ln \sigma_{i,opt}}{d \ln \sigma_{j,exp}}` for each measurement pair. The derivative is calculated using
@@ -651,90 +1104,237 @@ class Project(object):
         .. math::
            \Phi_i = \sum_j [\\frac{d \ln \sigma_{j,\\text{opt}}}{d \ln \sigma_{i,\\text{exp}}} - \\frac{d \ln \sigma_{i,\\text{opt}}}{d \ln \sigma_{j,\\text{exp}}}]
         
+        The derivatives for all measurement pairs are computed together. Since :math:`\\Sigma J_j J_j^T \\Sigma = u_j u_j^T` with :math:`u_j = \\Sigma J_j`, the first term of the numerator is :math:`(J_i^T u_j)^2` and the trace is :math:`u_j^T b_i \\Sigma b_i u_j`. The products :math:`b_i \\Sigma b_i` are computed for blocks of block_size measurements at a time so that the memory used is bounded.
+        
+        :key block_size: The number of response surfaces whose second order terms are processed at once. If None, it is chosen so that each block uses about 256 MB.
+        :type block_size: int
+        
         """
-        number_measurements = len(self.measurement_list)
-        number_applications = len(self.application_list)
-        number_total = len(self)
+        terms = self._entropy_terms(block_size)
+        self._assign_entropy(self._entropy_matrix(terms))
+        return 
+    
+    def _entropy_terms(self,block_size=None):
+        """Calculates the terms from which the entropy derivatives of :func:`calculate_entropy` are assembled, at the current solution.
+        
+        The terms are kept separately so that they can be updated by :func:`_downdate_entropy_terms` when a measurement is removed. Rows correspond to the measurement list and columns to the measurement list followed by the application list.
         
-        entropy = np.zeros((number_total,number_total))
+        :key block_size: The number of response surfaces whose second order terms are processed at once
+        :returns: terms, a dictionary holding the gradients, the products :math:`\\Sigma J_i`, the first and second order terms of the numerator, and the uncertainties
+        :rtype: dict
+        """
+        x = self.solution.x
+        cov = self.solution.cov
+        num_params = len(x)
+        
+        measurement_stack = self._response_stack(self.measurement_list)
+        active_stack = self._response_stack(self.active,'active')
+        
+        #Gradients of the measurements whose experimental uncertainty changes, and of all of the responses whose optimized uncertainty changes
+        y,grad_meas = measurement_stack.sensitivity(x)
+        y,grad_active = active_stack.sensitivity(x)
+        
+        #Each row is Sigma J_i, so that Sigma J_i J_i^T Sigma is the outer product of a row with itself
+        cov_grad = np.dot(grad_meas,cov)
+        
+        #First order term of the numerator, before squaring
+        first = np.dot(cov_grad,grad_active.T)
+        
+        #Second order term of the numerator, in blocks of response surfaces
+        second = np.zeros_like(first)
+        if block_size is None:
+            block_size = self._entropy_block_size(num_params)
+        if active_stack.has_second_order:
+            for block in self._entropy_blocks(active_stack.num_expts,block_size):
+                b_block = active_stack.second_order_terms(block)
+                b_cov_b = np.matmul(np.matmul(b_block,cov),b_block)
+                
+                #u_i^T (b_r Sigma b_r) u_i for every i and every r in the block
+                second[:,block] = np.einsum('rij,ij->ri',np.matmul(cov_grad,b_cov_b),cov_grad).T
+        
+        y,active_uncertainty = active_stack.evaluate_uncertainty(x,cov)
+        
+        terms = dict(cov=np.array(cov),
+                     grad_meas=grad_meas,
+                     grad_active=grad_active,
+                     cov_grad=cov_grad,
+                     first=first,
+                     second=second,
+                     meas_uncertainty=measurement_stack.uncertainty.copy(),
+                     active_uncertainty=active_uncertainty,
+                     block_size=block_size,
+                    )
+        return terms
+    
+    def _entropy_block_size(self,num_params):
+        """Chooses the number of response surfaces per block so that each block of :func:`_entropy_terms` uses about 256 MB"""
+        block_bytes = 8 * num_params * (len(self.measurement_list) + 3 * num_params)
+        return max(1,int(2 ** 28 // max(block_bytes,1)))
+    
+    def _entropy_blocks(self,number,block_size):
+        """Yields slices that split range(number) into blocks of block_size"""
+        for block_start in range(0,number,block_size):
+            yield slice(block_start,min(block_start + block_size,number))
+    
+    def _entropy_matrix(self,terms):
+        """Assembles the matrix of entropy derivatives from the terms calculated by :func:`_entropy_terms`
         
-        full_shape = self.active_parameters[-1] + 1
+        :returns: entropy, shape (len(measurement_list),len(active))
+        :rtype: ndarray(float)
+        """
+        numerator = terms['first'] ** 2 + 2 * terms['second']
+        return numerator / np.outer(terms['meas_uncertainty'],terms['active_uncertainty']) ** 2
+    
+    def _assign_entropy(self,entropy,verbose=True):
+        """Calculates the entropy flux of every measurement from the matrix of entropy derivatives and stores it in Measurement.entropy
         
-        x_full = np.zeros(full_shape) #Make a full x that has placeholder values for all parameters
-        x_full[self.active_parameters] = self.solution.x #Put the active x values into x_full
-        cov_full = np.zeros((full_shape,full_shape))
-        for c_x,p_x in enumerate(self.active_parameters):
-            for c_y,p_y in enumerate(self.active_parameters):
-                cov_full[p_x,p_y] = self.solution.cov[c_x,c_y]
+        The flux is the diagonal of :math:`EE^T - E^TE`, which is the sum of squares of each row minus the sum of squares of each column. Measurements that are not in the active list have no entropy derivatives and are given a flux of zero.
+        """
+        entropy_squared = entropy ** 2
+        entropy_flux = np.zeros(len(self))
+        entropy_flux[:entropy.shape[0]] += entropy_squared.sum(axis=1)
+        entropy_flux[:entropy.shape[1]] -= entropy_squared.sum(axis=0)
         
-        #Outer loop of measurements
-        for i,meas_i in enumerate(self.measurement_list):
-            
-            x_in = x_full[meas_i.active_parameters]
-            
-            a_full = np.zeros(full_shape)
-            
-            y,a_full[meas_i.active_parameters] = meas_i.sensitivity_response(x_in)
-            
-            a_i = a_full[self.active_parameters]
-            a_i = np.array([a_i]).transpose()
-            aat = np.dot(a_i,a_i.T) 
+        for flux,meas in zip(entropy_flux,self):
+            meas.entropy = flux
             
-            caatc = np.dot(self.solution.cov,np.dot(aat,self.solution.cov))
-            
-            for r,meas_r in enumerate(self.active):
-                x_in = x_full[meas_r.active_parameters]
-                cov_in = cov_full[meas_r.active_parameters][:,meas_r.active_parameters]
-                
-                a_full = np.zeros(full_shape)
-                
-                y,a_full[meas_r.active_parameters] = meas_r.sensitivity_response(x_in)
-                
-                b_full = np.zeros((full_shape,full_shape))
-                for c_x,p_x in enumerate(meas_r.active_parameters):
-                    for c_y,p_y in enumerate(meas_r.active_parameters):
-                        b_full[p_x,p_y] = meas_r.response.b[c_x,c_y]
-                
-                b_r = b_full[self.active_parameters][:,self.active_parameters]
-                
-                a_r = a_full[self.active_parameters]
-                a_r = np.array([a_r]).transpose()
+            if verbose:
+                print_args = (meas.name,meas.entropy)
                 
-                artcaatcar = np.dot(a_r.T,np.dot(caatc,a_r))
-                    
-                b_r_times_cov  = np.dot(b_r,self.solution.cov)
-                b_r_times_dcov = np.dot(b_r,caatc)
-                brcbrdc = np.dot(b_r_times_cov,b_r_times_dcov)
-                
-                numerator = artcaatcar + 2 * np.trace(brcbrdc)
-                
-                entropy[i,r] = numerator / ( (meas_i.uncertainty * meas_r.optimized_uncertainty) ** 2 )
-            #print 'Sensitivty of uncertainty r to experimental uncertainty ' + str(i+1)
-            #print entropy[i,:]
-        entropy_flux = np.diag(np.dot(entropy,entropy.T) - np.dot(entropy.T,entropy) )
+                print("""{} Entropy flux {: 10.6f}""".format(*print_args))
+        return
+    
+    def _downdate_entropy_terms(self,terms,exp_num):
+        """Updates the terms of the entropy derivatives in place for the removal of one measurement, without recalculating them.
         
-        for entropy,meas in zip(entropy_flux,self):
-            meas.entropy = entropy
-            
-            print_args = (meas.name,meas.entropy)
+        Removing measurement :math:`k` removes :math:`w_kw_k^T` from the information matrix, where :math:`w_k = J_k/\\sigma_{k,\\text{exp}}`. By the Sherman-Morrison formula, the covariance becomes :math:`\\Sigma + vv^T/d` with :math:`v = \\Sigma w_k` and :math:`d = 1 - w_k^Tv`. Every term of the numerator then changes by a rank-one correction that only needs the products of the gradients and second order terms with :math:`v`, so an update costs :math:`O(N^2P)` instead of the :math:`O(N^2P^2)` of :func:`_entropy_terms`. The row and column of the removed measurement are then dropped. The second order terms are assumed to be symmetric, as they are when built by :func:`.Measurement.make_response`.
+        
+        The 'measurements' and 'active' response stacks are updated in place, so this must be called before the measurement is removed from the measurement list.
+        
+        :param terms: The terms calculated by :func:`_entropy_terms`
+        :param exp_num: The position of the removed measurement in the measurement list
+        :type terms: dict
+        :type exp_num: int
+        """
+        measurement_stack = self._response_stack(self.measurement_list)
+        active_stack = self._response_stack(self.active,'active')
+        
+        cov = terms['cov']
+        grad_meas = terms['grad_meas']
+        grad_active = terms['grad_active']
+        cov_grad = terms['cov_grad']
+        
+        uncertainty = terms['meas_uncertainty'][exp_num]
+        v = cov_grad[exp_num] / uncertainty
+        d = 1 - np.dot(grad_meas[exp_num],v) / uncertainty
+        
+        #Sigma' J_i = Sigma J_i + c_i v
+        c_meas = np.dot(grad_meas,v) / d
+        c_active = np.dot(grad_active,v)
+        
+        terms['first'] += np.outer(c_meas,c_active)
+        
+        if active_stack.has_second_order:
+            for block in self._entropy_blocks(active_stack.num_expts,terms['block_size']):
+                b_block = active_stack.second_order_terms(block)
+                b_v = np.matmul(b_block,v)
+                b_cov_b_v = np.matmul(b_block,np.dot(b_v,cov)[:,:,None])[:,:,0]
                 
-            print("""{} Entropy flux {: 10.6f}""".format(*print_args))
-
-        return 
+                #u'^T (b Sigma b) u' with u' = u + c v, plus the change in (b Sigma b) from the covariance update
+                cross = np.dot(cov_grad,b_cov_b_v.T)
+                new_b_v = (np.dot(cov_grad,b_v.T) + np.outer(c_meas,np.dot(b_v,v))) ** 2 / d
+                terms['second'][:,block] += (2 * c_meas[:,None] * cross
+                                              + np.outer(c_meas ** 2,np.dot(b_cov_b_v,v))
+                                              + new_b_v)
+        
+        cov = cov + np.outer(v,v) / d
+        cov_grad += np.outer(c_meas,v)
+        
+        #Drop the removed measurement's row, and its column among the active measurements
+        terms['cov'] = cov
+        terms['grad_meas'] = np.delete(grad_meas,exp_num,axis=0)
+        terms['grad_active'] = np.delete(grad_active,exp_num,axis=0)
+        terms['cov_grad'] = np.delete(cov_grad,exp_num,axis=0)
+        terms['first'] = np.delete(np.delete(terms['first'],exp_num,axis=0),exp_num,axis=1)
+        terms['second'] = np.delete(np.delete(terms['second'],exp_num,axis=0),exp_num,axis=1)
+        terms['meas_uncertainty'] = np.delete(terms['meas_uncertainty'],exp_num)
+        
+        measurement_stack.remove(exp_num)
+        active_stack.remove(exp_num)
+        y,terms['active_uncertainty'] = active_stack.evaluate_uncertainty(self.solution.x,cov)
+        return
     
-    def remove_low_information_measurements(self):
+    def remove_low_information_measurements(self,incremental=False,max_removals=1,interaction_tolerance=1.0e-3,block_size=None):
         """Finds and removes low-information measurements 
         
         This method will find that measurement with the largest (in absolute value) negative information entropy derivative and remove that measurement from the measurement list. Measurments removed in this way are added to the removed list and are still accessible.
         
         The consistency score :math:`\Phi` and weighted consistency score :math:`W` are calculated using :func:`validate_solution` 
+        
+        :key incremental: If False, the covariance matrix, :func:`validate_solution`, and :func:`calculate_entropy` are recalculated from scratch after every removal. If True, the entropy derivatives are calculated once and then updated for each removed measurement with :func:`_downdate_entropy_terms`, which applies a Sherman-Morrison update to the covariance matrix. The covariance, :func:`validate_solution`, and :func:`calculate_entropy` are recalculated once no more measurements are removed.
+        :key max_removals: In incremental mode, the largest number of measurements that may be removed before the entropy fluxes are recalculated
+        :key interaction_tolerance: In incremental mode, a measurement is only removed in the same pass as another if neither of their entropy derivatives with respect to the other is larger than this
+        :key block_size: The block size used by :func:`calculate_entropy`
+        :type incremental: bool
+        :type max_removals: int
+        :type interaction_tolerance: float
+        :type block_size: int
+        
+        Since the parameter values are not changed by this method, the updated covariance matrix is exact and incremental mode gives the same result as recalculation when max_removals is 1.
         """
-        minimized = False
-        while minimized is False:
-            self._calculate_uncertainty()
-            self.validate_solution()
-            self.calculate_entropy()
-            minimized = self._remove_low_information()
+        if not incremental:
+            minimized = False
+            while minimized is False:
+                self._calculate_uncertainty()
+                self.validation_table()
+                self.calculate_entropy(block_size=block_size)
+                minimized = self._remove_low_information()
+            return
+        
+        self._calculate_uncertainty()
+        terms = self._entropy_terms(block_size)
+        while True:
+            entropy = self._entropy_matrix(terms)
+            self._assign_entropy(entropy,verbose=False)
+            
+            selected = self._select_low_information(entropy,max_removals,interaction_tolerance)
+            if not selected:
+                break
+            
+            #Remove from the end of the list first so that the remaining positions do not change
+            for exp_num in sorted(selected,reverse=True):
+                self._downdate_entropy_terms(terms,exp_num)
+                self._move_low_information(exp_num)
+            self.solution.update(new_cov=terms['cov'])
+        
+        self._calculate_uncertainty()
+        self.validation_table()
+        self.calculate_entropy(block_size=block_size)
+        print('No low-information measurements')
+        return
+    
+    def _select_low_information(self,entropy,max_removals=1,interaction_tolerance=1.0e-3):
+        """Chooses the measurements to be removed in one pass of :func:`remove_low_information_measurements`
+        
+        The measurements with negative entropy flux are considered in the same order as :func:`_remove_low_information`. The first is always chosen, and each later one is chosen only if its entropy derivatives with respect to every measurement already chosen, and theirs with respect to it, are below interaction_tolerance.
+        
+        :param entropy: The entropy derivatives from :func:`_entropy_matrix`
+        :returns: The positions in the measurement list of the chosen measurements
+        :rtype: list of int
+        """
+        entropies = np.array([meas.entropy for meas in self.measurement_list])
+        
+        selected = []
+        for exp_num in np.argsort(entropies)[::-1]:
+            if len(selected) >= max_removals:
+                break
+            if entropies[exp_num] >= 0:
+                continue
+            interactions = np.abs(np.concatenate((entropy[exp_num,selected],entropy[selected,exp_num])))
+            if selected and interactions.max() > interaction_tolerance:
+                continue
+            selected += [int(exp_num)]
+        return selected
     
     def _remove_low_information(self):
         
@@ -742,26 +1342,155 @@ class Project(object):
         
         for exp_num in np.argsort(entropies)[::-1]:
             if entropies[exp_num] < 0:
-                meas_remove = self.measurement_list.pop(exp_num)
-                self.low_information += [meas_remove]
-                meas_remove._status = 'Low Information'
-                print_args = (meas_remove.name,meas_remove.entropy)
-                
-                print("""{} Entropy flux {: 6.2f}""".format(*print_args))
+                self._move_low_information(exp_num)
                 return False
         print('No low-information measurements')
         return True
     
+    def _move_low_information(self,exp_num):
+        """Moves one measurement from the measurement list to the low-information list"""
+        self._get_registry()
+        meas_remove = self.measurement_list.pop(exp_num)
+        self.low_information += [meas_remove]
+        meas_remove._status = 'Low Information'
+        self._move_measurement(meas_remove,'low_information','measurement_list',exp_num)
+        print_args = (meas_remove.name,meas_remove.entropy)
+        
+        print("""{} Entropy flux {: 6.2f}""".format(*print_args))
+        return meas_remove
+    
+    def rank_candidates(self,candidates,uncertainty=None):
+        """Ranks candidate measurements by how much each would reduce the uncertainty of the applications if it were added to the measurement list.
+        
+        Adding a measurement whose response surface has gradient :math:`g` and whose uncertainty is :math:`\sigma` changes the covariance matrix by a rank-one update,
+        
+        .. math::
+           \Sigma' = \Sigma - \\frac{\Sigma g g^T \Sigma}{\sigma^2 + g^T \Sigma g}
+        
+        so that the variance of application j, with gradient :math:`h_j`, is reduced by :math:`(h_j^T \Sigma g)^2 / (\sigma^2 + g^T \Sigma g)`. The reductions for every candidate and every application are computed together from the products :math:`\Sigma g`, without updating the constrained model. The variances are the linearized variances :math:`h_j^T \Sigma h_j`; the second order term of :func:`validate_solution` is not included.
+        
+        :param candidates: The candidate measurements. Each must have a response surface made with the Project's active parameters, for example with :func:`set_active_parameters` and :func:`make_response` on a Project holding the candidates
+        :key uncertainty: The uncertainty assumed for every candidate, or one per candidate. If None, the uncertainty of each candidate measurement is used
+        :type candidates: list of :py:class:`.Measurement`
+        :type uncertainty: float or ndarray(float)
+        :returns: A NumPy structured array with one row for each candidate, sorted from the largest reduction to the smallest, with these fields:
+        
+           * index, name: The position of the candidate in candidates, and its name
+           * uncertainty: The assumed uncertainty of the candidate
+           * reduction: The reduction in the total variance of the applications
+           * fraction: The mean over the applications of the fractional reduction in variance
+           * application_reduction: The reduction in the variance of each application
+        :rtype: ndarray, structured
+        """
+        terms = self._design_terms(candidates,uncertainty)
+        
+        #The variance reduction for each application (rows) and candidate (columns)
+        reduction = terms['cross']**2/terms['denominator']
+        fraction = (reduction/terms['application_variance'][:,None]).mean(axis=0)
+        
+        table = np.zeros(len(candidates),dtype=[('index',int),
+                                                ('name',object),
+                                                ('uncertainty',float),
+                                                ('reduction',float),
+                                                ('fraction',float),
+                                                ('application_reduction',float,(len(self.application_list),)),
+                                               ])
+        table['index'] = np.arange(len(candidates))
+        table['name'] = [meas.name for meas in candidates]
+        table['uncertainty'] = terms['uncertainty']
+        table['reduction'] = reduction.sum(axis=0)
+        table['fraction'] = fraction
+        table['application_reduction'] = reduction.T
+        return table[np.argsort(-table['reduction'],kind='stable')]
+    
+    def select_candidates(self,candidates,number,uncertainty=None):
+        """Chooses a batch of candidate measurements that together reduce the uncertainty of the applications the most, by greedy selection.
+        
+        The candidate with the largest reduction in the total application variance, as calculated by :func:`rank_candidates`, is chosen first. The covariance matrix is then updated as if that candidate had been measured, and the products :math:`\Sigma g` and the reductions for all of the remaining candidates are updated by the same rank-one update, so that each later choice accounts for the information given by the earlier ones.
+        
+        :param candidates: The candidate measurements, as in :func:`rank_candidates`
+        :param number: The number of candidates to choose
+        :key uncertainty: The uncertainty assumed for every candidate, or one per candidate. If None, the uncertainty of each candidate measurement is used
+        :type candidates: list of :py:class:`.Measurement`
+        :type number: int
+        :type uncertainty: float or ndarray(float)
+        :returns: A NumPy structured array with one row for each chosen candidate, in the order they were chosen, with the fields index and name of the candidate, reduction, the reduction in the total application variance from adding the candidate to those chosen before it, and total_variance, the total application variance once it is added
+        :rtype: ndarray, structured
+        """
+        terms = self._design_terms(candidates,uncertainty)
+        cov_grad = terms['cov_grad']
+        cross = terms['cross']
+        denominator = terms['denominator']
+        application_variance = terms['application_variance']
+        
+        number = min(number,len(candidates))
+        table = np.zeros(number,dtype=[('index',int),
+                                       ('name',object),
+                                       ('reduction',float),
+                                       ('total_variance',float),
+                                      ])
+        available = np.ones(len(candidates),dtype=bool)
+        for choice in range(number):
+            total_reduction = np.where(available,(cross**2).sum(axis=0)/denominator,-np.inf)
+            chosen = int(np.argmax(total_reduction))
+            available[chosen] = False
+            
+            #Rank-one update of Sigma by the chosen candidate, applied to each product that depends on it
+            chosen_cov_grad = cov_grad[:,chosen].copy()
+            chosen_cross = cross[:,chosen].copy()
+            chosen_denominator = denominator[chosen]
+            overlap = np.dot(terms['grad_candidate'],chosen_cov_grad)
+            cov_grad -= np.outer(chosen_cov_grad,overlap/chosen_denominator)
+            cross -= np.outer(chosen_cross,overlap/chosen_denominator)
+            denominator -= overlap**2/chosen_denominator
+            application_variance -= chosen_cross**2/chosen_denominator
+            
+            table[choice] = (chosen,candidates[chosen].name,total_reduction[chosen],application_variance.sum())
+        return table
+    
+    def _design_terms(self,candidates,uncertainty=None):
+        """Calculates the terms from which :func:`rank_candidates` and :func:`select_candidates` find the reductions in application variance, at the current solution.
+        
+        :param candidates: The candidate measurements
+        :key uncertainty: The uncertainty assumed for every candidate, or one per candidate. If None, the uncertainty of each candidate measurement is used
+        :returns: terms, a dictionary holding the candidate gradients, the products :math:`\\Sigma g` as columns, the cross products :math:`h_j^T \\Sigma g` between applications and candidates, the denominators :math:`\sigma^2 + g^T \\Sigma g`, the linearized application variances, and the candidate uncertainties
+        :rtype: dict
+        """
+        if not self.application_list:
+            raise ValueError('The project has no applications to target')
+        if not candidates:
+            raise ValueError('No candidate measurements were given')
+        
+        x = self.solution.x
+        candidate_stack = self._response_stack(candidates,'candidates')
+        application_stack = self._response_stack(self.application_list,'applications')
+        y,grad_candidate = candidate_stack.sensitivity(x)
+        y,grad_application = application_stack.sensitivity(x)
+        
+        if uncertainty is None:
+            uncertainty = candidate_stack.uncertainty
+        uncertainty = np.array(np.broadcast_to(np.asarray(uncertainty,dtype=float),(len(candidates),)))
+        if np.isnan(uncertainty).any():
+            raise ValueError('Every candidate needs an uncertainty')
+        
+        #Each column is Sigma g for one candidate
+        cov_grad = self.solution.solve(grad_candidate.T)
+        
+        terms = dict(grad_candidate=grad_candidate,
+                     cov_grad=cov_grad,
+                     cross=np.dot(grad_application,cov_grad),
+                     denominator=uncertainty**2 + np.einsum('cp,pc->c',grad_candidate,cov_grad),
+                     application_variance=self.solution.quadratic_form(grad_application),
+                     uncertainty=uncertainty,
+                    )
+        return terms
+    
     def _calculate_uncertainty(self,initial_covariance=None,initial_guess=None):
         
         residuals,final_jac = self._obj_fun(self.solution.x)
         
-        #Calculate the covariance matrix
-        icov = np.dot(final_jac.T,final_jac)
-        cov = np.linalg.inv(icov)
-        
-        #Update the covariance
-        self.solution.update(new_cov=cov)
+        #Update the covariance from the R factor of the Jacobian
+        self.solution.update(new_factor=np.linalg.qr(final_jac,mode='r'))
         #self.solution.cov = cov
         #self.solution.alpha = np.linalg.cholesky(cov)
         return
@@ -787,7 +1516,9 @@ class Project(object):
         
         meas = self[measurement]
         
-        parameter_info = meas.model.model_parameter_info
+        parameter_info = as_parameter_table(meas.model.model_parameter_info)
+        names = parameter_info.names_of(self.active_parameters)
+        values = parameter_info.values[self.active_parameters]
         
         headname = 'Parameter name'
         headv = 'Value'
@@ -805,9 +1536,9 @@ class Project(object):
         
         for active_num,param in enumerate(self.active_parameters):
             
-            param_name = parameter_info[param]['parameter_name']
+            param_name = names[active_num]
             
-            value = parameter_info[param]['parameter_value']#meas.model.get_parameter(param)[0]
+            value = values[active_num]#meas.model.get_parameter(param)[0]
             
             this_x = self.solution.x[active_num]
             this_std = 2*np.sqrt(self.solution.cov[active_num,active_num])
@@ -834,18 +1565,16 @@ class Project(object):
         
         active_params = self.active_parameters[factors]
         
-        params_info = self.model_parameter_info[active_params]
+        param_names = as_parameter_table(self.model_parameter_info).names_of(active_params)
         
         zred = self.solution.x[factors]
         
-        alphared = self.solution.alpha[factors]
-        
         pts = np.arange(-1.5,1.5,0.01)
         xx,yy = np.meshgrid(pts,pts)
         
         XX  = np.stack((xx,yy),axis=2)
         
-        S = np.dot(alphared,alphared.T)
+        S = self.solution.marginal(factors)
         
         Sinv = np.linalg.inv(S)
         
@@ -871,8 +1600,8 @@ class Project(object):
         cprior = ax.contour(xx,yy,prior_pdf,levels=levels,colors='k',linestyles='dotted')
         cposte = ax.contour(xx,yy,posterior_pdf,levels=levels,colors='k')
         
-        ax.set_xlabel(params_info[0]['parameter_name'])
-        ax.set_ylabel(params_info[1]['parameter_name'])
+        ax.set_xlabel(param_names[0])
+        ax.set_ylabel(param_names[1])
         
         ax.set_xticks([-2,-1,0,1,2])
         ax.set_yticks([-2,-1,0,1,2])
@@ -909,25 +1638,21 @@ class Project(object):
         #Make the figure
         fig,ax = plt.subplots(figsize=(5,4))
         
-        #Get the alpha matrix
+        #Get the covariance matrix among the factors
         if factors_list is not None:
-            alphared = self.solution.alpha[factors_list]
+            S = self.solution.marginal(factors_list)
             active_params = self.active_parameters[factors_list]
         else:
-            alphared = self.solution.alpha
+            S = self.solution.cov
             active_params = self.active_parameters
         
-        #Build the covariance matrix from the alpha matrix
-        S = np.dot(alphared,alphared.T)
-        
         #Plot the image with a colorbar
         im = ax.imshow(np.sqrt(np.abs(S)),cmap='Greys',origin='upper',vmin=0,vmax=0.5)
         fig.colorbar(im,ax=ax,fraction=0.2)
         
         #Get the active parameter names and replace the y ticks
         #active_params = self.active_parameters[factors_list]
-        params_info = self.model_parameter_info[active_params]
-        param_names = [param_info['parameter_name'] for param_info in params_info]
+        param_names = as_parameter_table(self.model_parameter_info).names_of(active_params)
         
         
         #meas = self[0]
@@ -6,5 +6,8 @@ sys.path.append(os.path.dirname(__file__))
 
 from Project import *
 from measurement import tqfunc
+from evaluation_cache import EvaluationCache
+from surface_store import ResponseSurfaceStore
+from parameter_table import ParameterTable,as_parameter_table
 #from response_surface import response_surface
 #from solution import solution
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""Saving a :py:class:`.Project` as an archive whose parts can be read separately.
+
+A project archive is a directory holding these files:
+
+   * ``project.json``: the project metadata, which is the name and the scalar attributes of the project and its :py:class:`.Solution`, the measurements in each of the project's lists, and the scalar attributes of every measurement
+   * ``project.npz``: the arrays of the project and of its :py:class:`.Solution`
+   * ``project.pkl``: everything else that belongs to the project, such as its initialization functions and its model parameter information
+   * ``measurements/<number>.npz``: the arrays of one measurement, such as its sensitivities and the terms of its :py:class:`.ResponseSurface`
+   * ``measurements/<number>.pkl``: the model recipe of one measurement, which is its model with any Cantera objects erased by :py:func:`.Model.prepare_for_save`, together with any other attribute that is neither a scalar nor an array
+
+Opening an archive only reads the three project files. Each measurement is created with its scalar attributes, and its arrays and its model are read from disk the first time that they are used. A measurement whose arrays and model were never used is copied file by file when the project is saved again.
+
+"""
+import os
+import json
+import shutil
+import pickle
+import importlib
+import numpy as np
+
+from solution import Solution
+from response_surface import ResponseSurface
+from registry import MeasurementRegistry
+
+ARCHIVE_FORMAT = 'mumpce-archive'
+ARCHIVE_VERSION = 1
+
+#: The file extension of a project archive
+ARCHIVE_EXTENSION = '.mumpce'
+
+#The lists of measurements held by a Project, in the order of Project.items
+_measurement_lists = MeasurementRegistry.list_names
+
+#Attributes that are rebuilt when they are needed, and so are not saved
+_not_saved = ['_stacks','_registry','_projection','_archive','_impacts']
+
+#Objects that are saved as their scalars and arrays rather than pickled
+_components = [Solution,ResponseSurface]
+
+def _class_name(obj):
+    return [type(obj).__module__,type(obj).__name__]
+
+def _find_class(class_name,found=None):
+    """Imports a class from its [module,name], remembering it in found if found is not None"""
+    module_name,name = class_name
+    if found is not None and (module_name,name) in found:
+        return found[module_name,name]
+    cls = getattr(importlib.import_module(module_name),name)
+    if found is not None:
+        found[module_name,name] = cls
+    return cls
+
+def _native(value):
+    """Returns value as a plain Python scalar if it is a scalar that JSON can store, otherwise returns value unchanged"""
+    if isinstance(value,np.generic) and value.dtype.kind in 'biuf':
+        return value.item()
+    return value
+
+def _is_scalar(value):
+    return value is None or type(value) in (bool,int,float,str)
+
+def _is_array(value):
+    return isinstance(value,np.ndarray) and value.dtype.kind in 'biuf'
+
+def _split_attributes(obj,exclude=()):
+    """Sorts the attributes of an object into the parts of the archive
+
+    :param obj: The object
+    :key exclude: The names of attributes to leave out
+    :returns: scalars, a dict of the attributes that JSON can store; arrays, a dict of the numeric arrays, including the arrays of any components; components, a dict describing each :py:class:`.Solution` or :py:class:`.ResponseSurface` attribute; and others, a dict of everything else
+    :rtype: tuple
+    """
+    scalars = {}
+    arrays = {}
+    components = {}
+    others = {}
+    for name,value in vars(obj).items():
+        if name in _not_saved or name in exclude:
+            continue
+        value = _native(value)
+        if _is_scalar(value):
+            scalars[name] = value
+        elif _is_array(value):
+            arrays[name] = value
+        elif type(value) in _components:
+            comp_scalars,comp_arrays,comp_components,comp_others = _split_attributes(value)
+            if comp_components or comp_others:
+                #Nothing is lost by pickling a component that holds something unexpected
+                others[name] = value
+                continue
+            components[name] = {'class':_class_name(value),
+                                'scalars':comp_scalars,
+                                'arrays':sorted(comp_arrays),
+                               }
+            for comp_name,comp_value in comp_arrays.items():
+                arrays[name + '.' + comp_name] = comp_value
+        else:
+            others[name] = value
+    return scalars,arrays,components,others
+
+def _build_components(components,arrays):
+    """Creates the components described by :py:func:`_split_attributes` from their scalars and arrays"""
+    built = {}
+    for name,description in components.items():
+        cls = _find_class(description['class'])
+        state = dict(description['scalars'])
+        for comp_name in description['arrays']:
+            state[comp_name] = arrays[name + '.' + comp_name]
+        component = cls.__new__(cls)
+        if hasattr(component,'__setstate__'):
+            component.__setstate__(state)
+        else:
+            component.__dict__.update(state)
+        built[name] = component
+    return built
+
+def _read_arrays(filename):
+    with np.load(filename,allow_pickle=False) as data:
+        return {name:data[name] for name in data.files}
+
+def _read_pickle(filename):
+    with open(filename,'rb') as f:
+        return pickle.load(f)
+
+def _write_pickle(filename,obj):
+    with open(filename,'wb') as f:
+        pickle.dump(obj,f)
+
+class MeasurementEntry(object):
+    """The parts of a measurement that are still on disk in a project archive.
+
+    A measurement opened from an archive holds its entry in its _archive attribute. When an attribute of the measurement is not found, :py:func:`.Measurement.__getattr__` asks the entry to load the part of the archive that holds it.
+
+    :param path: The archive directory
+    :param number: The number of the measurement in the archive
+    :param record: The description of the measurement from project.json
+    :type path: str
+    :type number: int
+    :type record: dict
+
+    """
+    def __init__(self,path,number,record):
+        self.path = path
+        self.number = number
+        self.record = record
+        #: The parts that have not been read yet, 'arrays' and 'recipe'
+        self.pending = set()
+        if self.array_names:
+            self.pending.add('arrays')
+        if self.recipe_names:
+            self.pending.add('recipe')
+        return
+
+    @property
+    def array_names(self):
+        """The names of the attributes that are read from the measurement's .npz file"""
+        return self.record['arrays'] + sorted(self.record['components'])
+
+    @property
+    def recipe_names(self):
+        """The names of the attributes that are read from the measurement's .pkl file"""
+        return self.record['recipe']
+
+    def filename(self,part):
+        """Returns the name of the file that holds one part of the measurement"""
+        return _measurement_filename(self.path,self.number,part)
+
+    def load(self,meas,name):
+        """Reads the part of the archive that holds one attribute
+
+        :param meas: The measurement
+        :param name: The name of the attribute
+        :returns: True if the attribute was read from the archive
+        :rtype: bool
+        """
+        if 'arrays' in self.pending and name in self.array_names:
+            self._load_part(meas,'arrays')
+            return True
+        if 'recipe' in self.pending and name in self.recipe_names:
+            self._load_part(meas,'recipe')
+            return True
+        return False
+
+    def load_all(self,meas):
+        """Reads every part of the measurement that is still on disk"""
+        for part in sorted(self.pending):
+            self._load_part(meas,part)
+        return
+
+    def _load_part(self,meas,part):
+        if part == 'arrays':
+            arrays = _read_arrays(self.filename('arrays'))
+            attributes = {name:arrays[name] for name in self.record['arrays']}
+            attributes.update(_build_components(self.record['components'],arrays))
+        else:
+            attributes = _read_pickle(self.filename('recipe'))
+        #Attributes that were set after the archive was opened are newer than the archive
+        for name,value in attributes.items():
+            meas.__dict__.setdefault(name,value)
+        self.pending.discard(part)
+        return
+
+    def is_unchanged(self,meas,part):
+        """Checks whether a part is still on disk and none of its attributes have been set since the archive was opened"""
+        names = self.array_names if part == 'arrays' else self.recipe_names
+        return part in self.pending and not any([name in meas.__dict__ for name in names])
+
+def _measurement_filename(path,number,part):
+    extension = {'arrays':'.npz','recipe':'.pkl'}[part]
+    return os.path.join(path,'measurements','{:05d}'.format(number) + extension)
+
+def _save_measurement(meas,path,number):
+    """Writes the arrays and the model recipe of one measurement
+
+    :returns: The description of the measurement for project.json
+    :rtype: dict
+    """
+    entry = meas.__dict__.get('_archive')
+    copied = []
+    if entry is not None:
+        for part in ['arrays','recipe']:
+            if entry.is_unchanged(meas,part):
+                copied += [part]
+            elif part in entry.pending:
+                entry._load_part(meas,part)
+
+    scalars,arrays,components,recipe = _split_attributes(meas)
+    record = {'class':_class_name(meas),
+              'scalars':scalars,
+              'arrays':sorted([name for name in arrays if '.' not in name]),
+              'components':components,
+              'recipe':sorted(recipe),
+             }
+
+    if 'arrays' in copied:
+        record['arrays'] = entry.record['arrays']
+        record['components'] = entry.record['components']
+        shutil.copyfile(entry.filename('arrays'),_measurement_filename(path,number,'arrays'))
+    elif arrays:
+        np.savez(_measurement_filename(path,number,'arrays'),**arrays)
+
+    if 'recipe' in copied:
+        record['recipe'] = entry.record['recipe']
+        shutil.copyfile(entry.filename('recipe'),_measurement_filename(path,number,'recipe'))
+    elif recipe:
+        if 'model' in recipe:
+            meas.prepare_for_save()
+        _write_pickle(_measurement_filename(path,number,'recipe'),recipe)
+    return record
+
+def save_archive(project,path):
+    """Saves a project as an archive
+
+    The archive is written next to the old one and only replaces it once it is complete, so an interrupted save does not damage an existing archive.
+
+    :param project: The project
+    :param path: The archive directory
+    :type project: :py:class:`.Project`
+    :type path: str
+    """
+    partial = path + '.partial'
+    if os.path.isdir(partial):
+        shutil.rmtree(partial)
+    os.makedirs(os.path.join(partial,'measurements'))
+
+    #A measurement that appears in more than one list is saved once
+    measurements = []
+    numbers = {}
+    for meas in project.items:
+        if id(meas) not in numbers:
+            numbers[id(meas)] = len(measurements)
+            measurements += [meas]
+
+    records = [_save_measurement(meas,partial,number) for number,meas in enumerate(measurements)]
+
+    lists = {}
+    for list_name in _measurement_lists:
+        meas_list = getattr(project,list_name,None)
+        lists[list_name] = None
+        if meas_list is not None:
+            lists[list_name] = [numbers[id(meas)] for meas in meas_list]
+
+    scalars,arrays,components,others = _split_attributes(project,exclude=_measurement_lists)
+    np.savez(os.path.join(partial,'project.npz'),**arrays)
+    _write_pickle(os.path.join(partial,'project.pkl'),others)
+
+    metadata = {'format':ARCHIVE_FORMAT,
+                'version':ARCHIVE_VERSION,
+                'class':_class_name(project),
+                'scalars':scalars,
+                'components':components,
+                'lists':lists,
+                'measurements':records,
+               }
+    with open(os.path.join(partial,'project.json'),'w') as f:
+        json.dump(metadata,f)
+
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.rename(partial,path)
+
+    #Parts that were copied from the old archive are now read from the new one
+    for number,(meas,record) in enumerate(zip(measurements,records)):
+        entry = meas.__dict__.get('_archive')
+        if entry is not None and entry.pending:
+            entry.path = path
+            entry.number = number
+            entry.record = record
+    return
+
+def load_archive(path):
+    """Opens a project archive
+
+    Only the project files are read. The arrays and the model of each measurement are read the first time that they are used.
+
+    :param path: The archive directory
+    :type path: str
+    :returns: project
+    :rtype: :py:class:`.Project`
+    """
+    with open(os.path.join(path,'project.json'),'r') as f:
+        metadata = json.load(f)
+    if metadata.get('format') != ARCHIVE_FORMAT:
+        raise ValueError(path + ' is not a project archive')
+    if metadata['version'] > ARCHIVE_VERSION:
+        raise ValueError(path + ' was written by a newer version of mumpce')
+
+    measurements = []
+    classes = {}
+    for number,record in enumerate(metadata['measurements']):
+        cls = _find_class(record['class'],classes)
+        meas = cls.__new__(cls)
+        meas.__dict__.update(record['scalars'])
+        entry = MeasurementEntry(path,number,record)
+        if entry.pending:
+            meas._archive = entry
+        measurements += [meas]
+
+    arrays = _read_arrays(os.path.join(path,'project.npz'))
+    cls = _find_class(metadata['class'])
+    project = cls.__new__(cls)
+    project.__dict__.update(metadata['scalars'])
+    project.__dict__.update({name:value for name,value in arrays.items() if '.' not in name})
+    project.__dict__.update(_build_components(metadata['components'],arrays))
+    project.__dict__.update(_read_pickle(os.path.join(path,'project.pkl')))
+    for list_name,numbers in metadata['lists'].items():
+        meas_list = None
+        if numbers is not None:
+            meas_list = [measurements[number] for number in numbers]
+        setattr(project,list_name,meas_list)
+    project._stacks = {}
+    return project
@@ -3,6 +3,9 @@ from abc import ABCMeta, abstractmethod
 import cantera as ct
 import time
 import mumpce
+from mumpce.evaluation_cache import cached_sensitivity,file_digest,settings_fingerprint
+from mechanism_pool import new_solution,parsed_mechanism,copy_reaction
+import parameter_table as pt
 
 #This is added because mumpce may not be in the path and we know that mumpce exists upstairs from cantera_chemistry_model
 #This line is needed for Sphinx autodoc to work. You may need to remove it yourself
@@ -62,6 +65,9 @@ class CanteraChemistryModel(mumpce.Model):
     
     __metaclass__ = ABCMeta
     
+    #Public attributes that do not affect the model value, or that are included in the cache fingerprint separately. Private attributes are never part of the settings
+    _cache_ignore = ('gas','reactor','simulation','initial','model_parameter_info','tqfunc','loglevel','savefile')
+    
     def __init__(self,
                  T,Patm,composition,
                  chemistry_model,**kwargs):
@@ -105,11 +111,17 @@ class CanteraChemistryModel(mumpce.Model):
         self.initialize_chemistry()
         
         #Get the parameters that will be investigated for sensitivity analysis and find how many there are
+        #The parameter table is kept with the parsed chemistry model, so every model built from the same file shares it
         #self.model_parameter_info = self.get_model_parameter_info(no_efficiencies=True,no_energy=True,no_falloff=True)
-        self.model_parameter_info = self.get_model_parameter_info(no_efficiencies=no_efficiencies,
-                                                                  no_energy=no_energy,
-                                                                  no_falloff=no_falloff)
+        mechanism = parsed_mechanism(self.chemistry_model)
+        flags = (no_efficiencies,no_energy,no_falloff)
+        if flags not in mechanism.parameter_tables:
+            mechanism.parameter_tables[flags] = self.get_model_parameter_info(no_efficiencies=no_efficiencies,
+                                                                              no_energy=no_energy,
+                                                                              no_falloff=no_falloff)
+        self.model_parameter_info = mechanism.parameter_tables[flags]
         self.number_parameters = len(self.model_parameter_info)
+        self._rate_multipliers = None
         
         #Blank the chemistry so that the model can be pickled
         self.blank_chemistry()
@@ -119,13 +131,13 @@ class CanteraChemistryModel(mumpce.Model):
         
         This method does the following:
         
-        * Checks to see if a Cantera Solution object exists that defined the thermodynamic state of the Cantera reactor, and creates that object if it does not exist
+        * Checks to see if a Cantera Solution object exists that defined the thermodynamic state of the Cantera reactor, and creates that object if it does not exist. The chemistry model is only read from its file the first time it is used in this process; later Solution objects are built from the copy kept by :py:func:`.new_solution`
         * Sets the state of the Cantera Solution object to the state specified in self.initial
         
         """
-        #If the gas object is blank, create the Cantera solution object
+        #If the gas object is blank, create the Cantera solution object from the parsed chemistry model in the pool
         if self.gas is None:
-            self.gas = ct.Solution(self.chemistry_model)
+            self.gas = new_solution(self.chemistry_model)
         #Set the gas initial condition
         self.gas.TPX = self.initial.T, self.initial.P, self.initial.composition
         return
@@ -150,6 +162,34 @@ class CanteraChemistryModel(mumpce.Model):
         self.gas = None
         self.reactor = None
         self.simulation = None
+        #The chemistry will be re-read from the chemistry model, so no parameters are perturbed
+        self._multipliers = {}
+        self._modified_reactions = set()
+        self._scaled_reactions = set()
+        self._rebuilt_kinetics = False
+    
+    def conditions(self):
+        """Returns the initial temperature in K and pressure in Pa, as {'T':T,'P':P}
+        """
+        return {'T':self.initial.T,'P':self.initial.P}
+    
+    def cache_fingerprint(self):
+        """Returns everything that determines the model value, for use as a key in the :py:class:`.EvaluationCache`
+        
+        The fingerprint consists of the model class, a hash of the contents of the chemistry model file, the initial state, the model's other settings, and the multiplier of every parameter that has been perturbed since the chemistry was last read.
+        
+        :returns: fingerprint
+        :rtype: list
+        """
+        multipliers = getattr(self,'_multipliers',{})
+        perturbed = sorted([(param_id,multiplier) for param_id,multiplier in multipliers.items() if abs(multiplier - 1) > 1.0e-12])
+        initial_state = (self.initial.T,self.initial.P,self.initial.composition)
+        return [type(self).__name__,
+                file_digest(self.chemistry_model),
+                initial_state,
+                settings_fingerprint(self,self._cache_ignore),
+                perturbed,
+               ]
     
     def load_restart(self,filename=None,solution_name=None):
         """Load a previously-saved solution from a restart file.
@@ -186,41 +226,30 @@ class CanteraChemistryModel(mumpce.Model):
         :returns: parameter_value
         :rtype: float
         """   
-        param_info = self.model_parameter_info[parameter_id]
-        reaction_number = param_info['reaction_number']
-        parameter_type = param_info['parameter_type']
-        parameter_value_base = param_info['parameter_value']
-
-        #print param_info
-        #print parameter_type
+        parameter_table = self._parameter_table()
+        reaction_number = int(parameter_table.reaction_numbers[parameter_id])
+        parameter_type = parameter_table.types[parameter_id]
+        parameter_value_base = parameter_table.values[parameter_id]
+        
+        #A-factors are perturbed through the reaction's rate multiplier
+        if self._rate_multiplier_parameters()[1][parameter_id]:
+            return self.gas.multiplier(reaction_number)
 
         reaction = self.gas.reaction(reaction_number)
-        rtype = reaction.reaction_type
-        #print rtype
 
-        pressurestring = 'pressure'
-        HasFallOff = False
-        if pressurestring in parameter_type:
-            HasFallOff = True
-        if HasFallOff:
-            highrate = reaction.high_rate
-            lowrate = reaction.low_rate
-            if 'High' in parameter_type:
-                if 'A' in parameter_type:
-                    parameter_value = highrate.pre_exponential_factor
-                if 'E' in parameter_type:
-                    parameter_value = highrate.activation_energy
-            if 'Low' in parameter_type:
-                if 'A' in parameter_type:
-                    parameter_value = lowrate.pre_exponential_factor
-                if 'E' in parameter_type:
-                    parameter_value = lowrate.activation_energy
+        if parameter_type == pt.EFFICIENCY:
+            parameter_value = reaction.efficiency(parameter_table.species[parameter_id])
         else:
-            rate = reaction.rate
-            if 'A' in parameter_type:
+            if parameter_type in (pt.HIGH_PRESSURE_A,pt.HIGH_PRESSURE_E):
+                rate = reaction.high_rate
+            elif parameter_type in (pt.LOW_PRESSURE_A,pt.LOW_PRESSURE_E):
+                rate = reaction.low_rate
+            else:
+                rate = reaction.rate
+            if parameter_type in pt.A_TYPES:
                 parameter_value = rate.pre_exponential_factor
-            if 'E' in parameter_type:
-                parameter_value = rate.activation_energy        
+            else:
+                parameter_value = rate.activation_energy
         
         multiplier = parameter_value/parameter_value_base
         
@@ -229,52 +258,64 @@ class CanteraChemistryModel(mumpce.Model):
     def perturb_parameter(self,parameter_id,perturbation):
         """Replaces a model parameter's value by a new value.
 
-        This will multiply a reaction's pre-exponential factor or activation energy by a specified factor.
+        This will multiply a reaction's pre-exponential factor or activation energy by a specified factor. A pre-exponential factor that scales the whole rate constant, which is any A-factor except those of falloff reactions whose high- and low-pressure limits are treated separately, is set through the reaction's rate multiplier instead of by modifying the reaction. Cantera does not change the third-body efficiencies of a reaction that is modified in place, so changing an efficiency re-creates the Cantera Solution object from its current reactions. Reactor and simulation objects made before that still use the old Solution object.
 
         :param parameter_id: The parameter identifier. 
         :type parameter_id: int
         :param new_value: The amount to change the parameters value.
         :type new_value: float
         """
-        param_info = self.model_parameter_info[parameter_id]
-        reaction_number = param_info['reaction_number']
-        parameter_type = param_info['parameter_type']
-        new_value = param_info['parameter_value']*perturbation
-
-        #print param_info
-        #print parameter_type
+        parameter_table = self._parameter_table()
+        reaction_number = int(parameter_table.reaction_numbers[parameter_id])
+        parameter_type = parameter_table.types[parameter_id]
+        new_value = parameter_table.values[parameter_id]*perturbation
+        is_A = parameter_type in pt.A_TYPES
+        is_E = parameter_type in pt.ENERGY_TYPES
+        
+        #Record the multiplier so that the evaluation cache can tell this state from others
+        if getattr(self,'_multipliers',None) is None:
+            self._multipliers = {}
+        self._multipliers[parameter_id] = perturbation
+        
+        if self._rate_multiplier_parameters()[1][parameter_id]:
+            self._set_rate_multiplier(reaction_number,perturbation)
+            return
+        
+        #Record the reaction so that reset_model can restore it
+        if getattr(self,'_modified_reactions',None) is None:
+            self._modified_reactions = set()
+        self._modified_reactions.add(reaction_number)
 
         reaction = self.gas.reaction(reaction_number)
-        rtype = reaction.reaction_type
-        #print rtype 
-        #print reaction.rate
-
-        rxn_eq = reaction.equation
         
         time_start = time.time()
  
-        pressurestring = 'pressure'
         HasFallOff = False
         PerturbLow = False
         #Check if this is a falloff reaction
-        if pressurestring in parameter_type:
+        if parameter_type in pt.FALLOFF_TYPES:
             HasFallOff = True
-        if HasFallOff:
+        if parameter_type == pt.EFFICIENCY:
+            #Third-body efficiency
+            efficiencies = dict(reaction.efficiencies)
+            efficiencies[parameter_table.species[parameter_id]] = new_value
+            reaction.efficiencies = efficiencies
+        elif HasFallOff:
             highrate = reaction.high_rate
             lowrate = reaction.low_rate
             #Check to see if this is the high-pressure rate constant
-            if 'High' in parameter_type:
+            if parameter_type in (pt.HIGH_PRESSURE_A,pt.HIGH_PRESSURE_E):
                 A = highrate.pre_exponential_factor
                 b = highrate.temperature_exponent
                 E = highrate.activation_energy
-                if 'A' in parameter_type:
+                if is_A:
                     A = new_value
                     #perturbation = new_value/A # We need to know what the perturbation is
-                if 'E' in parameter_type:
+                if is_E:
                     E = new_value
                 reaction.high_rate = ct.Arrhenius(A,b,E)
             #Check to see if this is the low-pressure rate constant
-            if 'Low' in parameter_type:
+            if parameter_type in (pt.LOW_PRESSURE_A,pt.LOW_PRESSURE_E):
                 PerturbLow = True
             #If we are not treating the high- and low-pressure rate constants separately, then perturb the low-pressure rate constant, too
             if self.no_falloff:
@@ -283,13 +324,13 @@ class CanteraChemistryModel(mumpce.Model):
                 A = lowrate.pre_exponential_factor
                 b = lowrate.temperature_exponent
                 E = lowrate.activation_energy
-                if 'A' in parameter_type:
-                    if 'Low' in parameter_type: #Just replace the A factor with the new value
+                if is_A:
+                    if parameter_type == pt.LOW_PRESSURE_A: #Just replace the A factor with the new value
                         A = new_value
                     else: #Perturb the low-pressure A by the same factor as the high-pressure A
-                        new_low_A = param_info['parameter_low']*perturbation 
+                        new_low_A = parameter_table.low_values[parameter_id]*perturbation 
                         A = new_low_A
-                if 'E' in parameter_type:
+                if is_E:
                     E = new_value #If activation energies are present, high- and low-pressure rates are optimized separately
                 reaction.low_rate = ct.Arrhenius(A,b,E)    
         else:
@@ -298,9 +339,9 @@ class CanteraChemistryModel(mumpce.Model):
             A = rate.pre_exponential_factor
             b = rate.temperature_exponent
             E = rate.activation_energy
-            if 'A' in parameter_type:
+            if is_A:
                 A = new_value
-            if 'E' in parameter_type:
+            if is_E:
                 E = new_value
             reaction.rate = ct.Arrhenius(A,b,E)
         
@@ -311,6 +352,9 @@ class CanteraChemistryModel(mumpce.Model):
         
         #print reaction.rate
         self.gas.modify_reaction(reaction_number,reaction)
+        if parameter_type == pt.EFFICIENCY:
+            #Cantera does not change the third-body efficiencies of a reaction that is modified in place
+            self._rebuild_kinetics()
         time_to_modify = time.time()
         #print('time to modify reaction ',time_to_modify-time_to_prep)
         #print cti_type
@@ -319,6 +363,79 @@ class CanteraChemistryModel(mumpce.Model):
         #print eff_string
         #print rxn_string
     
+    def perturb_parameters(self,parameter_ids,perturbations):
+        """Multiplies several model parameters by specified factors at once
+        
+        The A-factors that scale the whole rate constant are set through Cantera's rate multipliers, without creating or modifying any reaction objects. Only activation energies and the separate high- and low-pressure A-factors of falloff reactions are perturbed by :func:`perturb_parameter`.
+        
+        :param parameter_ids: The parameter identifiers
+        :param perturbations: The factor by which to multiply each parameter's original value
+        :type parameter_ids: array_like of ints
+        :type perturbations: array_like of floats
+        """
+        parameter_ids = np.asarray(parameter_ids,dtype=int)
+        perturbations = np.asarray(perturbations,dtype=float)
+        if self.gas is None:
+            self.initialize_chemistry()
+        reaction_numbers,scales_rate = self._rate_multiplier_parameters()
+        
+        #Set the rate multipliers all at once
+        by_multiplier = scales_rate[parameter_ids]
+        for reaction_number,perturbation in zip(reaction_numbers[parameter_ids[by_multiplier]].tolist(),
+                                                perturbations[by_multiplier].tolist()):
+            self.gas.set_multiplier(perturbation,reaction_number)
+        if getattr(self,'_multipliers',None) is None:
+            self._multipliers = {}
+        self._multipliers.update(zip(parameter_ids[by_multiplier].tolist(),perturbations[by_multiplier].tolist()))
+        if getattr(self,'_scaled_reactions',None) is None:
+            self._scaled_reactions = set()
+        self._scaled_reactions.update(reaction_numbers[parameter_ids[by_multiplier]].tolist())
+        
+        #Everything else requires modifying the reaction
+        for parameter_id,perturbation in zip(parameter_ids[~by_multiplier].tolist(),perturbations[~by_multiplier].tolist()):
+            self.perturb_parameter(parameter_id,perturbation)
+        return
+    
+    def _rate_multiplier_parameters(self):
+        """Returns the reaction number of every parameter and whether each parameter is perturbed through its reaction's rate multiplier
+        
+        An A-factor scales the whole rate constant, and so can be perturbed by the rate multiplier, unless it is one limit of a falloff reaction whose limits are treated separately. When no_falloff is True, the low-pressure A-factor is perturbed with the high-pressure one, so the rate constant of the falloff reaction is also scaled.
+        """
+        if getattr(self,'_rate_multipliers',None) is None:
+            parameter_table = self._parameter_table()
+            scales_rate = parameter_table.type_mask(pt.A_FACTOR)
+            if self.no_falloff:
+                scales_rate |= parameter_table.type_mask(pt.HIGH_PRESSURE_A)
+            self._rate_multipliers = (parameter_table.reaction_numbers,scales_rate)
+        return self._rate_multipliers
+    
+    def _parameter_table(self):
+        #Models saved before the parameter table existed hold a list of dicts
+        if not isinstance(self.model_parameter_info,pt.ParameterTable):
+            self.model_parameter_info = pt.as_parameter_table(self.model_parameter_info)
+        return self.model_parameter_info
+    
+    def _rebuild_kinetics(self):
+        #Make a new Solution object from the current, possibly modified, reactions, keeping the state and the rate multipliers
+        gas = self.gas
+        kwargs = {}
+        if gas.transport_model not in (None,'None',''):
+            kwargs['transport_model'] = gas.transport_model
+        self.gas = ct.Solution(thermo=gas.thermo_model,kinetics=gas.kinetics_model,
+                               species=gas.species(),reactions=gas.reactions(),**kwargs)
+        self.gas.TPX = gas.T, gas.P, gas.X
+        for reaction_number in getattr(self,'_scaled_reactions',()):
+            self.gas.set_multiplier(gas.multiplier(reaction_number),reaction_number)
+        self._rebuilt_kinetics = True
+        return
+    
+    def _set_rate_multiplier(self,reaction_number,perturbation):
+        self.gas.set_multiplier(perturbation,reaction_number)
+        if getattr(self,'_scaled_reactions',None) is None:
+            self._scaled_reactions = set()
+        self._scaled_reactions.add(reaction_number)
+        return
+    
 #     def _perturb_parameter(self,parameter_id,new_value):
 #         """Replaces a model parameter's value by a new value.
 
@@ -412,9 +529,31 @@ class CanteraChemistryModel(mumpce.Model):
     def reset_model(self):
         """Reset all model parameters to their original values
         
-        This version works by erasing the chemistry and re-initializing it from the CTI file.
+        Only the reactions changed by :func:`perturb_parameter` since the last reset are restored, and only their rate multipliers are set back to 1, from the unmodified reactions kept in the chemistry model pool. The Cantera Solution object is kept, so the cost of a reset depends on the number of modified reactions and not on the size of the chemistry model. The reactor and simulation objects are erased and will be re-created from the restored chemistry. If a third-body efficiency has been changed, the Cantera Solution object is instead re-created from the chemistry model pool.
         """
-        self.blank_chemistry()
+        if self.gas is None:
+            self.blank_chemistry()
+            self.initialize_chemistry()
+            return
+        
+        if getattr(self,'_rebuilt_kinetics',False):
+            #Third-body efficiencies have been changed, which cannot be undone in place
+            self.blank_chemistry()
+            self.initialize_chemistry()
+            return
+        
+        baseline = parsed_mechanism(self.chemistry_model)
+        for reaction_number in sorted(getattr(self,'_modified_reactions',())):
+            #Restore a copy, so that later perturbations of this model cannot change the reaction in the pool
+            self.gas.modify_reaction(reaction_number,copy_reaction(baseline.reactions[reaction_number]))
+        self._modified_reactions = set()
+        for reaction_number in getattr(self,'_scaled_reactions',()):
+            self.gas.set_multiplier(1.0,reaction_number)
+        self._scaled_reactions = set()
+        self._multipliers = {}
+        
+        self.reactor = None
+        self.simulation = None
         self.initialize_chemistry()
         return
     
@@ -545,50 +684,26 @@ class CanteraChemistryModel(mumpce.Model):
         :param no_energies: If True, then do not consider activation energies as active parameters
         :param no_falloff: If True, then do not consider high- and low-pressure limits as active parameters
         :returns: model_parameter_info
-        :rtype: list of dicts
+        :rtype: :py:class:`.ParameterTable`
         """
-        #Initialize the Cantera model
-        model = ct.Solution(self.chemistry_model)
-        #Initialize the model parameter info lists
+        #Get the Cantera model from the pool. It is only read from, so no new Solution object is needed
+        model = parsed_mechanism(self.chemistry_model).template
+        #Initialize the model parameter info list
         model_parameter_info_full = []
-        model_parameter_info = []
         
         #Get the list of possibly-active model parameters
         for reaction_num in range(model.n_reactions):
             reaction = model.reaction(reaction_num)
             reac_info = self.get_reaction_info(reaction_num,reaction)
             model_parameter_info_full += reac_info
-        for param_info in model_parameter_info_full:
-            include_this_parameter = True
-            if no_efficiencies:
-                if param_info['parameter_type'] == 'Efficiency':
-                    include_this_parameter = False
-            #else:
-            #    if param_info[1] == 'Efficiency':
-            #        if not(param_info[2] > 0):
-            #            include_this_parameter = False
-            if no_energy:
-                #We are not perturbing activation energies, so don't consider anything that looks like an activation energy
-                if param_info['parameter_type'] == 'Energy':
-                    include_this_parameter = False
-                if param_info['parameter_type'] == 'Low_pressure_E':
-                    include_this_parameter = False
-                if param_info['parameter_type'] == 'High_pressure_E':
-                    include_this_parameter = False
-            if no_falloff:
-                #We are not perturbing falloff parameters, so don't consider activation energies or low-pressure A factors (low-pressure A factor will be forced to perturb with the high-pressure A factor)
-                if param_info['parameter_type'] == 'Low_pressure_A':
-                    include_this_parameter = False
-                if param_info['parameter_type'] == 'Low_pressure_E':
-                    include_this_parameter = False
-                if param_info['parameter_type'] == 'High_pressure_E':
-                    include_this_parameter = False
-            if include_this_parameter:
-                model_parameter_info += [param_info]
-            #print param_info
-        #model_parameter_info = np.array(model_parameter_info)
+        #Keep the parameters of the kinds that are being considered
+        parameter_table = pt.ParameterTable.from_records(model_parameter_info_full)
+        model_parameter_info = parameter_table.select(no_efficiencies=no_efficiencies,
+                                                      no_energy=no_energy,
+                                                      no_falloff=no_falloff).shared()
         return model_parameter_info
     
+    @cached_sensitivity
     def sensitivity(self,perturbation,parameter_list,logfile,tq=True):
         """Evaluates the sensitivity of the model value with respect to the model parameters
         
@@ -1,4 +1,5 @@
 from cantera_chemistry_model import CanteraChemistryModel
+from mumpce.evaluation_cache import cached_evaluation,cached_sensitivity
 import numpy as np
 import cantera as ct
 
@@ -76,6 +77,12 @@ class FlameSpeed(CanteraChemistryModel):
         
         return
     
+    def cache_fingerprint(self):
+        """Returns the fingerprint of :py:func:`.CanteraChemistryModel.cache_fingerprint` and the initial grid, which is a private attribute
+        """
+        return super(FlameSpeed,self).cache_fingerprint() + [self._initial_grid]
+    
+    @cached_evaluation
     def evaluate(self):
         """Compute the laminar flame speed
         
@@ -190,6 +197,7 @@ class FlameSpeed(CanteraChemistryModel):
         
         return value,sensitivity_vector        
     
+    @cached_sensitivity
     def sensitivity(self,perturbation,parameter_list,logfile,tq=True):
         """Evaluates the sensitivity of the model value with respect to the model parameters
         
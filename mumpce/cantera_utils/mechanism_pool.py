@@ -0,0 +1,135 @@
+"""A process-wide pool of parsed chemistry models.
+
+Reading a large chemistry model file takes far longer than any single use of it, and every :py:class:`.CanteraChemistryModel` in a project normally reads the same file. The first time that a chemistry model is requested, it is parsed once and its species and reactions are kept. Each later request builds a new Cantera Solution object from those species and from private copies of those reactions, so no file is read and a change to one model's reactions cannot reach the pool or any other model.
+
+Entries are keyed by the path of the chemistry model file and a hash of its contents, from :py:func:`.file_digest`, so an edited file is read again. The pool belongs to the process, so each worker process of a parallel run keeps its own.
+
+"""
+import os
+import cantera as ct
+from mumpce.evaluation_cache import file_digest
+
+#The parsed chemistry models, keyed by (path,content hash)
+_mechanisms = {}
+
+class ParsedMechanism(object):
+    """The parsed contents of one chemistry model file.
+
+    :param chemistry_model: The chemistry model. Must be a chemistry model that can be used to make a Cantera phase object
+    :type chemistry_model: str
+
+    """
+    def __init__(self,chemistry_model):
+        self.chemistry_model = chemistry_model
+        #This is the only time that the file is read
+        template = ct.Solution(chemistry_model)
+        self.template = template #: The Cantera Solution object read from the file. It must not be modified
+        self.species = template.species() #: The Cantera Species objects
+        self.reactions = template.reactions() #: The Cantera Reaction objects, from which every new Solution object is copied
+        self.transport_model = getattr(template,'transport_model',None)
+        self.parameter_tables = {} #: The :py:class:`.ParameterTable` of this chemistry model for each set of (no_efficiencies,no_energy,no_falloff) flags
+        return
+
+    def solution(self):
+        """Creates a new Cantera Solution object for this chemistry model, with the thermodynamic, kinetics and transport models of the phase read from the file
+        
+        :rtype: :py:class:`cantera.Solution`
+        """
+        kwargs = {}
+        if self.transport_model not in (None,'None',''):
+            kwargs['transport_model'] = self.transport_model
+        return ct.Solution(thermo=self.template.thermo_model,
+                           kinetics=self.template.kinetics_model,
+                           species=self.species,
+                           reactions=[copy_reaction(reaction) for reaction in self.reactions],
+                           **kwargs)
+
+def _key(chemistry_model):
+    path = chemistry_model
+    if os.path.isfile(chemistry_model):
+        path = os.path.abspath(chemistry_model)
+    return (path,file_digest(chemistry_model))
+
+def parsed_mechanism(chemistry_model):
+    """Returns the parsed contents of a chemistry model, reading the file only if it is not already in the pool
+
+    :param chemistry_model: The chemistry model. Must be a chemistry model that can be used to make a Cantera phase object
+    :type chemistry_model: str
+    :rtype: :py:class:`ParsedMechanism`
+    """
+    key = _key(chemistry_model)
+    if key not in _mechanisms:
+        #An older version of the same file will not be asked for again
+        for old_key in [old_key for old_key in _mechanisms if old_key[0] == key[0]]:
+            del _mechanisms[old_key]
+        _mechanisms[key] = ParsedMechanism(chemistry_model)
+    return _mechanisms[key]
+
+def new_solution(chemistry_model):
+    """Creates a Cantera Solution object for a chemistry model from the pool
+
+    This can be used anywhere ct.Solution(chemistry_model) would be.
+
+    :param chemistry_model: The chemistry model. Must be a chemistry model that can be used to make a Cantera phase object
+    :type chemistry_model: str
+    :rtype: :py:class:`cantera.Solution`
+    """
+    return parsed_mechanism(chemistry_model).solution()
+
+def clear_pool():
+    """Removes every chemistry model from the pool"""
+    _mechanisms.clear()
+    return
+
+def copy_reaction(reaction):
+    """Makes a new Cantera Reaction object with the same reactants, products, and rate parameters as an existing one
+    
+    Elementary, three-body, falloff, chemically activated, pressure-dependent Arrhenius, and Chebyshev reactions are copied. No other reaction type can be part of an ideal gas chemistry model, so any other reaction is returned unchanged.
+    
+    :param reaction: The reaction
+    :type reaction: Cantera reaction object
+    :returns: new_reaction
+    :rtype: Cantera reaction object
+    """
+    rtype = reaction.reaction_type
+    #The reactants and products are given as composition maps, such as {'H':1,'O2':1}
+    reactants = dict(reaction.reactants)
+    products = dict(reaction.products)
+    if rtype == 1:
+        new_reaction = ct.ElementaryReaction(reactants=reactants,products=products)
+    elif rtype == 2:
+        new_reaction = ct.ThreeBodyReaction(reactants=reactants,products=products)
+    elif rtype == 4:
+        new_reaction = ct.FalloffReaction(reactants=reactants,products=products)
+    elif rtype == 5:
+        new_reaction = ct.PlogReaction(reactants=reactants,products=products)
+    elif rtype == 6:
+        new_reaction = ct.ChebyshevReaction(reactants=reactants,products=products)
+    elif rtype == 8:
+        new_reaction = ct.ChemicallyActivatedReaction(reactants=reactants,products=products)
+    else:
+        return reaction
+    
+    new_reaction.reversible = reaction.reversible
+    new_reaction.duplicate = reaction.duplicate
+    new_reaction.orders = dict(reaction.orders)
+    new_reaction.ID = reaction.ID
+    new_reaction.allow_negative_orders = reaction.allow_negative_orders
+    new_reaction.allow_nonreactant_orders = reaction.allow_nonreactant_orders
+    if rtype == 1:
+        new_reaction.rate = reaction.rate
+        new_reaction.allow_negative_pre_exponential_factor = reaction.allow_negative_pre_exponential_factor
+    elif rtype == 2:
+        new_reaction.rate = reaction.rate
+    elif rtype == 5:
+        new_reaction.rates = reaction.rates
+    elif rtype == 6:
+        new_reaction.set_parameters(reaction.Tmin,reaction.Tmax,reaction.Pmin,reaction.Pmax,reaction.coeffs)
+    else:
+        new_reaction.high_rate = reaction.high_rate
+        new_reaction.low_rate = reaction.low_rate
+        new_reaction.falloff = reaction.falloff
+    if rtype in (2,4,8):
+        new_reaction.efficiencies = dict(reaction.efficiencies)
+        new_reaction.default_efficiency = reaction.default_efficiency
+    return new_reaction
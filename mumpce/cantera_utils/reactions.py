@@ -11,9 +11,11 @@ class RxnMeasurement(mumpce.Measurement):
     
     """
     
-    def make_response(self):
+    def make_response(self,resume=True):
         """Generates a sensitivity_analysis_based response surface for this measurement
         
+        Only one sensitivity analysis is needed, so there is nothing to checkpoint and resume is ignored. It is accepted so that this method can be called in the same way as :py:func:`.Measurement.make_response`.
+        
         Because there is an analytical solution, perturbations are not necessary for most reaction rate parameters. If the reaction rate is  given by:
         
         .. math::
@@ -42,13 +44,12 @@ class RxnMeasurement(mumpce.Measurement):
         #zero_term = self.evaluate
         self.model.reset_model()
         logfile_name = self.name + '_resp_log.out'
-        response_logfile = open(logfile_name,'w')
-        
-        sensitivity_args = (self.response_sensitivity,
-                           self.active_parameters,
-                           response_logfile)
-        
-        zero_term, sens_zero = self.model.sensitivity(*sensitivity_args)
+        with open(logfile_name,'w') as response_logfile:
+            sensitivity_args = (self.response_sensitivity,
+                               self.active_parameters,
+                               response_logfile)
+            
+            zero_term, sens_zero = self.model.sensitivity(*sensitivity_args)
         
         if self.response_type == 'log':
             zero_term = np.log(zero_term)
@@ -167,8 +167,7 @@ class ShockTube(CanteraChemistryModel):
     def reset_model(self):
         """Reset all model parameters to their original values
         
-        This version works by erasing the chemistry and re-initializing it from the CTI file.
+        Only the modified reactions are restored, as in :py:func:`.CanteraChemistryModel.reset_model`. The reactor is re-created from the restored chemistry by :func:`initialize_reactor` at the next evaluation.
         """
-        self.blank_chemistry()
-        self.initialize_chemistry()
+        super(ShockTube,self).reset_model()
         return
@@ -1,5 +1,6 @@
 #from shock_tube_base import shock_tube
 import shock_tube_base as stb
+from mumpce.evaluation_cache import cached_evaluation
 import numpy as np
 import cantera as ct
 import copy
@@ -23,21 +24,27 @@ class ShockTubeDelay(stb.ShockTube):
     :keyword critical_value: The value of the critical species mole fraction at which integration will stop, if the ignition event is defined as the critical species reaching a certain concentration. Not used otherwise.
     :keyword critical_rise: Whether the delay event is defined by the critical species rising above or falling below critical_value
     :keyword initial_timestep: The initial timestep for integrating the reactor. Default 10 microseconds
+    :keyword evaluation_mode: How :func:`evaluate` finds the delay. 'march' (default) marches with fixed timesteps that are repeatedly halved. 'adaptive' integrates once with the reactor network's own timesteps, see :func:`adaptive_delay`
     :type critical_function: function
     :type crit_ID: str
     :type critical_value: float
     :type critical_rise: str
     :type initial_timestep: float
+    :type evaluation_mode: str
     
     """
     def __init__(self,
                  T,Patm,composition,
                  reactor_model,chemistry_model,
                  critical_function,crit_ID=None,critical_value=None,critical_rise=None,
-                 initial_timestep=1.0e-5,loglevel=None,**kwargs):
+                 initial_timestep=1.0e-5,loglevel=None,evaluation_mode='march',**kwargs):
         
         super(ShockTubeDelay,self).__init__(T,Patm,composition,reactor_model,chemistry_model,loglevel,**kwargs)
         
+        if evaluation_mode not in ('march','adaptive'):
+            raise ValueError('Unknown evaluation mode ' + str(evaluation_mode) + ', must be march or adaptive')
+        self.evaluation_mode = evaluation_mode
+        
         self.critical_ID = crit_ID
         #self.critical_denominator = crit_denom
         self.critical = critical_function 
@@ -222,10 +229,11 @@ class ShockTubeDelay(stb.ShockTube):
                 
             
     
+    @cached_evaluation
     def evaluate(self):
         """Finds the ignition delay time
         
-        Computes the ignition delay time with an iterative procedure. First, the delay time is found to within a precision of self.initial_timestep. Then, the reactor moves back two timesteps, halves the size of the timestep, and repeats until the ignition delay time is found to within one part in :math:`10^-5` of the initial timestep. If the default timestep is :math:`10^-5` s, then the final precision is :math:`10^-10` s
+        If self.evaluation_mode is 'adaptive', the delay is found by :func:`adaptive_delay`. Otherwise, computes the ignition delay time with an iterative procedure. First, the delay time is found to within a precision of self.initial_timestep. Then, the reactor moves back two timesteps, halves the size of the timestep, and repeats until the ignition delay time is found to within one part in :math:`10^-5` of the initial timestep. If the default timestep is :math:`10^-5` s, then the final precision is :math:`10^-10` s
         
         If you know that the initial timestep was not set wisely, you can automatically compute one using self.optimal_timestep().
         
@@ -239,6 +247,9 @@ class ShockTubeDelay(stb.ShockTube):
         #Initialize the reactor
         self.initialize_reactor()
         
+        if getattr(self,'evaluation_mode','march') == 'adaptive':
+            return self.adaptive_delay()
+        
         #Determine the timestep to start and the desired precision
         timestep = self.initial_timestep
         precision = timestep * 1.0e-5
@@ -290,6 +301,75 @@ class ShockTubeDelay(stb.ShockTube):
         
         return delay
     
+    def adaptive_delay(self):
+        """Finds the ignition delay time in a single pass with the reactor network's adaptive timesteps
+        
+        The reactor is integrated once with :py:func:`cantera.ReactorNet.step`, and the critical function is evaluated after every internal step. Timesteps are limited to self.initial_timestep, and the integrator makes them much smaller than that near ignition.
+        
+        * If the critical function defines the delay as a crossing, as :func:`target_concentration` does, integration stops at the first step at which the criterion is met and the crossing time is interpolated linearly between that step and the one before.
+        * Otherwise, as for :func:`critical_species_production` and :func:`pressure_rise`, the delay is the time at which the critical function is largest. Integration continues for 200 initial timesteps past the largest value seen so far, the same period over which the marching method looks for a later, larger peak. If the largest value is reached at several steps, the first is used. The time of the maximum is interpolated by a parabola through the largest recorded value and its neighbours, and is kept between the times of those neighbours.
+        
+        As in the marching method, the first min(3*initial_timestep,10 us) of integration cannot contain the delay. A RuntimeError is raised if no delay is found within :math:`10^5` initial timesteps.
+        
+        :returns: Ignition delay time in microseconds
+        :rtype: float
+        """
+        if self.reactor is None:
+            self.initialize_reactor()
+        self.simulation.max_time_step = self.initial_timestep
+        
+        min_run_time = min(self.initial_timestep*3,1.0e-5)
+        lookahead = 200 * self.initial_timestep
+        max_time = 1.0e5 * self.initial_timestep
+        keep_going,crit,crossing = self.critical(self,0,check_breakout=True)
+        
+        times = [0.0]
+        values = [float(np.squeeze(crit))]
+        peak = 0
+        time = 0.0
+        
+        while True:
+            last_time = time
+            time = self.simulation.step()
+            keep_going,crit = self.critical(self,values[-1])
+            times += [time]
+            values += [float(np.squeeze(crit))]
+            
+            if not(self.loglevel is None):
+                print (self._print_format % (time,time - last_time,
+                                             self.reactor.thermo.T, self.reactor.thermo.P,
+                                             crit,time - last_time
+                                            )
+                      )
+            
+            if time > max_time:
+                raise RuntimeError('No ignition found within ' + str(max_time) + ' s for ' + str(self))
+            if time < min_run_time:
+                #Neither a crossing nor a maximum is accepted this early
+                peak = len(values) - 1
+                continue
+            if crossing:
+                if not keep_going:
+                    #Interpolate between the last two steps to where the critical value is crossed
+                    fraction = 1.0
+                    if values[-1] != values[-2]:
+                        fraction = (self.critical_value - values[-2])/(values[-1] - values[-2])
+                    delay = times[-2] + min(max(fraction,0.0),1.0)*(times[-1] - times[-2])
+                    break
+            else:
+                #Only a strictly larger value moves the peak, so a flat top keeps the first time it was reached
+                if values[-1] > values[peak] or times[peak] < min_run_time:
+                    peak = len(values) - 1
+                if time > times[peak] + lookahead:
+                    #The steps around the peak can be very uneven, so the vertex is kept between the neighbouring steps
+                    delay = _parabola_vertex(times[peak - 1:peak + 2],values[peak - 1:peak + 2])
+                    delay = min(max(delay,times[peak - 1]),times[peak + 1])
+                    break
+        
+        delay = float(delay / 1.0e-6) # Convert from seconds to microseconds
+        
+        return delay
+    
     def optimal_timestep(self):
         """Compute an optimal initial timestep for this measurement, as the default may be too large or too small. Saves the result in self.inital_timestep"""
         delay = self.evaluate()
@@ -335,6 +415,7 @@ class ShockTubeConcentration(stb.ShockTube):
         #modelstr = 'Specified mole frac: ' + str(self.initial.T) + ' K, ' + str(self.initial.P) + ' Pa ' + str(self.initial.composition) + ', ' + self.critical_ID + ' at ' + self.integration_time + ' seconds'
         return modelstr
     
+    @cached_evaluation
     def evaluate(self):
         """Calculates the concentration of the critical species at the specified integration time
         
@@ -404,6 +485,7 @@ class ShockTubeRatio(stb.ShockTube):
         
 #        modelstr = 'Concentration ratio: ' + str(self.initial.T) + ' K, ' + str(self.initial.P) + ' Pa ' + str(self.initial.composition) + ', [' + self.critical_numerator +']/[' + self.critical_denominator + '] at ' + self.integration_time + ' seconds'
         return modelstr
+    @cached_evaluation
     def evaluate(self):
         """Compute the concentration of the critical species
         
@@ -425,6 +507,20 @@ class ShockTubeRatio(stb.ShockTube):
         return ratio#[0]
     
     
+def _parabola_vertex(times,values):
+    """Returns the time of the extremum of the parabola through three (time,value) points, or the middle time if the points are not three distinct points around an extremum"""
+    if len(times) < 3:
+        return times[-1] if len(times) < 2 else times[1]
+    (t0,t1,t2),(v0,v1,v2) = times,values
+    denominator = (t0 - t1)*(t0 - t2)*(t1 - t2)
+    if denominator == 0:
+        return t1
+    a = (t2*(v1 - v0) + t1*(v0 - v2) + t0*(v2 - v1))/denominator
+    b = (t2**2*(v0 - v1) + t1**2*(v2 - v0) + t0**2*(v1 - v2))/denominator
+    if a >= 0:
+        return t1
+    return min(max(-b/(2*a),t0),t2)
+    
 def generic_critical_function(measurement,critical_last):
     """A generic function to define whether the ignition delay criterion has been satisfied for use with the :func:`shock_tube_delay` class
     
@@ -0,0 +1,296 @@
+"""A persistent cache of model evaluations.
+
+The results of :py:func:`.Model.evaluate` and :py:func:`.Model.sensitivity` are stored in a SQLite database on disk, keyed by a hash of everything that determines them: the model class, its settings, the contents of its input files, its initial state, and the current values of its parameters. The same evaluation is then only run once, even across notebook restarts, changes of the active parameters, and worker processes.
+
+Caching is turned off by default. To turn it on for every model, set the class attribute::
+
+   mumpce.Model.evaluation_cache = mumpce.EvaluationCache('evaluations.sqlite')
+
+or set the evaluation_cache attribute of a single model. A model is only cached if it defines :py:func:`.Model.cache_fingerprint`, and only the methods decorated with :py:func:`cached_evaluation` or :py:func:`cached_sensitivity` use the cache. Arrays, numbers, strings, containers of these, classes, and module-level functions are hashed by their contents or names. A fingerprint that holds anything else, such as a lambda or an instance of some other class, cannot be told apart from another of the same type, so that model's results are not cached.
+
+"""
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import inspect
+import types
+import functools
+import numpy as np
+
+class EvaluationCache(object):
+    """An on-disk, size-bounded store of model evaluation results.
+
+    Results are kept in a SQLite database so that several processes can share the same cache. When the stored results take up more than max_bytes, the least recently used results are deleted.
+
+    :key filename: The SQLite database file. It is created if it does not exist
+    :key max_bytes: The largest total size of the stored results, in bytes
+    :type filename: str
+    :type max_bytes: int
+
+    """
+    def __init__(self,filename='mumpce_cache.sqlite',max_bytes=2**30):
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+        #: The number of lookups that found a stored result in this process
+        self.hits = 0
+        #: The number of lookups that did not find a stored result in this process
+        self.misses = 0
+        #: The number of results stored by this process
+        self.stores = 0
+        #: The number of results deleted by this process to keep the cache under max_bytes
+        self.evictions = 0
+
+        self._connection = None
+        self._pid = None
+        return
+
+    def __getstate__(self):
+        #The database connection cannot be pickled, so it is reopened when it is next needed
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pid'] = None
+        return state
+
+    def _connect(self):
+        """Returns the database connection for this process, creating the database if necessary"""
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.filename,timeout=60)
+            self._pid = os.getpid()
+            with self._connection:
+                self._connection.execute('CREATE TABLE IF NOT EXISTS evaluations '
+                                         '(key TEXT PRIMARY KEY, value BLOB, size INTEGER, last_used REAL)')
+                self._connection.execute('CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used)')
+        return self._connection
+
+    def get(self,key):
+        """Looks up a stored result
+
+        :param key: The key from :py:func:`cache_key`
+        :type key: str
+        :returns: True and the result if it was found, otherwise False and None
+        :rtype: tuple
+        """
+        connection = self._connect()
+        row = connection.execute('SELECT value FROM evaluations WHERE key = ?',(key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return False,None
+        with connection:
+            connection.execute('UPDATE evaluations SET last_used = ? WHERE key = ?',(time.time(),key))
+        self.hits += 1
+        return True,pickle.loads(row[0])
+
+    def put(self,key,value):
+        """Stores a result, then deletes the least recently used results if the cache is larger than max_bytes
+
+        :param key: The key from :py:func:`cache_key`
+        :param value: The result, which must be picklable
+        :type key: str
+        """
+        blob = pickle.dumps(value,protocol=2)
+        connection = self._connect()
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO evaluations VALUES (?,?,?,?)',
+                               (key,sqlite3.Binary(blob),len(blob),time.time()))
+        self.stores += 1
+        self._evict()
+        return
+
+    def _evict(self):
+        """Deletes the least recently used results until the cache is no larger than max_bytes"""
+        connection = self._connect()
+        total = connection.execute('SELECT COALESCE(SUM(size),0) FROM evaluations').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key,size in connection.execute('SELECT key,size FROM evaluations ORDER BY last_used'):
+            if total <= self.max_bytes:
+                break
+            evicted += [(key,)]
+            total -= size
+        with connection:
+            connection.executemany('DELETE FROM evaluations WHERE key = ?',evicted)
+        self.evictions += len(evicted)
+        return
+
+    def clear(self):
+        """Deletes every stored result"""
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM evaluations')
+        return
+
+    def stats(self):
+        """Returns the hit and miss counts for this process and the current size of the cache
+
+        :returns: A dict with the keys hits, misses, stores, evictions, hit_rate, entries, and bytes
+        :rtype: dict
+        """
+        connection = self._connect()
+        entries,total = connection.execute('SELECT COUNT(*),COALESCE(SUM(size),0) FROM evaluations').fetchone()
+        lookups = self.hits + self.misses
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    stores=self.stores,
+                    evictions=self.evictions,
+                    hit_rate=self.hits / lookups if lookups else 0.0,
+                    entries=entries,
+                    bytes=total,
+                   )
+
+def _update_digest(digest,item):
+    """Adds an item to a hash, recursing into containers so that equal contents always give equal hashes"""
+    if isinstance(item,np.ndarray):
+        digest.update('ndarray{}{}'.format(item.dtype.str,item.shape).encode())
+        digest.update(np.ascontiguousarray(item).tobytes())
+    elif isinstance(item,(list,tuple)):
+        digest.update('{}{}'.format(type(item).__name__,len(item)).encode())
+        for sub_item in item:
+            _update_digest(digest,sub_item)
+    elif isinstance(item,dict):
+        digest.update('dict{}'.format(len(item)).encode())
+        for sub_key in sorted(item,key=repr):
+            _update_digest(digest,sub_key)
+            _update_digest(digest,item[sub_key])
+    elif isinstance(item,bytes):
+        digest.update(b'bytes' + item)
+    elif isinstance(item,(np.generic,int,float,complex,bool,str)) or item is None:
+        digest.update('{}:{!r}'.format(type(item).__name__,item).encode())
+    elif isinstance(item,type) or _is_named_function(item):
+        #Classes and module-level functions are identified by name
+        digest.update('callable:{}.{}'.format(item.__module__,item.__qualname__).encode())
+    else:
+        #Two different objects of the same type could not be told apart
+        raise _UnhashableItem(type(item).__name__)
+    return
+
+class _UnhashableItem(TypeError):
+    """Raised by :py:func:`_update_digest` for an item whose contents it cannot hash"""
+    pass
+
+def _is_named_function(item):
+    """Returns whether an item is a function identified by its module and name, which excludes lambdas, nested functions, and bound methods"""
+    if not isinstance(item,(types.FunctionType,types.BuiltinFunctionType)):
+        return False
+    if isinstance(item,types.BuiltinFunctionType) and not isinstance(item.__self__,(types.ModuleType,type(None))):
+        return False
+    return '<' not in item.__qualname__
+
+def cache_key(model,kind,*args):
+    """Computes the key of a result in the cache
+
+    :param model: The model
+    :param kind: The kind of result, such as 'evaluate' or 'sensitivity'
+    :param args: Anything else that the result depends on
+    :returns: The key, or None if the model does not define a fingerprint or its fingerprint holds something that cannot be hashed by its contents, in which case the result is not cached
+    :rtype: str
+    """
+    fingerprint = model.cache_fingerprint()
+    if fingerprint is None:
+        return None
+    digest = hashlib.sha256()
+    try:
+        _update_digest(digest,(kind,fingerprint,args))
+    except _UnhashableItem:
+        return None
+    return digest.hexdigest()
+
+_file_digests = {}
+
+def file_digest(filename):
+    """Returns a hash of the contents of a file
+
+    The hash is remembered for as long as the file's size and modification time are unchanged. If filename is not a file, for example because it names a data file built into Cantera, the name itself is hashed.
+
+    :param filename: The file name
+    :type filename: str
+    :rtype: str
+    """
+    if not os.path.isfile(filename):
+        return hashlib.sha256(repr(filename).encode()).hexdigest()
+    file_stat = os.stat(filename)
+    lookup = (os.path.abspath(filename),file_stat.st_size,file_stat.st_mtime)
+    if lookup not in _file_digests:
+        digest = hashlib.sha256()
+        with open(filename,'rb') as f:
+            for block in iter(functools.partial(f.read,2**20),b''):
+                digest.update(block)
+        _file_digests[lookup] = digest.hexdigest()
+    return _file_digests[lookup]
+
+def settings_fingerprint(model,ignore=()):
+    """Lists a model's public attributes and their values, for use in :py:func:`.Model.cache_fingerprint`
+
+    Attributes whose names start with an underscore hold the model's internal state and are never listed. A model whose results depend on one of them must add it to its fingerprint itself.
+
+    :param model: The model
+    :key ignore: The names of public attributes that do not affect the model's results
+    :returns: (name,value) pairs sorted by name
+    :rtype: list
+    """
+    return [(name,value) for name,value in sorted(vars(model).items())
+            if name not in ignore and not name.startswith('_')]
+
+def cached_evaluation(evaluate):
+    """Decorates a model's evaluate method so that it uses the model's evaluation cache
+
+    While the model is running a sensitivity analysis that was not found in the cache, evaluations are stored in the cache but are not looked up, because the sensitivity analysis may depend on the state that the model is left in after a real evaluation.
+    """
+    @functools.wraps(evaluate)
+    def cached_evaluate(self):
+        cache = getattr(self,'evaluation_cache',None)
+        if cache is None:
+            return evaluate(self)
+        key = cache_key(self,'evaluate')
+        if key is None:
+            return evaluate(self)
+        if not getattr(self,'_cache_write_only',False):
+            found,value = cache.get(key)
+            if found:
+                return value
+        value = evaluate(self)
+        cache.put(key,value)
+        return value
+    return cached_evaluate
+
+def cached_sensitivity(sensitivity):
+    """Decorates a model's sensitivity method so that it uses the model's evaluation cache
+
+    The key includes the perturbation and the parameter list. If the result is found in the cache, only the model value is written to the log file.
+    """
+    signature = inspect.signature(sensitivity)
+
+    @functools.wraps(sensitivity)
+    def cached_sensitivity_method(self,*args,**kwargs):
+        cache = getattr(self,'evaluation_cache',None)
+        if cache is None:
+            return sensitivity(self,*args,**kwargs)
+
+        arguments = signature.bind(self,*args,**kwargs)
+        arguments.apply_defaults()
+        parameter_list = arguments.arguments.get('parameter_list')
+        if parameter_list is not None:
+            parameter_list = np.asarray(parameter_list)
+        key = cache_key(self,'sensitivity',arguments.arguments.get('perturbation'),parameter_list)
+        if key is None:
+            return sensitivity(self,*args,**kwargs)
+
+        found,result = cache.get(key)
+        if found:
+            logfile = arguments.arguments.get('logfile')
+            if hasattr(logfile,'write'):
+                logfile.write("Value = {: 10.5e} (cached)\n".format(result[0]))
+            return result
+
+        self._cache_write_only = True
+        try:
+            value,sensitivity_vector = sensitivity(self,*args,**kwargs)
+        finally:
+            self._cache_write_only = False
+        result = (value,np.array(sensitivity_vector,dtype=float))
+        cache.put(key,result)
+        return result
+    return cached_sensitivity_method
@@ -0,0 +1,128 @@
+import numpy as np
+from scipy import sparse
+
+class ImpactMatrix(object):
+    """The impact factors of every parameter on every measurement of a :py:class:`.Project`, stored sparsely and ranked.
+
+    The impact factor of parameter i on measurement r is :math:`I_{i,r} = S_{i,r}\\ln(f_i)`, as in :py:func:`.Project.find_active_parameters`. Each row is held in compressed sparse row form with its entries sorted from the largest :math:`|I_{i,r}|` to the smallest, together with the ratio :math:`|I_{i,r}|/\\max_i|I_{i,r}|`. Entries whose ratio is no more than min_ratio are dropped.
+
+    Parameter i is active at a cutoff :math:`S_c` if its ratio is more than :math:`S_c` for any measurement, so the largest ratio of each parameter is also kept, sorted, and the active parameters at any cutoff are found by one binary search.
+
+    :param measurement_list: The measurements. Each must have a sensitivity list
+    :param parameter_uncertainties: The uncertainty factor :math:`f_i` of each model parameter
+    :key min_ratio: The largest ratio that is dropped from the matrix. Cutoffs below min_ratio cannot be answered exactly
+    :type measurement_list: list of :py:class:`.Measurement`
+    :type parameter_uncertainties: ndarray(float)
+    :type min_ratio: float
+
+    """
+    def __init__(self,measurement_list,parameter_uncertainties,min_ratio=1.0e-3):
+        self.min_ratio = min_ratio
+        self.names = [meas.name for meas in measurement_list] #: The name of the measurement in each row
+        self._rows = {}
+        for row,name in enumerate(self.names):
+            self._rows.setdefault(name,row)
+
+        log_uncertainties = np.log(np.asarray(parameter_uncertainties,dtype=float))
+        num_params = max([len(meas.sensitivity_list) for meas in measurement_list] + [0])
+        self.num_params = num_params #: The number of columns, the largest number of parameters of any measurement
+
+        indptr = [0]
+        indices = []
+        data = []
+        ratios = []
+        for meas in measurement_list:
+            sensitivity = np.asarray(meas.sensitivity_list,dtype=float)
+            impact = sensitivity*log_uncertainties[:len(sensitivity)]
+            magnitude = np.abs(impact)
+            max_impact = magnitude.max() if len(magnitude) > 0 else 0.0
+            kept = np.array([],dtype=int)
+            if max_impact > 0:
+                ratio = magnitude/max_impact
+                kept = np.flatnonzero(ratio > min_ratio)
+                kept = kept[np.argsort(-ratio[kept],kind='stable')]
+                data += [impact[kept]]
+                ratios += [ratio[kept]]
+            indices += [kept]
+            indptr += [indptr[-1] + len(kept)]
+
+        #: The offsets of the rows in indices, data and ratios
+        self.indptr = np.array(indptr,dtype=int)
+        #: The parameter of each entry, ranked within each row
+        self.indices = np.concatenate(indices + [np.array([],dtype=int)])
+        #: The impact factor of each entry
+        self.data = np.concatenate(data + [np.array([])])
+        #: The ratio of each entry to the largest impact factor in its row
+        self.ratios = np.concatenate(ratios + [np.array([])])
+
+        #The largest ratio of each parameter over all measurements, sorted from largest to smallest
+        max_ratios = np.zeros(num_params)
+        np.maximum.at(max_ratios,self.indices,self.ratios)
+        order = np.argsort(-max_ratios,kind='stable')
+        self._ranked_parameters = order[max_ratios[order] > 0]
+        self._ranked_ratios = max_ratios[self._ranked_parameters]
+        return
+
+    def __len__(self):
+        return len(self.names)
+
+    def matrix(self):
+        """Returns the impact factors as a SciPy sparse matrix, one row per measurement and one column per parameter
+
+        :rtype: :py:class:`scipy.sparse.csr_matrix`
+        """
+        impacts = sparse.csr_matrix((self.data,self.indices,self.indptr),shape=(len(self.names),self.num_params))
+        impacts.sort_indices()
+        return impacts
+
+    def _check_cutoff(self,sensitivity_cutoff):
+        if sensitivity_cutoff < self.min_ratio:
+            raise ValueError('The sensitivity cutoff {} is below the smallest ratio {} kept in the impact matrix'.format(sensitivity_cutoff,self.min_ratio))
+
+    def _row(self,measurement):
+        if isinstance(measurement,str):
+            return self._rows[measurement]
+        return measurement
+
+    def active_parameters(self,sensitivity_cutoff):
+        """Returns the parameters whose impact factor passes the cutoff for at least one measurement
+
+        :param sensitivity_cutoff: The sensitivity cutoff :math:`S_c`
+        :type sensitivity_cutoff: float
+        :returns: The active parameters, in increasing order
+        :rtype: ndarray(int)
+        """
+        self._check_cutoff(sensitivity_cutoff)
+        number = np.searchsorted(-self._ranked_ratios,-sensitivity_cutoff,side='left')
+        return np.sort(self._ranked_parameters[:number])
+
+    def measurement_parameters(self,measurement,sensitivity_cutoff):
+        """Returns the parameters whose impact factor passes the cutoff for one measurement
+
+        :param measurement: The row or the name of the measurement
+        :param sensitivity_cutoff: The sensitivity cutoff :math:`S_c`
+        :type measurement: int or str
+        :type sensitivity_cutoff: float
+        :returns: The parameters, from the largest impact to the smallest
+        :rtype: ndarray(int)
+        """
+        self._check_cutoff(sensitivity_cutoff)
+        row = self._row(measurement)
+        start,stop = self.indptr[row],self.indptr[row + 1]
+        number = np.searchsorted(-self.ratios[start:stop],-sensitivity_cutoff,side='left')
+        return self.indices[start:start + number]
+
+    def top(self,measurement,number):
+        """Returns the parameters with the largest impact factors on one measurement
+
+        :param measurement: The row or the name of the measurement
+        :param number: The number of parameters to return
+        :type measurement: int or str
+        :type number: int
+        :returns: parameters, from the largest impact to the smallest, and their impact factors
+        :rtype: tuple of ndarray(int) and ndarray(float)
+        """
+        row = self._row(measurement)
+        start = self.indptr[row]
+        stop = min(start + number,self.indptr[row + 1])
+        return self.indices[start:stop],self.data[start:stop]
@@ -0,0 +1,97 @@
+import os
+import json
+import numpy as np
+
+class ResponseJournal(object):
+    """An append-only checkpoint file for the sensitivity analyses that make up a response surface.
+
+    The file holds one JSON record per line. The first line is a header describing the settings of the response surface, and each later line holds the result of one point from :py:func:`.Measurement.response_points`: the model value, the sensitivities, and the text that the model wrote to its log. Each record is flushed to disk as soon as it is written, so if the calculation is interrupted, every point that finished can be read back and only the remaining points need to be run. A partly written last line is ignored.
+
+    :param filename: The journal file
+    :param header: The settings of the response surface. The records in an existing file are only used if its header is the same
+    :type filename: str
+    :type header: dict
+
+    """
+    def __init__(self,filename,header):
+        self.filename = filename
+        #Round trip the header through JSON so that it can be compared with the header read from the file
+        self.header = json.loads(json.dumps(header))
+        return
+
+    def read(self):
+        """Reads the finished points from the journal
+
+        :returns: The records, keyed by (parameter_number,direction), and the length in bytes of the valid part of the file. The length is 0 if the file does not exist or its header does not match
+        :rtype: tuple
+        """
+        records = {}
+        valid_length = 0
+        if not os.path.isfile(self.filename):
+            return records,valid_length
+
+        with open(self.filename,'rb') as f:
+            for line_number,line in enumerate(f):
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    break
+                if line_number == 0:
+                    if entry.get('header') != self.header:
+                        return {},0
+                else:
+                    point = (entry['parameter_number'],entry['direction'])
+                    records[point] = (entry['value'],np.array(entry['sensitivity'],dtype=float),entry['log'])
+                valid_length += len(line)
+        return records,valid_length
+
+    def start(self,resume=True):
+        """Prepares the journal for new records
+
+        If resume is True and the file has a matching header, its finished points are returned and any partly written record at the end is removed. Otherwise a new file is started with only the header.
+
+        :key resume: Whether to keep the points in an existing journal
+        :type resume: bool
+        :returns: The finished points, keyed by (parameter_number,direction)
+        :rtype: dict
+        """
+        records,valid_length = {},0
+        if resume:
+            records,valid_length = self.read()
+        if valid_length > 0:
+            with open(self.filename,'r+b') as f:
+                f.truncate(valid_length)
+            return records
+
+        self._write_line({'header':self.header},mode='wb')
+        return {}
+
+    def append(self,point,value,sensitivity,log=''):
+        """Writes the result of one point to the journal
+
+        :param point: (parameter_number,direction) as in :py:func:`.Measurement.response_points`
+        :param value: The model value
+        :param sensitivity: The sensitivity to each active parameter
+        :param log: The text written to the model's log
+        """
+        parameter_number,direction = point
+        if parameter_number is not None:
+            parameter_number = int(parameter_number)
+        entry = dict(parameter_number=parameter_number,
+                     direction=int(direction),
+                     value=float(value),
+                     sensitivity=[float(sens) for sens in np.ravel(sensitivity)],
+                     log=log,
+                    )
+        self._write_line(entry)
+        return
+
+    def _write_line(self,entry,mode='ab'):
+        """Writes one record and makes sure that it has reached the disk"""
+        with open(self.filename,mode) as f:
+            f.write((json.dumps(entry) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        return
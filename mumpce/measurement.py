@@ -1,6 +1,14 @@
 import numpy as np
 import pickle
+import heapq
+import itertools
+import warnings
 from response_surface import ResponseSurface
+from projection import ParameterProjection
+import parallel
+from journal import ResponseJournal
+from evaluation_cache import cache_key
+from parameter_table import as_parameter_table
 
 def idfunc(*arg,**kwargs):
     if len(arg) == 1:
@@ -86,6 +94,9 @@ class Measurement(object):
         self.response = response
         self.parameter_uncertainties = parameter_uncertainties
         
+        #The cached map from this measurement's active parameters to the Project's, see get_projection
+        self._projection = None
+        
         #Define the perturbations for sensitivity analysis
         self.response_perturbation = response_perturbation
         self.response_sensitivity = 1.0e-3
@@ -105,6 +116,24 @@ class Measurement(object):
         
         return
     
+    def __getattr__(self,name):
+        """Reads an attribute of a measurement opened from a project archive the first time that it is used. See :py:mod:`archive`
+        """
+        #Only called for attributes that were not found, so self.__dict__ must be used here to avoid recursion
+        entry = self.__dict__.get('_archive')
+        if entry is not None and entry.load(self,name) and name in self.__dict__:
+            return self.__dict__[name]
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__,name))
+    
+    def __getstate__(self):
+        #A measurement opened from a project archive is read in full before it is pickled or copied
+        entry = self.__dict__.get('_archive')
+        if entry is not None:
+            entry.load_all(self)
+        state = self.__dict__.copy()
+        state.pop('_archive',None)
+        return state
+    
     def __str__(self):
         """Returns Name (Status): str(self.model)
         """
@@ -130,74 +159,141 @@ class Measurement(object):
         self.uncertainty = uncertainty
         return
     
-    def make_response(self): #(self,zero_term,perterbations,sensitivities):
+    def make_response(self,resume=True): #(self,zero_term,perterbations,sensitivities):
         """Generates a sensitivity_analysis_based response surface for this measurement
+        
+        The response surface is built from 2N+1 sensitivity analyses, where N is the number of active parameters: one at the nominal parameter values and one at each positive and negative perturbation of each active parameter. Each of these is an independent calculation done by :func:`evaluate_response_point`, so they can also be run in parallel by :py:func:`.Project.make_response`, after which the response surface is built by :func:`assemble_response`.
+        
+        The result of each analysis is written to the checkpoint file 'self.name'_resp.journal as soon as it finishes (see :py:class:`.ResponseJournal`). If the calculation is interrupted, calling this method again only runs the analyses that are not in the journal.
+        
+        :key resume: If True, the analyses already in the journal are reused, provided that the journal was written with the same active parameters and settings. If False, the journal is started over
+        :type resume: bool
         """
         #zero_term = self.evaluate
+        #zero_term = self.evaluate
+        journal = self.response_journal()
+        completed = journal.start(resume)
+        
+        results = []
+        #Changed this so that tqdm will be used if it is available, but otherwise not
+        for point in self.tqfunc(self.response_points()):
+            if point not in completed:
+                logfile = parallel.TaskLog(journal.filename)
+                value,sensitivity = self.evaluate_response_point(point[0],point[1],logfile)
+                completed[point] = (value,np.asarray(sensitivity,dtype=float),logfile.getvalue())
+                journal.append(point,*completed[point])
+            results += [completed[point]]
+        
+        self.model.reset_model()
+        self.set_response_points(results)
+        return
+    
+    def response_journal(self):
+        """Returns the checkpoint journal for this measurement's response surface
+        
+        The journal header holds the settings that determine the response surface, so that a journal written for different active parameters or perturbations is not reused. It also holds a hash of the model's :py:func:`.Model.cache_fingerprint`, taken with the model parameters reset, so that a journal written before the model's chemistry file or settings were changed is not reused either. A model that does not define a fingerprint is only identified by its string representation.
+        
+        :rtype: :py:class:`.ResponseJournal`
+        """
+        #The response points all start from the reset model, so the fingerprint is taken in that state
+        self.model.reset_model()
+        header = dict(name=self.name,
+                      model=str(self.model),
+                      model_fingerprint=cache_key(self.model,'response_journal'),
+                      active_parameters=[int(param) for param in self.active_parameters],
+                      parameter_uncertainties=[float(uncert) for uncert in self.parameter_uncertainties],
+                      response_perturbation=float(self.response_perturbation),
+                      response_sensitivity=float(self.response_sensitivity),
+                      response_type=self.response_type,
+                     )
+        return ResponseJournal(self.name + '_resp.journal',header)
+    
+    def response_points(self):
+        """Lists the calculations needed to build the response surface, as arguments to :func:`evaluate_response_point`
+        
+        :returns: (None,0) for the nominal point, followed by (parameter_number,1) and (parameter_number,-1) for each active parameter
+        :rtype: list of tuples
+        """
+        points = [(None,0)]
+        for parameter_number in range(len(self.active_parameters)):
+            points += [(parameter_number,1),(parameter_number,-1)]
+        return points
+    
+    def evaluate_response_point(self,parameter_number,direction,logfile):
+        """Runs the sensitivity analysis for one point of the response surface
+        
+        The model is reset, the active parameter parameter_number is multiplied by its uncertainty factor raised to the power direction*response_perturbation, and the sensitivity of the model value to all of the active parameters is evaluated.
+        
+        :param parameter_number: The position in self.active_parameters of the parameter to perturb, or None for the nominal point
+        :param direction: 1 for the positive perturbation and -1 for the negative perturbation. Ignored for the nominal point
+        :param logfile: The file to which the sensitivity analysis is logged
+        :type parameter_number: int or None
+        :type direction: int
+        :returns: The model value (log-transformed for the nominal point if response_type is 'log') and the sensitivity to each active parameter
+        :rtype: tuple
+        """
         self.model.reset_model()
-        logfile_name = self.name + '_resp_log.out'
-        response_logfile = open(logfile_name,'w')
         
         sensitivity_args = (self.response_sensitivity,
                            self.active_parameters,
-                           response_logfile)
+                           logfile)
+        
+        if parameter_number is None:
+            zero_term, sens_zero = self.model.sensitivity(*sensitivity_args)
+            if self.response_type == 'log':
+                zero_term = np.log(zero_term)
+            return zero_term, sens_zero
+        
         sensitivity_kw = dict(tq=True)
         
-        zero_term, sens_zero = self.model.sensitivity(*sensitivity_args)
+        parameter = self.active_parameters[parameter_number]
+        base_value = self.model.get_parameter(parameter)
+        param_name = as_parameter_table(self.model.model_parameter_info).names[parameter]
         
-        if self.response_type == 'log':
-            zero_term = np.log(zero_term)
+        #Calculate the multiplier that will be used for the SAB sensitivity calculations
+        positive_perturbation = self.parameter_uncertainties[parameter_number] ** self.response_perturbation
         
-        #print zero_term
-        #print sens_zero
+        if direction > 0:
+            logfile.write('\nParameter number = {: 4d} {:30s}\n'.format(parameter,param_name))
+            logfile.write('Positive perturbation = {: 10.5e}\n'.format(positive_perturbation))
+            self.model.perturb_parameter(parameter,positive_perturbation*base_value)
+        else:
+            negative_perturbation = 1/positive_perturbation
+            logfile.write('Negative perturbation = {: 10.5e}\n'.format(negative_perturbation))
+            self.model.perturb_parameter(parameter,negative_perturbation*base_value)
         
-        number_params = len(self.active_parameters)
+        return self.model.sensitivity(*sensitivity_args,**sensitivity_kw)
+    
+    def set_response_points(self,results):
+        """Builds the response surface from the results for the points in :func:`response_points`
         
-        #Calculate the multipliers that will be used for the SAB sensitivity calculations
-        multipliers = self.parameter_uncertainties ** self.response_perturbation
-        #print multipliers
+        :param results: The model value, sensitivities, and log text for each point, in the same order as :func:`response_points`
+        :type results: list of tuples
+        """
+        values,sensitivities,logs = zip(*results)
         
-        perturbations = np.zeros((number_params,2))
-        sens_positive = np.zeros((number_params,number_params))
-        sens_negative = np.zeros_like(sens_positive)
+        number_params = len(self.active_parameters)
         
-        #Changed this so that tqdm will be used if it is available, but otherwise not
-        #for (parameter_number,parameter) in tqdm.tqdm(enumerate(self.active_parameters)):
-        for (parameter_number,parameter) in enumerate(self.tqfunc(self.active_parameters)):
-            self.model.reset_model()
-            base_value = self.model.get_parameter(parameter)
-            param_name = self.model.model_parameter_info[parameter]['parameter_name']
-            
-            #print 'Parameter = ', parameter
-            
-            
-            positive_perturbation = multipliers[parameter_number]
-            negative_perturbation = 1/positive_perturbation
-            
-            #print positive_perturbation
-            #print negative_perturbation
-            
-            #Positive perturbation
-            response_logfile.write('\nParameter number = {: 4d} {:30s}\n'.format(parameter,param_name))
-            response_logfile.write('Positive perturbation = {: 10.5e}\n'.format(positive_perturbation))
-            self.model.perturb_parameter(parameter,positive_perturbation*base_value)
-            value_pos, sens_pos = self.model.sensitivity(*sensitivity_args,**sensitivity_kw)
-            
-            #Negative perturbation
-            response_logfile.write('Negative perturbation = {: 10.5e}\n'.format(negative_perturbation))
-            self.model.perturb_parameter(parameter,negative_perturbation*base_value)
-            value_neg, sens_neg = self.model.sensitivity(*sensitivity_args,**sensitivity_kw)
-            
-            perturbations[parameter_number,:] = [value_pos, value_neg]
-                
-            sens_positive[parameter_number,:] = sens_pos
-            sens_negative[parameter_number,:] = sens_neg
-            
-            #print "Positive sensitivity:", sens_pos
-            #print "Negative sensitivity:", sens_neg
-            #print ''
+        zero_term = values[0]
+        perturbations = np.reshape(values[1:],(number_params,2))
+        sens_positive = np.reshape(sensitivities[1::2],(number_params,number_params))
+        sens_negative = np.reshape(sensitivities[2::2],(number_params,number_params))
         
-        self.model.reset_model()
+        self.assemble_response(zero_term,perturbations,sens_positive,sens_negative)
+        return
+    
+    def assemble_response(self,zero_term,perturbations,sens_positive,sens_negative):
+        """Builds the response surface from the results of :func:`evaluate_response_point` and stores it in self.response
+        
+        :param zero_term: The model value at the nominal point
+        :param perturbations: The model values at the positive and negative perturbation of each active parameter
+        :param sens_positive: The sensitivities at the positive perturbation of each active parameter
+        :param sens_negative: The sensitivities at the negative perturbation of each active parameter
+        :type zero_term: float
+        :type perturbations: ndarray(float), shape (N,2)
+        :type sens_positive: ndarray(float), shape (N,N)
+        :type sens_negative: ndarray(float), shape (N,N)
+        """
         #First order terms of response surface
         if self.response_type == 'log':
             perturbations = np.log(perturbations)
@@ -230,13 +326,31 @@ class Measurement(object):
             self.model_value = np.log(self.model_value)
         return self.model_value
     
-    def evaluate_sensitivity(self,perturbation=0.05):
+    def evaluate_sensitivity(self,perturbation=0.05,executor=None,max_workers=None,chunk_size=None):
         """Conducts a sensitivity analysis on the model and storee the nominal value in self.model_value and the sensitivity in self.sensitivity_list
         
+        If either executor or max_workers is given, the parameters are split into chunks of chunk_size and the sensitivities to each chunk are evaluated in parallel by a copy of the model in a worker process. See :py:func:`.Project.find_sensitivity`.
+        
         :param perturbation: The amount to perturb each parameter when conducting the sensitivity analysis
+        :key executor: The executor that will run the tasks. If None and max_workers is given, a process pool is created for this call
+        :key max_workers: The number of worker processes to create if executor is None
+        :key chunk_size: The number of parameters in each task
         :type perturbation: float
+        :type executor: :py:class:`concurrent.futures.Executor`
+        :type max_workers: int
+        :type chunk_size: int
         """
         all_parameters = np.arange(self.model.number_parameters,dtype=int)
+        if executor is not None or max_workers is not None:
+            self.prepare_for_save()
+            task_list = self.sensitivity_tasks(perturbation,chunk_size)
+            results,errors = parallel.run_tasks(parallel.sensitivity_task,task_list,executor,max_workers)
+            for error in errors:
+                if error is not None:
+                    raise RuntimeError('Sensitivity analysis failed for {}:\n{}'.format(self.name,error))
+            self.set_sensitivity(results)
+            return
+        
         logfile_name = self.name + '_sen.out'
         with open(logfile_name,'w') as logfile:
                 self.model_value,self.sensitivity_list = self.model.sensitivity(perturbation=perturbation,
@@ -247,6 +361,36 @@ class Measurement(object):
             self.model_value = np.log(self.model_value)
         return
     
+    def sensitivity_tasks(self,perturbation=0.05,chunk_size=None):
+        """Splits the sensitivity analysis into tasks for :py:func:`.parallel.sensitivity_task`
+        
+        :param perturbation: The amount to perturb each parameter when conducting the sensitivity analysis
+        :key chunk_size: The number of parameters in each task. If None, there is only one task
+        :returns: The arguments of each task
+        :rtype: list of tuples
+        """
+        all_parameters = np.arange(self.model.number_parameters,dtype=int)
+        return [(self,perturbation,chunk) for chunk in parallel.split_parameters(all_parameters,chunk_size)]
+    
+    def set_sensitivity(self,results):
+        """Stores the results of the tasks from :func:`sensitivity_tasks` in self.model_value and self.sensitivity_list, and writes their combined log to the same file as :func:`evaluate_sensitivity`
+        
+        :param results: The value returned by each task, in the same order as the tasks
+        :type results: list of tuples
+        """
+        values,sensitivities,logs = zip(*results)
+        
+        logfile_name = self.name + '_sen.out'
+        with open(logfile_name,'w') as logfile:
+            logfile.write(''.join(logs))
+        
+        #Every task evaluates the nominal model, so the first value is used
+        self.model_value = values[0]
+        self.sensitivity_list = np.concatenate(sensitivities)
+        if self.response_type == 'log':
+            self.model_value = np.log(self.model_value)
+        return
+    
     def print_sorted_sensitivity(self,sensitivity=None,max_number=None):
         """Sorts the parameters by sensitivity coefficient and prints them.
         
@@ -266,9 +410,9 @@ class Measurement(object):
         
         print_params = sorted_param_nums[-1:-1*max_number:-1]
         
+        parameter_info = as_parameter_table(self.model.model_parameter_info)
         for print_param in print_params:
-            param_info = self.model.model_parameter_info[print_param]
-            param_name = param_info['parameter_name']
+            param_name = parameter_info.names[print_param]
             print('{: 4d} {: 10.4e}  {}'.format(print_param,
                                                 sensitivity[print_param],
                                                 param_name
@@ -278,6 +422,133 @@ class Measurement(object):
            
         return
     
+    def screen_parameters(self,parameter_uncertainties,sensitivity_cutoff,perturbation=0.05,num_groups=16,num_patterns=4,seed=None,tolerance=0.1):
+        """Finds the parameters whose impact factors pass the sensitivity cutoff by perturbing groups of parameters together, without a full sensitivity analysis
+        
+        Each parameter in a group is multiplied by :math:`f_i^{\pm \delta}`, where :math:`f_i` is its uncertainty factor and :math:`\delta` is the perturbation, so that the change in :math:`\ln y` is :math:`\delta` times the sum of the impact factors :math:`\pm I_i = \pm S_i \ln f_i` of the group. The signs are drawn at random for each of num_patterns patterns, and the impact of the group is the largest change over the patterns, so that parameters with impacts of opposite sign are unlikely to hide each other in every pattern. Screening is therefore not exact: a parameter whose impact is close to the cutoff, or that is cancelled by another parameter in every pattern, can be missed.
+        
+        The parameters are first split into num_groups groups of about the same total :math:`\ln f_i`. Starting from the group with the largest impact, each group is split in two at the midpoint of its total :math:`\ln f_i`, until single parameters are reached. Only the first half is evaluated; the changes for the second half are estimated as those of the group less those of the first half, which is exact only if the response is linear in the parameters. Screening stops once the largest impact of any remaining group is no more than the cutoff times the largest impact of a single parameter, since no parameter in those groups can be active. Parameters whose uncertainty factor is 1 are never perturbed.
+        
+        A single parameter whose changes were estimated in this way is evaluated before its impact is accepted. If the evaluated and estimated changes differ by more than tolerance times the larger of the two, the response is too nonlinear for the estimates to be trusted, and some active parameters may have been missed. A warning is then issued and self.screening_consistent is set to False. Otherwise it is set to True.
+        
+        Since the changes are changes in :math:`\ln y`, screening requires the model value to be positive. If the nominal value or any perturbed value is not positive, :func:`evaluate_sensitivity` is run instead and the active parameters are found from the full sensitivity list.
+        
+        With K active parameters among P, this takes on the order of :math:`K \log_2(P/K)` evaluations per pattern instead of the :math:`2P` of :func:`evaluate_sensitivity`.
+        
+        :param parameter_uncertainties: The uncertainty factor :math:`f_i` of each model parameter
+        :param sensitivity_cutoff: The sensitivity cutoff :math:`S_c`, as in :py:func:`.Project.find_active_parameters`
+        :key perturbation: The perturbation :math:`\delta`
+        :key num_groups: The number of groups the parameters are split into before bisection
+        :key num_patterns: The number of random sign patterns each group is evaluated with. Groups of one parameter are evaluated once
+        :key seed: The seed of the random signs
+        :key tolerance: The largest relative difference between the estimated and evaluated changes of a single parameter
+        :type parameter_uncertainties: ndarray(float)
+        :type sensitivity_cutoff: float
+        :type perturbation: float
+        :type num_groups: int
+        :type num_patterns: int
+        :type seed: int
+        :type tolerance: float
+        :returns: active_parameters, the parameters whose impact :math:`|I_i|` is more than the cutoff times the largest impact, and impact_factors, the estimated :math:`|I_i|` of each of them
+        :rtype: tuple of ndarray(int) and ndarray(float)
+        """
+        number_parameters = self.model.number_parameters
+        weights = np.log(np.asarray(parameter_uncertainties[:number_parameters],dtype=float))
+        signs = np.random.default_rng(seed).choice([-1.0,1.0],size=(num_patterns,number_parameters))
+        base_values = {}
+        counter = itertools.count()
+        self.screening_consistent = True
+        
+        nominal_value = self.model.evaluate()
+        if not nominal_value > 0:
+            return self._active_from_sensitivity(weights,sensitivity_cutoff,perturbation)
+        nominal = np.log(nominal_value)
+        
+        def group_changes(group):
+            #The change in ln(y) divided by the perturbation, for each sign pattern
+            changes = np.zeros(num_patterns)
+            for number,pattern in enumerate(signs[:1 if len(group) == 1 else num_patterns]):
+                for param_id in group:
+                    if param_id not in base_values:
+                        base_values[param_id] = self.model.get_parameter(param_id)
+                group_base = np.array([base_values[param_id] for param_id in group])
+                try:
+                    self.model.perturb_parameters(group,group_base*np.exp(perturbation*pattern[group]*weights[group]))
+                    value = self.model.evaluate()
+                finally:
+                    self.model.perturb_parameters(group,group_base)
+                if not value > 0:
+                    return None
+                changes[number] = (np.log(value) - nominal)/perturbation
+            if len(group) == 1:
+                #The other patterns only change the sign of a single parameter
+                changes = changes[0]*signs[:,group[0]]*signs[0,group[0]]
+            return changes
+        
+        def split(group,number):
+            #Split where the running total of ln(f) crosses each fraction of the group's total
+            total = np.cumsum(weights[group])
+            bounds = np.searchsorted(total,total[-1]*np.arange(1,number)/number)
+            bounds = np.unique(np.clip(bounds,1,len(group) - 1))
+            return [part for part in np.split(group,bounds) if len(part) > 0]
+        
+        def push(group,changes,estimated=False):
+            heapq.heappush(heap,(-np.abs(changes).max(),next(counter),group,changes,estimated))
+        
+        candidates = np.arange(number_parameters,dtype=int)[weights > 0]
+        if len(candidates) == 0:
+            return np.array([],dtype=int),np.array([])
+        
+        #The groups waiting to be split, largest impact first
+        heap = []
+        for group in split(candidates,min(num_groups,len(candidates))):
+            changes = group_changes(group)
+            if changes is None:
+                return self._active_from_sensitivity(weights,sensitivity_cutoff,perturbation)
+            push(group,changes)
+        
+        impacts = {}
+        max_impact = 0.0
+        while heap:
+            negative_impact,order,group,changes,estimated = heapq.heappop(heap)
+            if -negative_impact <= max_impact*sensitivity_cutoff:
+                break
+            if len(group) == 1:
+                if estimated:
+                    #Check the estimate before accepting it, then put the parameter back with its evaluated changes
+                    evaluated_changes = group_changes(group)
+                    if evaluated_changes is None:
+                        return self._active_from_sensitivity(weights,sensitivity_cutoff,perturbation)
+                    if np.abs(evaluated_changes - changes).max() > tolerance*max(np.abs(evaluated_changes).max(),-negative_impact):
+                        self.screening_consistent = False
+                    push(group,evaluated_changes)
+                    continue
+                impacts[int(group[0])] = -negative_impact
+                max_impact = max(max_impact,-negative_impact)
+                continue
+            #Only the first half is evaluated. The second half's changes are estimated as the rest of the group's
+            first,second = split(group,2)
+            first_changes = group_changes(first)
+            if first_changes is None:
+                return self._active_from_sensitivity(weights,sensitivity_cutoff,perturbation)
+            push(first,first_changes)
+            push(second,changes - first_changes,estimated=True)
+        
+        if not self.screening_consistent:
+            warnings.warn('Screening of {} is not reliable because the response is not linear in the parameters; '
+                          'some active parameters may have been missed'.format(self.name),RuntimeWarning)
+        
+        active_parameters = np.array(sorted([param_id for param_id,impact in impacts.items() if impact > max_impact*sensitivity_cutoff]),dtype=int)
+        return active_parameters,np.array([impacts[param_id] for param_id in active_parameters])
+    
+    def _active_from_sensitivity(self,weights,sensitivity_cutoff,perturbation):
+        """Finds the active parameters as :func:`screen_parameters` does, but from the full sensitivity list, for models whose value is not positive"""
+        print ('Model value of {} is not positive, running the full sensitivity analysis instead of screening'.format(self.name))
+        self.evaluate_sensitivity(perturbation=perturbation)
+        impact_factors = np.abs(np.asarray(self.sensitivity_list,dtype=float)*weights)
+        active_parameters = np.where(impact_factors > impact_factors.max()*sensitivity_cutoff)[0]
+        return active_parameters,impact_factors[active_parameters]
+    
     def evaluate_response(self,x):
         """Evaluates the response surface for this measurement.
         
@@ -313,6 +584,23 @@ class Measurement(object):
         response,response_uncertainty = self.response.evaluate(x,cov)
         return response,response_uncertainty
     
+    def get_projection(self,project_parameters):
+        """Returns the map between this measurement's active parameters and a Project's active parameters.
+        
+        The map is cached and is only rebuilt if either list of active parameters has changed. :py:func:`.Project.set_active_parameters` clears the cache.
+        
+        :param project_parameters: The Project's active parameters
+        :type project_parameters: ndarray(int)
+        :returns: projection
+        :rtype: :py:class:`.ParameterProjection`
+        """
+        #Measurements pickled before the projection existed will not have this attribute
+        projection = getattr(self,'_projection',None)
+        if projection is None or not projection.matches(self.active_parameters,project_parameters):
+            projection = ParameterProjection(self.active_parameters,project_parameters)
+            self._projection = projection
+        return projection
+    
     def save(self):
         """Saves a pickled representation of the measurement
         """
@@ -405,7 +693,8 @@ class Measurement(object):
         return
     
     def print_model_values(self):
-        parameter_info = self.model.model_parameter_info
+        values,uncertainties = self.get_model_values()
+        names = self.get_active_names()
         
         headname = 'Parameter name'
         headv = 'Value'
@@ -430,10 +719,10 @@ class Measurement(object):
         
         for active_num,param in enumerate(self.active_parameters):
             
-            param_name = parameter_info[param]['parameter_name']
+            param_name = names[active_num]
             
-            value = parameter_info[param]['parameter_value']#self.model.get_parameter(param)
-            this_unc = self.parameter_uncertainties[active_num]
+            value = values[active_num]#self.model.get_parameter(param)
+            this_unc = uncertainties[active_num]
             
             print_args = (param_name[:40],value,this_unc)
             
@@ -448,14 +737,12 @@ class Measurement(object):
         return output
     
     def get_active_names(self):
-        names = []
-        for param in self.active_parameters:
-            param_name = self.model.model_parameter_info[param]['parameter_name']
-            names += [param_name]
-        return names
+        return as_parameter_table(self.model.model_parameter_info).names_of(self.active_parameters)
     
     def interpret_model(self,x,cov):
-        parameter_info = self.model.model_parameter_info
+        names = self.get_active_names()
+        values,uncertainties = self.get_model_values()
+        new_values,new_uncertainties = self.get_opt_values(x,cov)
         
         headname = 'Parameter name'
         headv = 'Value'
@@ -479,17 +766,16 @@ class Measurement(object):
         
         for active_num,param in enumerate(self.active_parameters):
             
-            param_name = parameter_info[param]['parameter_name']
+            param_name = names[active_num]
             
-            value = parameter_info[param]['parameter_value']#self.model.get_parameter(param)
+            value = values[active_num]#self.model.get_parameter(param)
             
             this_x = x[active_num]
             this_std = 2*np.sqrt(cov[active_num,active_num])
-            this_unc = self.parameter_uncertainties[active_num]
+            this_unc = uncertainties[active_num]
             
-            multiplier = this_unc ** this_x
-            new_value = value*multiplier
-            new_uncertainty = this_unc ** (this_std)
+            new_value = new_values[active_num]
+            new_uncertainty = new_uncertainties[active_num]
             
             print_args = (param_name[:40],value,this_unc,this_x,this_std,new_value,new_uncertainty)
             
@@ -503,48 +789,26 @@ class Measurement(object):
         return output
     
     def modify_model(self,x):
-        for active_num,param in enumerate(self.active_parameters):
-            #value = self.model.get_parameter(param)
-            this_x = x[active_num]
-            this_unc = self.parameter_uncertainties[active_num]
-            
-            multiplier = this_unc ** this_x
-            new_value = multiplier#*value
-            
-            self.model.perturb_parameter(param,new_value)
+        #Set every active parameter at once, so that models with a batch update can use it
+        number_active = len(self.active_parameters)
+        uncertainties = np.asarray(self.parameter_uncertainties[:number_active],dtype=float)
+        multipliers = uncertainties ** np.asarray(x[:number_active],dtype=float)
+        self.model.perturb_parameters(self.active_parameters,multipliers)
         return
     
     def get_model_values(self):
-        values = []
-        uncertainties = []
-        parameter_info = self.model.model_parameter_info
-        for active_num,param in enumerate(self.active_parameters):
-            value = parameter_info[param]['parameter_value']#self.model.get_parameter(param)
-            this_unc = self.parameter_uncertainties[active_num]
-            values += [value]
-            uncertainties += [this_unc]
-        values = np.array(values)
-        uncertainties = np.array(uncertainties)
+        number_active = len(self.active_parameters)
+        values = as_parameter_table(self.model.model_parameter_info).values[self.active_parameters]
+        uncertainties = np.array(self.parameter_uncertainties[:number_active],dtype=float)
         return values,uncertainties
     
     def get_opt_values(self,x,cov):
-        new_values = []
-        new_uncertainties = []
-        parameter_info = self.model.model_parameter_info
-        for active_num,param in enumerate(self.active_parameters):
-            value = parameter_info[param]['parameter_value']#self.model.get_parameter(param)
-            this_x = x[active_num]
-            this_std = 2*np.sqrt(cov[active_num,active_num])
-            this_unc = self.parameter_uncertainties[active_num]
-
-            multiplier = this_unc ** this_x
-            new_value = value*multiplier
-            new_uncertainty = this_unc ** (this_std)
-
-            new_values += [new_value]
-            new_uncertainties += [new_uncertainty]
-        new_values = np.array(new_values)
-        new_uncertainties = np.array(new_uncertainties)
-
+        values,uncertainties = self.get_model_values()
+        number_active = len(values)
+        x = np.asarray(x[:number_active],dtype=float)
+        std = 2*np.sqrt(np.diagonal(cov)[:number_active])
+        
+        new_values = values * uncertainties ** x
+        new_uncertainties = uncertainties ** std
         return new_values,new_uncertainties
             
\ No newline at end of file
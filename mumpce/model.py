@@ -11,11 +11,18 @@ class Model(object):
        * :func:`get_parameter`: Takes a parameter ID and returns the value of the corresponding model parameter
        * :func:`perturb_parameter`: Takes a parameter ID and replaces the corrsponding value with a new value
        * :func:`reset model`: Resets all model parameter values to their default values.
-       * :func:`get_model_parameter_info`: Returns a list of dicts containing, at least, the parameter's name and possibly additional information
+       * :func:`get_model_parameter_info`: Returns a :py:class:`.ParameterTable`, or a list of dicts containing, at least, the parameter's name and possibly additional information
+    
+    Models may also define :func:`perturb_parameters` to replace many parameter values at once.
+    
+    Models may also define :func:`cache_fingerprint` so that their evaluations can be stored in an :py:class:`.EvaluationCache`.
     """
     
     __metaclass__ = ABCMeta
     
+    #: The :py:class:`.EvaluationCache` used by this model, or None for no caching. Set it on :py:class:`Model` to turn on caching for every model
+    evaluation_cache = None
+    
     @abstractmethod
     def __str__(self):
         """Return some interesting information about the model
@@ -62,6 +69,19 @@ class Model(object):
         :type new_value: float
         """
         pass
+    def perturb_parameters(self,parameter_ids,multipliers):
+        """Replaces the values of several model parameters at once
+        
+        By default, this calls :func:`perturb_parameter` for each parameter. Models that can set many parameters faster at once may override this.
+        
+        :param parameter_ids: The parameter identifiers
+        :param multipliers: The new value of each parameter, in the same form as for :func:`perturb_parameter`
+        :type parameter_ids: array_like
+        :type multipliers: array_like
+        """
+        for parameter_id,multiplier in zip(parameter_ids,multipliers):
+            self.perturb_parameter(parameter_id,multiplier)
+        return
     @abstractmethod
     def reset_model(self):
         """Resets all model parameters to their original values"""
@@ -71,9 +91,29 @@ class Model(object):
         """Gets information about the parameters, which will go up to the hosting measurement. This is called during instantiation of the model and normally would not be called at any other time.
        
         :returns: model_parameter_info
-        :rtype: list
+        :rtype: :py:class:`.ParameterTable` or list
         """
         pass
     #@abstractmethod
     def prepare_for_save(self):
-        pass
\ No newline at end of file
+        pass
+    
+    def cache_fingerprint(self):
+        """Returns everything that determines the model's results, for use as a key in the :py:class:`.EvaluationCache`. This must include the current values of the model parameters.
+        
+        By default, this returns None, which means that the model is never cached. Subclasses whose results depend only on their attributes and parameter values may override this.
+        
+        :returns: fingerprint
+        :rtype: list or None
+        """
+        return None
+    
+    def conditions(self):
+        """Returns the experimental conditions of the model, used by :py:class:`.MeasurementRegistry` to find measurements by their conditions.
+        
+        By default, this returns an empty dict. Subclasses may return, for example, the initial temperature and pressure as {'T':T,'P':P}
+        
+        :returns: conditions
+        :rtype: dict
+        """
+        return {}
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Tools for running the expensive per-measurement calculations of a :py:class:`.Project` in worker processes.
+
+The calculations are submitted to a :py:class:`concurrent.futures.Executor`. Measurements are sent to the workers by pickling them, so :py:func:`.Measurement.prepare_for_save` is called first to erase any Cantera objects. Each worker then builds its own Cantera Solution the first time its copy of the model is reset or evaluated, and returns only the results, which are merged back into the measurements held by the Project.
+
+An exception raised for one measurement is caught and reported without stopping the calculations for the other measurements.
+
+"""
+import io
+import traceback
+from concurrent import futures
+import numpy as np
+
+def get_executor(executor=None,max_workers=None):
+    """Returns the executor that will run a set of calculations
+
+    :key executor: An existing executor. If None, a new :py:class:`concurrent.futures.ProcessPoolExecutor` is created
+    :key max_workers: The number of worker processes of the new executor. If None, the number of processors is used
+    :returns: executor and a flag that is True if the executor was created here and must be shut down by the caller
+    :rtype: tuple
+    """
+    if executor is not None:
+        return executor,False
+    return futures.ProcessPoolExecutor(max_workers=max_workers),True
+
+def run_tasks(function,task_list,executor=None,max_workers=None):
+    """Runs function(*args) for every args in task_list and collects the results
+
+    :param function: The function to run. It must be defined at the top level of a module so that it can be pickled
+    :param task_list: The arguments for each call of function
+    :key executor: The executor, see :py:func:`get_executor`
+    :key max_workers: The number of worker processes, see :py:func:`get_executor`
+    :type task_list: list of tuples
+    :returns: results and errors, both lists in the same order as task_list. If a task failed, its result is None and its error is the formatted traceback; otherwise its error is None
+    :rtype: tuple
+    """
+    executor,owned = get_executor(executor,max_workers)
+
+    results = [None] * len(task_list)
+    errors = [None] * len(task_list)
+    try:
+        future_list = [executor.submit(function,*args) for args in task_list]
+        for task_num,future in enumerate(future_list):
+            try:
+                results[task_num] = future.result()
+            except Exception:
+                errors[task_num] = traceback.format_exc()
+    finally:
+        if owned:
+            executor.shutdown()
+    return results,errors
+
+def run_task_groups(task_groups,group_done,executor=None,max_workers=None,task_done=None):
+    """Runs function(*args) for every (function,args) in several groups of tasks, and calls group_done as soon as all of the tasks in a group have finished
+
+    All of the tasks from all of the groups are submitted to the same executor, whose workers each take the next waiting task as soon as they are free. A group with long tasks therefore does not hold up the others, and the workers stay busy until the last task is finished.
+
+    :param task_groups: The function and arguments of each task, as a list of lists of (function,args) pairs. Each function must be defined at the top level of a module so that it can be pickled
+    :param group_done: Called as group_done(group_number,results,errors) once every task in a group has finished, with results and errors as in :py:func:`run_tasks`
+    :key task_done: If not None, called as task_done(group_number,task_num,result) as soon as each task finishes successfully
+    :key executor: The executor, see :py:func:`get_executor`
+    :key max_workers: The number of worker processes, see :py:func:`get_executor`
+    """
+    executor,owned = get_executor(executor,max_workers)
+
+    results = [[None] * len(task_list) for task_list in task_groups]
+    errors = [[None] * len(task_list) for task_list in task_groups]
+    remaining = [len(task_list) for task_list in task_groups]
+    try:
+        future_ids = {}
+        for group_number,task_list in enumerate(task_groups):
+            if not task_list:
+                group_done(group_number,[],[])
+            for task_num,(function,args) in enumerate(task_list):
+                future_ids[executor.submit(function,*args)] = (group_number,task_num)
+
+        for future in futures.as_completed(future_ids):
+            group_number,task_num = future_ids.pop(future)
+            try:
+                results[group_number][task_num] = future.result()
+                if task_done is not None:
+                    task_done(group_number,task_num,results[group_number][task_num])
+            except Exception:
+                errors[group_number][task_num] = traceback.format_exc()
+            remaining[group_number] -= 1
+            if remaining[group_number] == 0:
+                group_done(group_number,results[group_number],errors[group_number])
+                #Release the results of a finished group
+                results[group_number] = errors[group_number] = None
+    finally:
+        if owned:
+            executor.shutdown()
+    return
+
+def make_response_task(meas,resume=True):
+    """Builds the response surface of one measurement in a worker process
+
+    :param meas: The measurement
+    :key resume: Passed to :py:func:`.Measurement.make_response`
+    :type meas: :py:class:`.Measurement`
+    :returns: The new response surface
+    :rtype: :py:class:`.ResponseSurface`
+    """
+    meas.make_response(resume=resume)
+    return meas.response
+
+class TaskLog(io.StringIO):
+    """An in-memory log file for a task, so that the log can be returned to the main process and written there. It has a name because some models use the name of their log file as a progress bar label."""
+    def __init__(self,name):
+        io.StringIO.__init__(self)
+        self.name = name
+
+def split_parameters(parameter_list,chunk_size=None):
+    """Splits a list of parameters into chunks
+
+    :param parameter_list: The parameters
+    :key chunk_size: The largest number of parameters in each chunk. If None, there is only one chunk
+    :type parameter_list: ndarray(int)
+    :type chunk_size: int
+    :returns: chunks
+    :rtype: list of ndarray(int)
+    """
+    if chunk_size is None or len(parameter_list) == 0:
+        return [parameter_list]
+    return [parameter_list[start:start + chunk_size] for start in range(0,len(parameter_list),chunk_size)]
+
+def sensitivity_task(meas,perturbation,parameter_list):
+    """Evaluates the sensitivity of one measurement to some of its model parameters in a worker process
+
+    :param meas: The measurement
+    :param perturbation: The amount to perturb each parameter
+    :param parameter_list: The parameters to perturb
+    :type meas: :py:class:`.Measurement`
+    :type perturbation: float
+    :type parameter_list: ndarray(int)
+    :returns: The model value, the sensitivity to each parameter in parameter_list, and the text of the log
+    :rtype: tuple
+    """
+    logfile = TaskLog(meas.name + '_sen.out')
+    value,sensitivity_list = meas.model.sensitivity(perturbation=perturbation,
+                                                    parameter_list=parameter_list,
+                                                    logfile=logfile
+                                                   )
+    return value,np.asarray(sensitivity_list,dtype=float),logfile.getvalue()
+
+def response_point_task(meas,parameter_number,direction):
+    """Runs the sensitivity analysis for one point of a measurement's response surface in a worker process
+
+    :param meas: The measurement
+    :param parameter_number: The position in meas.active_parameters of the parameter to perturb, or None for the nominal point
+    :param direction: 1 for the positive perturbation and -1 for the negative perturbation
+    :type meas: :py:class:`.Measurement`
+    :returns: The model value, the sensitivity to each active parameter, and the text of the log
+    :rtype: tuple
+    """
+    logfile = TaskLog(meas.name + '_resp.journal')
+    value,sensitivity_list = meas.evaluate_response_point(parameter_number,direction,logfile)
+    return value,np.asarray(sensitivity_list,dtype=float),logfile.getvalue()
@@ -0,0 +1,241 @@
+"""A columnar, immutable table of the parameters of a model.
+
+:py:func:`.Model.get_model_parameter_info` describes each model parameter. Rather than a list of dicts, the description is held as one array per field: an integer code for the parameter type, the reaction number, the base value, the low-pressure A-factor, and the name. Filtering by type and looking up the values of many parameters are then array operations, and a table can be shared by every model built from the same chemistry model.
+
+Indexing a table with a single parameter number still returns a dict with the keys parameter_name, parameter_value, and, where they apply, parameter_type, reaction_number, parameter_low and species, so code written for the list of dicts keeps working.
+
+Tables are deduplicated: :py:func:`ParameterTable.shared` returns an existing table with the same contents if there is one in the process, and a table that is unpickled is replaced by such a table, so the measurements of a loaded project hold one table between them.
+
+"""
+import sys
+import hashlib
+import weakref
+import numpy as np
+
+#: The parameter types of the Cantera chemistry models. The code of each type is its position in this tuple
+PARAMETER_TYPES = ('A_factor','Energy','High_pressure_A','High_pressure_E','Low_pressure_A','Low_pressure_E','Efficiency')
+
+#The codes of the parameter types, for comparisons without strings
+A_FACTOR,ENERGY,HIGH_PRESSURE_A,HIGH_PRESSURE_E,LOW_PRESSURE_A,LOW_PRESSURE_E,EFFICIENCY = range(len(PARAMETER_TYPES))
+#: The codes of the types that are pre-exponential factors
+A_TYPES = (A_FACTOR,HIGH_PRESSURE_A,LOW_PRESSURE_A)
+#: The codes of the types that are activation energies
+ENERGY_TYPES = (ENERGY,HIGH_PRESSURE_E,LOW_PRESSURE_E)
+#: The codes of the types that belong to one limit of a falloff reaction
+FALLOFF_TYPES = (HIGH_PRESSURE_A,HIGH_PRESSURE_E,LOW_PRESSURE_A,LOW_PRESSURE_E)
+#: The code of a parameter with no type
+NO_TYPE = -1
+
+#The tables in this process, keyed by a hash of their contents
+_shared_tables = weakref.WeakValueDictionary()
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+class ParameterTable(object):
+    """The parameters of a model, stored by column.
+
+    :param names: The name of each parameter
+    :key types: The type code of each parameter, a position in type_names, or NO_TYPE
+    :key reaction_numbers: The reaction number of each parameter, or -1
+    :key values: The base value of each parameter
+    :key low_values: The low-pressure A-factor of each high-pressure A-factor, or nan
+    :key species: The collision partner of each third-body efficiency, or None
+    :key type_names: The name of each type code. Default :py:data:`PARAMETER_TYPES`
+    :type names: list of str
+    :type types: array_like of ints
+    :type reaction_numbers: array_like of ints
+    :type values: array_like of floats
+    :type low_values: array_like of floats
+    :type species: list
+    :type type_names: tuple of str
+
+    """
+    def __init__(self,names,types=None,reaction_numbers=None,values=None,low_values=None,species=None,type_names=PARAMETER_TYPES):
+        number = len(names)
+        #: The name of each parameter. Names are interned, so equal names in different tables are one string
+        self.names = tuple([sys.intern(str(name)) for name in names])
+        #: The name of each type code
+        self.type_names = tuple(type_names)
+        #: The type code of each parameter
+        self.types = _readonly(np.full(number,NO_TYPE,dtype=np.int8) if types is None else np.array(types,dtype=np.int8))
+        #: The reaction number of each parameter, -1 if it is not a reaction parameter
+        self.reaction_numbers = _readonly(np.full(number,-1,dtype=int) if reaction_numbers is None else np.array(reaction_numbers,dtype=int))
+        #: The base value of each parameter
+        self.values = _readonly(np.full(number,np.nan) if values is None else np.array(values,dtype=float))
+        #: The low-pressure A-factor of each high-pressure A-factor, nan for the other parameters
+        self.low_values = _readonly(np.full(number,np.nan) if low_values is None else np.array(low_values,dtype=float))
+        #: The collision partner of each third-body efficiency, None for the other parameters
+        self.species = tuple([None if name is None else sys.intern(str(name)) for name in species]) if species is not None else (None,)*number
+        self._index = None
+        return
+
+    @classmethod
+    def from_records(cls,records):
+        """Creates a table from a list of dicts in the form returned by :py:func:`.Model.get_model_parameter_info`
+
+        :param records: One dict for each parameter, with at least the parameter_name key
+        :type records: list of dicts
+        :rtype: :py:class:`ParameterTable`
+        """
+        if isinstance(records,ParameterTable):
+            return records
+        type_names = list(PARAMETER_TYPES)
+        types = []
+        for record in records:
+            parameter_type = record.get('parameter_type')
+            if parameter_type is None:
+                types += [NO_TYPE]
+                continue
+            if parameter_type not in type_names:
+                type_names += [parameter_type]
+            types += [type_names.index(parameter_type)]
+        return cls([record['parameter_name'] for record in records],
+                   types=types,
+                   reaction_numbers=[record.get('reaction_number',-1) for record in records],
+                   values=[record.get('parameter_value',np.nan) for record in records],
+                   low_values=[record.get('parameter_low',np.nan) for record in records],
+                   species=[record.get('species') for record in records],
+                   type_names=type_names)
+
+    def shared(self):
+        """Returns a table with the same contents that is shared by everything in this process that asked for one, which is this table if there is no other
+
+        :rtype: :py:class:`ParameterTable`
+        """
+        return _shared_tables.setdefault(self._digest(),self)
+
+    def _digest(self):
+        digest = hashlib.sha256()
+        for column in (self.types,self.reaction_numbers,self.values,self.low_values):
+            digest.update(column.tobytes())
+        digest.update(repr((self.names,self.species,self.type_names)).encode())
+        return digest.hexdigest()
+
+    def _columns(self):
+        return (self.names,self.types,self.reaction_numbers,self.values,self.low_values,self.species,self.type_names)
+
+    def __reduce__(self):
+        return (_unpickle_table,self._columns())
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for parameter_id in range(len(self)):
+            yield self.row(parameter_id)
+
+    def __getitem__(self,key):
+        if isinstance(key,(int,np.integer)):
+            return self.row(key)
+        return self.take(key)
+
+    def row(self,parameter_id):
+        """Returns the description of one parameter as a dict, in the form returned by :py:func:`.Model.get_model_parameter_info`
+
+        :param parameter_id: The parameter number
+        :type parameter_id: int
+        :rtype: dict
+        """
+        record = {'parameter_name':self.names[parameter_id],
+                  'parameter_value':float(self.values[parameter_id])}
+        code = self.types[parameter_id]
+        if code != NO_TYPE:
+            record['parameter_type'] = self.type_names[code]
+        if self.reaction_numbers[parameter_id] >= 0:
+            record['reaction_number'] = int(self.reaction_numbers[parameter_id])
+        if not np.isnan(self.low_values[parameter_id]):
+            record['parameter_low'] = float(self.low_values[parameter_id])
+        if self.species[parameter_id] is not None:
+            record['species'] = self.species[parameter_id]
+        return record
+
+    def take(self,indices):
+        """Returns a table of some of the parameters
+
+        :param indices: The parameter numbers, a slice, or a boolean mask
+        :type indices: array_like
+        :rtype: :py:class:`ParameterTable`
+        """
+        positions = np.arange(len(self))[indices]
+        return ParameterTable([self.names[position] for position in positions],
+                              types=self.types[positions],
+                              reaction_numbers=self.reaction_numbers[positions],
+                              values=self.values[positions],
+                              low_values=self.low_values[positions],
+                              species=[self.species[position] for position in positions],
+                              type_names=self.type_names)
+
+    def names_of(self,indices):
+        """Returns the names of some of the parameters
+
+        :param indices: The parameter numbers
+        :type indices: array_like of ints
+        :rtype: list of str
+        """
+        return [self.names[index] for index in np.atleast_1d(indices)]
+
+    def index(self,name):
+        """Returns the parameter number of the parameter with a given name
+
+        :param name: The parameter name
+        :type name: str
+        :rtype: int
+        """
+        if self._index is None:
+            self._index = {}
+            for parameter_id,parameter_name in enumerate(self.names):
+                self._index.setdefault(parameter_name,parameter_id)
+        return self._index[name]
+
+    def type_mask(self,*type_codes):
+        """Returns whether each parameter has one of the given types
+
+        :param type_codes: Type codes, such as :py:data:`A_FACTOR`, or type names, such as 'A_factor'
+        :returns: mask
+        :rtype: ndarray(bool)
+        """
+        codes = [self.type_names.index(code) if isinstance(code,str) else code for code in type_codes
+                 if not isinstance(code,str) or code in self.type_names]
+        return np.isin(self.types,codes)
+
+    def filter_mask(self,no_efficiencies=False,no_energy=False,no_falloff=False):
+        """Returns whether each parameter is kept when some kinds of parameters are not considered
+
+        :key no_efficiencies: If True, drop the third-body efficiencies
+        :key no_energy: If True, drop the activation energies
+        :key no_falloff: If True, drop the low-pressure A-factors and the activation energies of falloff reactions, which are perturbed with the high-pressure A-factor
+        :rtype: ndarray(bool)
+        """
+        dropped = []
+        if no_efficiencies:
+            dropped += [EFFICIENCY]
+        if no_energy:
+            dropped += list(ENERGY_TYPES)
+        if no_falloff:
+            dropped += [LOW_PRESSURE_A,LOW_PRESSURE_E,HIGH_PRESSURE_E]
+        return ~self.type_mask(*dropped)
+
+    def select(self,no_efficiencies=False,no_energy=False,no_falloff=False):
+        """Returns a table of the parameters kept by :py:func:`filter_mask`
+
+        :rtype: :py:class:`ParameterTable`
+        """
+        return self.take(self.filter_mask(no_efficiencies=no_efficiencies,no_energy=no_energy,no_falloff=no_falloff))
+
+def _unpickle_table(*columns):
+    names,types,reaction_numbers,values,low_values,species,type_names = columns
+    return ParameterTable(names,types=types,reaction_numbers=reaction_numbers,values=values,
+                          low_values=low_values,species=species,type_names=type_names).shared()
+
+def as_parameter_table(parameter_info):
+    """Returns model parameter information as a :py:class:`ParameterTable`, converting a list of dicts if necessary
+
+    :param parameter_info: The model parameter information
+    :type parameter_info: :py:class:`ParameterTable` or list of dicts
+    :rtype: :py:class:`ParameterTable`
+    """
+    if parameter_info is None or isinstance(parameter_info,ParameterTable):
+        return parameter_info
+    return ParameterTable.from_records(list(parameter_info)).shared()
@@ -0,0 +1,96 @@
+import numpy as np
+
+class ParameterProjection(object):
+    """Maps a measurement's active parameters into a Project's active parameter list.
+
+    A measurement's response surface is defined over the measurement's own active parameters, while the Project's solution is defined over the Project's active parameters. The two lists are normally the same, but a measurement may lack some of the Project's parameters (if its model has fewer parameters) or have parameters that the Project does not. This class holds the integer index arrays that move vectors and matrices between the two spaces without building dense vectors over every parameter in the model.
+
+    Measurement parameters that are not active in the Project are treated as fixed at zero, and Project parameters that are not active in the measurement have zero gradient.
+
+    :param measurement_parameters: The active parameters of the measurement
+    :param project_parameters: The active parameters of the Project
+    :type measurement_parameters: ndarray(int)
+    :type project_parameters: ndarray(int)
+
+    """
+    def __init__(self,measurement_parameters,project_parameters):
+        self.measurement_parameters = np.array(measurement_parameters,dtype=int)
+        self.project_parameters = np.array(project_parameters,dtype=int)
+
+        number_project = len(self.project_parameters)
+
+        #Sort the Project parameters once so that each measurement parameter can be found by bisection
+        sort_order = np.argsort(self.project_parameters,kind='mergesort')
+        sorted_parameters = self.project_parameters[sort_order]
+        position = np.searchsorted(sorted_parameters,self.measurement_parameters)
+        position = np.minimum(position,max(number_project - 1,0))
+        if number_project > 0:
+            found = sorted_parameters[position] == self.measurement_parameters
+        else:
+            found = np.zeros(len(self.measurement_parameters),dtype=bool)
+
+        #: For each measurement parameter, its position in the Project list, or len(project_parameters) if it is not active in the Project
+        self.index = np.full(len(self.measurement_parameters),number_project,dtype=int)
+        self.index[found] = sort_order[position[found]]
+
+        #: The positions in the measurement list of the parameters that are shared with the Project
+        self.local = np.nonzero(found)[0]
+        #: The positions in the Project list of the parameters that are shared with the measurement
+        self.project = self.index[found]
+
+        self.number_local = len(self.measurement_parameters)
+        self.number_project = number_project
+        return
+
+    def matches(self,measurement_parameters,project_parameters):
+        """Checks whether this projection was built for a given pair of parameter lists
+
+        :returns: True if the projection is still valid
+        :rtype: bool
+        """
+        return (np.array_equal(measurement_parameters,self.measurement_parameters) and
+                np.array_equal(project_parameters,self.project_parameters))
+
+    def gather(self,x):
+        """Takes a vector over the Project parameters and returns the corresponding vector over the measurement parameters
+
+        :param x: A vector over the Project parameters
+        :type x: ndarray(float), len(project_parameters)
+        :rtype: ndarray(float), len(measurement_parameters)
+        """
+        x_local = np.zeros(self.number_local)
+        x_local[self.local] = x[self.project]
+        return x_local
+
+    def gather_matrix(self,cov):
+        """Takes a matrix over the Project parameters and returns the corresponding matrix over the measurement parameters
+
+        :param cov: A matrix over the Project parameters
+        :type cov: ndarray(float), len(project_parameters)xlen(project_parameters)
+        :rtype: ndarray(float), len(measurement_parameters)xlen(measurement_parameters)
+        """
+        cov_local = np.zeros((self.number_local,self.number_local))
+        cov_local[np.ix_(self.local,self.local)] = cov[np.ix_(self.project,self.project)]
+        return cov_local
+
+    def scatter(self,v_local):
+        """Takes a vector over the measurement parameters and returns the corresponding vector over the Project parameters
+
+        :param v_local: A vector over the measurement parameters
+        :type v_local: ndarray(float), len(measurement_parameters)
+        :rtype: ndarray(float), len(project_parameters)
+        """
+        v = np.zeros(self.number_project)
+        v[self.project] = v_local[self.local]
+        return v
+
+    def scatter_matrix(self,m_local):
+        """Takes a matrix over the measurement parameters and returns the corresponding matrix over the Project parameters
+
+        :param m_local: A matrix over the measurement parameters
+        :type m_local: ndarray(float), len(measurement_parameters)xlen(measurement_parameters)
+        :rtype: ndarray(float), len(project_parameters)xlen(project_parameters)
+        """
+        m = np.zeros((self.number_project,self.number_project))
+        m[np.ix_(self.project,self.project)] = m_local[np.ix_(self.local,self.local)]
+        return m
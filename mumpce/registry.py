@@ -0,0 +1,161 @@
+import numpy as np
+
+class MeasurementRegistry(object):
+    """An index of the measurements held by a :py:class:`.Project`.
+
+    The registry holds the measurements of the measurement list, the application list, the removed list, and the low information list, in that order, together with a map from each name to its measurement and an index by status ('Active', 'Application', 'Inconsistent' or 'Low Information'). :py:class:`.Project` updates the registry as measurements are added or moved from one list to another, so that looking up a measurement by position or by name takes constant time. If one of the lists is replaced or changes length in some other way, the registry is rebuilt the next time it is used.
+
+    The indexes by model type and by experimental conditions need the model of every measurement, so they are only built the first time that they are queried, and are dropped whenever a measurement is added or moved.
+
+    """
+    #: The lists of measurements held by a Project, in the order of Project.items
+    list_names = ['measurement_list','application_list','removed_list','low_information']
+
+    def __init__(self):
+        #: The measurements in every list, in order
+        self.items = []
+        #: A map from each name to its measurement. If two measurements have the same name, the later one is kept
+        self.names = {}
+        #: A map from each status to the measurements with that status
+        self.by_status = {}
+        #The status of each measurement when it was indexed, keyed by id
+        self._status_of = {}
+
+        #The number of measurements in each list, and the identity and length of each list when the registry was last updated
+        self._lengths = [0] * len(self.list_names)
+        self._signature = None
+
+        self._types = None
+        self._conditions = {}
+        return
+
+    @staticmethod
+    def _list_signature(lists):
+        return tuple([(id(meas_list),len(meas_list)) if meas_list is not None else None for meas_list in lists])
+
+    def is_current(self,lists):
+        """Checks whether the registry still describes a Project's lists
+
+        :param lists: The measurement list, application list, removed list, and low information list
+        :type lists: list of lists
+        :rtype: bool
+        """
+        return self._signature == self._list_signature(lists)
+
+    def rebuild(self,lists):
+        """Builds the registry from a Project's lists
+
+        :param lists: The measurement list, application list, removed list, and low information list
+        :type lists: list of lists
+        """
+        self.items = []
+        self._lengths = []
+        for meas_list in lists:
+            if meas_list is None:
+                meas_list = []
+            self.items += meas_list
+            self._lengths += [len(meas_list)]
+
+        self.names = {}
+        self.by_status = {}
+        self._status_of = {}
+        for meas in self.items:
+            self.names[meas.name] = meas
+            self.by_status.setdefault(meas._status,[]).append(meas)
+            self._status_of[id(meas)] = meas._status
+
+        self._signature = self._list_signature(lists)
+        self._drop_indexes()
+        return
+
+    def move(self,meas,lists,new_list,old_list=None,old_index=None):
+        """Records that a measurement was appended to the end of one of the Project's lists, after being taken out of another list
+
+        The registry must have been current before the measurement was moved.
+
+        :param meas: The measurement
+        :param lists: The Project's lists, after the move
+        :param new_list: The position in :py:attr:`list_names` of the list that the measurement was appended to
+        :key old_list: The position in :py:attr:`list_names` of the list that the measurement was taken out of, or None if it is new to the Project
+        :key old_index: The position of the measurement in its old list
+        :type lists: list of lists
+        :type new_list: int
+        :type old_list: int
+        :type old_index: int
+        """
+        if old_list is not None:
+            del self.items[sum(self._lengths[:old_list]) + old_index]
+            self._lengths[old_list] -= 1
+            old_status = self._status_of.pop(id(meas))
+            self.by_status[old_status] = [item for item in self.by_status[old_status] if item is not meas]
+        self._lengths[new_list] += 1
+        self.items.insert(sum(self._lengths[:new_list + 1]) - 1,meas)
+        self.by_status.setdefault(meas._status,[]).append(meas)
+        self._status_of[id(meas)] = meas._status
+
+        #Keep the last measurement in the list order if the name is not unique
+        same_name = self.names.get(meas.name)
+        if same_name is None or same_name is meas:
+            self.names[meas.name] = meas
+        else:
+            self.names[meas.name] = [item for item in self.items if item.name == meas.name][-1]
+
+        self._signature = self._list_signature(lists)
+        self._drop_indexes()
+        return
+
+    def _drop_indexes(self):
+        self._types = None
+        self._conditions = {}
+        return
+
+    def with_status(self,status):
+        """Returns the measurements with a status
+
+        :param status: 'Active', 'Application', 'Inconsistent' or 'Low Information'
+        :type status: str
+        :rtype: list of :py:class:`.Measurement`
+        """
+        return list(self.by_status.get(status,[]))
+
+    def of_type(self,model_type):
+        """Returns the measurements whose model is of one type
+
+        :param model_type: The name of the model class, such as 'FlameSpeed'
+        :type model_type: str
+        :rtype: list of :py:class:`.Measurement`
+        """
+        if self._types is None:
+            self._types = {}
+            for meas in self.items:
+                self._types.setdefault(type(meas.model).__name__,[]).append(meas)
+        return list(self._types.get(model_type,[]))
+
+    def in_range(self,condition,low=None,high=None):
+        """Returns the measurements whose models have an experimental condition within a range
+
+        The conditions of each model are given by :py:func:`.Model.conditions`. Measurements whose models do not report the condition are never returned.
+
+        :param condition: The name of the condition, such as 'T' or 'P'
+        :key low: The smallest value of the condition, or None for no lower limit
+        :key high: The largest value of the condition, or None for no upper limit
+        :type condition: str
+        :type low: float
+        :type high: float
+        :returns: The measurements, in order of increasing value of the condition
+        :rtype: list of :py:class:`.Measurement`
+        """
+        if condition not in self._conditions:
+            entries = []
+            for position,meas in enumerate(self.items):
+                conditions = getattr(meas.model,'conditions',None)
+                value = conditions().get(condition) if conditions is not None else None
+                if value is not None:
+                    entries += [(float(value),position,meas)]
+            entries.sort(key=lambda entry: entry[:2])
+            self._conditions[condition] = (np.array([entry[0] for entry in entries]),[entry[2] for entry in entries])
+        values,measurements = self._conditions[condition]
+
+        start = 0 if low is None else np.searchsorted(values,low,side='left')
+        stop = len(values) if high is None else np.searchsorted(values,high,side='right')
+        return measurements[start:stop]
@@ -0,0 +1,366 @@
+import numpy as np
+from surface_store import StoredResponseSurface
+
+class ResponseStack(object):
+    """A compiled representation of the response surfaces of a list of measurements.
+
+    The response surfaces :math:`y_i = z_i + a_i^{\\text{T}}x + x^{\\text{T}}b_ix` of all of the measurements are stacked into padded arrays so that the values, gradients, and uncertainties of every response surface can be computed with a few batched NumPy operations instead of a Python loop over the measurements.
+
+    Each measurement has its own list of active parameters, which may differ from the Project's list. The stack holds an integer index array, taken from each measurement's :py:class:`.ParameterProjection`, that maps each of the measurement's active parameters onto a position in the Project's active parameter list. Parameters that are not active for the Project are mapped onto an extra placeholder position that always holds zero, which reproduces the behavior of evaluating the response surface with those parameters fixed at their nominal values.
+
+    The second order terms are worked on in blocks of rows of at most block_bytes bytes. If every response surface is a :py:class:`.StoredResponseSurface` from the same :py:class:`.ResponseSurfaceStore`, the second order terms are not copied into the stack, and each block is read from the store when it is needed.
+
+    :param measurement_list: The measurements whose response surfaces will be stacked
+    :param active_parameters: The active parameters of the Project
+    :type measurement_list: list of :py:class:`.Measurement`
+    :type active_parameters: ndarray(int)
+
+    """
+    #: The largest size in bytes of a block of second order terms
+    block_bytes = 2**26
+
+    def __init__(self,measurement_list,active_parameters):
+
+        self.measurements = list(measurement_list)
+        self.responses = [meas.response for meas in self.measurements]
+        self.active_parameters = np.array(active_parameters,dtype=int)
+
+        num_params = len(self.active_parameters)
+        num_expts = len(self.measurements)
+
+        self.num_params = num_params #: The number of Project active parameters, :math:`P`
+        self.num_expts = num_expts #: The number of stacked response surfaces
+
+        pad_size = max([len(meas.active_parameters) for meas in self.measurements] + [0])
+        self.pad_size = pad_size #: The padded length :math:`K` of each measurement's parameter list
+
+        #: The placeholder-padded index arrays, shape (N,K), into the Project active parameter list
+        self.index = np.full((num_expts,pad_size),num_params,dtype=int)
+        #: The zero order terms, shape (N,)
+        self.z = np.zeros(num_expts)
+        #: The first order terms, shape (N,K)
+        self.a = np.zeros((num_expts,pad_size))
+        #: The second order terms, shape (N,K,K), or None if no response surface has second order terms or if they are read from a store
+        self.b = None
+        #The store that the second order terms are read from, and the row of the store for each row of the stack
+        self._b_store = None
+        self._b_rows = None
+
+        #: The measured values, shape (N,). Measurements without a value (such as applications) are given nan
+        self.value = np.full(num_expts,np.nan)
+        #: The measurement uncertainties, shape (N,). Measurements without an uncertainty are given nan
+        self.uncertainty = np.full(num_expts,np.nan)
+
+        has_b = any([response.b is not None for response in self.responses])
+        #: Whether any response surface has second order terms
+        self.has_second_order = has_b
+        if has_b:
+            store = self._common_store()
+            if store is not None:
+                self._b_store = store
+                self._b_rows = np.array([response.row for response in self.responses],dtype=int)
+            else:
+                self.b = np.zeros((num_expts,pad_size,pad_size))
+
+        for exp_num,(meas,response) in enumerate(zip(self.measurements,self.responses)):
+            number_active = len(meas.active_parameters)
+            self.index[exp_num,:number_active] = meas.get_projection(self.active_parameters).index
+            self.z[exp_num] = float(response.z)
+            self.a[exp_num,:number_active] = response.a
+            if self.b is not None and response.b is not None:
+                self.b[exp_num,:number_active,:number_active] = response.b
+        self.read_measurements()
+
+        self._rows = np.arange(num_expts)[:,None]
+        self._block_rows = max(1,self.block_bytes // (8 * max(pad_size,1)**2))
+
+        #When every measurement uses the same parameters, matrices can be gathered once and broadcast
+        self._uniform = num_expts > 0 and bool((self.index == self.index[0]).all())
+        self._scales = None
+        return
+
+    def _common_store(self):
+        """Returns the store that holds every response surface in the stack, or None if there is no such store"""
+        stores = set([id(getattr(response,'store',None)) for response in self.responses])
+        if len(stores) != 1 or not isinstance(self.responses[0],StoredResponseSurface):
+            return None
+        return self.responses[0].store
+
+    def _row_blocks(self):
+        """Yields slices that split the rows of the stack into blocks"""
+        for start in range(0,self.num_expts,self._block_rows):
+            yield slice(start,min(start + self._block_rows,self.num_expts))
+
+    def _second_order_blocks(self):
+        """Yields each block of rows and its second order terms, shape (rows,K,K). Yields nothing if there are no second order terms"""
+        if not self.has_second_order:
+            return
+        for rows in self._row_blocks():
+            yield rows,self._second_order_local(rows)
+
+    def _second_order_local(self,rows):
+        """Returns the padded second order terms of some rows, shape (rows,K,K)"""
+        if self.b is not None:
+            return self.b[rows]
+        return self._b_store.second_order_rows(self._b_rows[rows],self.pad_size)
+
+    def read_measurements(self):
+        """Copies the measured values and uncertainties of the measurements into the stack
+
+        The values and uncertainties can be changed without changing the response surfaces, so they are read again each time the stack is used for a new calculation. This takes one pass over the measurements.
+        """
+        for exp_num,meas in enumerate(self.measurements):
+            self.value[exp_num] = np.nan if meas.value is None else meas.value
+            self.uncertainty[exp_num] = np.nan if meas.uncertainty is None else meas.uncertainty
+        return
+
+    def is_current(self,measurement_list,active_parameters):
+        """Checks whether this stack still describes a list of measurements
+
+        The response surfaces are compared by the contents of their terms, so a response surface whose arrays were changed in place is detected. Second order terms that are read from a store when they are needed are not compared.
+
+        :param measurement_list: The measurements to be checked
+        :param active_parameters: The Project's active parameters
+        :returns: True if the measurements, their response surfaces and the active parameters are all unchanged since the stack was built
+        :rtype: bool
+        """
+        if len(measurement_list) != self.num_expts:
+            return False
+        if not np.array_equal(active_parameters,self.active_parameters):
+            return False
+        for exp_num,(meas,meas_stack,response) in enumerate(zip(measurement_list,self.measurements,self.responses)):
+            if meas is not meas_stack or meas.response is not response:
+                return False
+            number_active = len(meas.active_parameters)
+            if float(response.z) != self.z[exp_num] or not np.array_equal(response.a,self.a[exp_num,:number_active]):
+                return False
+            if self._b_store is not None:
+                continue
+            if response.b is None:
+                if self.b is not None and self.b[exp_num].any():
+                    return False
+            elif self.b is None or not np.array_equal(response.b,self.b[exp_num,:number_active,:number_active]):
+                return False
+        return True
+
+    def remove(self,exp_num):
+        """Removes one measurement from the stack in place, without rebuilding the other rows
+
+        :param exp_num: The position of the measurement in the stack
+        :type exp_num: int
+        :returns: The removed measurement
+        """
+        meas = self.measurements.pop(exp_num)
+        self.responses.pop(exp_num)
+
+        self.index = np.delete(self.index,exp_num,axis=0)
+        self.z = np.delete(self.z,exp_num)
+        self.a = np.delete(self.a,exp_num,axis=0)
+        if self.b is not None:
+            self.b = np.delete(self.b,exp_num,axis=0)
+        if self._b_rows is not None:
+            self._b_rows = np.delete(self._b_rows,exp_num)
+        self.value = np.delete(self.value,exp_num)
+        self.uncertainty = np.delete(self.uncertainty,exp_num)
+
+        self.num_expts -= 1
+        self._rows = np.arange(self.num_expts)[:,None]
+        return meas
+
+    def _gather(self,x):
+        """Gathers the Project parameter vector into the padded per-measurement layout, shape (N,K)"""
+        x_ext = np.zeros(self.num_params + 1)
+        x_ext[:self.num_params] = x
+        return x_ext[self.index]
+
+    def _scatter(self,local):
+        """Scatters a padded per-measurement array of shape (N,K) into a dense (N,P) array in the Project parameter space"""
+        full = np.zeros((self.num_expts,self.num_params + 1))
+        full[self._rows,self.index] = local
+        return full[:,:self.num_params]
+
+    def evaluate(self,x):
+        """Evaluates every response surface
+
+        :param x: The Project parameter vector
+        :type x: ndarray(float), len(active_parameters)
+        :returns: response_values, shape (N,)
+        :rtype: ndarray(float)
+        """
+        x_local = self._gather(x)
+        response_value = self.z + np.einsum('ni,ni->n',self.a,x_local)
+        for rows,b in self._second_order_blocks():
+            b_times_x = np.matmul(b,x_local[rows,:,None])[:,:,0]
+            response_value[rows] += np.einsum('ni,ni->n',b_times_x,x_local[rows])
+        return response_value
+
+    def evaluate_samples(self,samples):
+        """Evaluates every response surface at many parameter vectors at once
+
+        If every measurement uses the same parameters, the second order terms of all of the response surfaces are applied to all of the samples in one matrix product, between the products :math:`x_jx_k` of each sample and the matching terms of each :math:`b_i`. Otherwise the samples are evaluated in batches small enough that the gathered parameters of each block of rows take up no more than block_bytes bytes.
+
+        :param samples: The Project parameter vectors, one per row
+        :type samples: ndarray(float), shape (S,P)
+        :returns: response_values, shape (S,N)
+        :rtype: ndarray(float)
+        """
+        samples = np.atleast_2d(samples)
+        num_samples = samples.shape[0]
+        samples_ext = np.zeros((num_samples,self.num_params + 1))
+        samples_ext[:,:self.num_params] = samples
+        response_value = np.empty((num_samples,self.num_expts))
+
+        if self._uniform:
+            x_local = samples_ext[:,self.index[0]]
+            response_value[:] = self.z + np.dot(x_local,self.a.T)
+            upper = np.triu_indices(self.pad_size)
+            diagonal = upper[0] == upper[1]
+            products = x_local[:,upper[0]]*x_local[:,upper[1]]
+            for rows,b in self._second_order_blocks():
+                #Off-diagonal terms appear twice in x^T b x
+                terms = b[:,upper[0],upper[1]] + b[:,upper[1],upper[0]]
+                terms[:,diagonal] /= 2
+                response_value[:,rows] += np.dot(products,terms.T)
+            return response_value
+
+        for rows in self._row_blocks():
+            index = self.index[rows]
+            b = self._second_order_local(rows) if self.has_second_order else None
+            sample_rows = max(1,self.block_bytes // (8 * max(index.size,1)))
+            for start in range(0,num_samples,sample_rows):
+                batch = slice(start,min(start + sample_rows,num_samples))
+                x_local = samples_ext[batch][:,index]
+                value = self.z[rows] + np.einsum('snk,nk->sn',x_local,self.a[rows])
+                if b is not None:
+                    x_by_row = x_local.transpose(1,0,2)
+                    value += np.einsum('nsk,nsk->sn',np.matmul(x_by_row,b),x_by_row)
+                response_value[batch,rows] = value
+        return response_value
+
+    def sensitivity(self,x):
+        """Evaluates every response surface and its gradient with respect to the Project parameters
+
+        :param x: The Project parameter vector
+        :type x: ndarray(float), len(active_parameters)
+        :returns: response_values, shape (N,) and response_gradients, shape (N,P)
+        :rtype: tuple
+        """
+        x_local = self._gather(x)
+        response_value = self.z + np.einsum('ni,ni->n',self.a,x_local)
+        response_grad = self.a.copy()
+        for rows,b in self._second_order_blocks():
+            b_times_x = np.matmul(b,x_local[rows,:,None])[:,:,0]
+            response_value[rows] += np.einsum('ni,ni->n',b_times_x,x_local[rows])
+            response_grad[rows] += 2*b_times_x
+        return response_value,self._scatter(response_grad)
+
+    def residuals(self,x):
+        """Computes the weighted residuals :math:`(y_i(x) - y_{i,\\text{exp}})/\\sigma_{i,\\text{exp}}` and their Jacobian
+
+        :param x: The Project parameter vector
+        :type x: ndarray(float), len(active_parameters)
+        :returns: residuals, shape (N,) and jacobian, shape (N,P)
+        :rtype: tuple
+        """
+        response_value,response_grad = self.sensitivity(x)
+        weight = 1/self.uncertainty
+        return (response_value - self.value)*weight,response_grad*weight[:,None]
+
+    def evaluate_uncertainty(self,x,cov):
+        """Evaluates every response surface and its uncertainty
+
+        The uncertainty is :math:`\\sigma_i^2 = a_i^{\\text{T}}\\Sigma a_i + 2\\text{tr}((b_i\\Sigma)^2)`, as in :py:func:`.ResponseSurface.evaluate`
+
+        :param x: The Project parameter vector
+        :param cov: The covariance matrix among the Project parameters
+        :type x: ndarray(float), len(active_parameters)
+        :type cov: ndarray(float), len(active_parameters)xlen(active_parameters)
+        :returns: response_values and response_uncertainties, each shape (N,)
+        :rtype: tuple
+        """
+        response_value = self.evaluate(x)
+
+        cov_ext = np.zeros((self.num_params + 1,self.num_params + 1))
+        cov_ext[:self.num_params,:self.num_params] = cov
+        if self._uniform:
+            cov_local = self._local_covariance(cov_ext,slice(None))
+            variance = np.einsum('ni,ni->n',np.dot(self.a,cov_local),self.a)
+        else:
+            variance = np.zeros(self.num_expts)
+            for rows in self._row_blocks():
+                cov_local = self._local_covariance(cov_ext,rows)
+                variance[rows] = np.einsum('ni,ni->n',np.matmul(cov_local,self.a[rows,:,None])[:,:,0],self.a[rows])
+        for rows,b in self._second_order_blocks():
+            b_times_cov = np.matmul(b,self._local_covariance(cov_ext,rows))
+            variance[rows] += 2*np.einsum('nij,nji->n',b_times_cov,b_times_cov)
+
+        return response_value,np.sqrt(variance)
+
+    def _local_covariance(self,cov_ext,rows):
+        """Gathers the placeholder-extended covariance matrix into the padded layout of some rows, shape (K,K) if every measurement uses the same parameters and (rows,K,K) otherwise"""
+        if self._uniform:
+            return cov_ext[np.ix_(self.index[0],self.index[0])]
+        index = self.index[rows]
+        return cov_ext[index[:,:,None],index[:,None,:]]
+
+    def second_order_terms(self,rows):
+        """Returns the second order terms of some of the response surfaces in the Project parameter space
+
+        :param rows: The positions of the response surfaces in the stack
+        :type rows: ndarray(int) or slice
+        :returns: b_terms, shape (len(rows),P,P)
+        :rtype: ndarray(float)
+        """
+        index = self.index[rows]
+        number_rows = index.shape[0]
+        b_full = np.zeros((number_rows,self.num_params + 1,self.num_params + 1))
+        if self.has_second_order:
+            b_full[np.arange(number_rows)[:,None,None],index[:,:,None],index[:,None,:]] = self._second_order_local(rows)
+        return b_full[:,:self.num_params,:self.num_params]
+
+    def model_uncertainty(self):
+        """Computes the uncertainty of each response surface with respect to the prior parameter uncertainty, :math:`\\sqrt{a_i^{\\text{T}}a_i + 2\\text{tr}(b_i^2)}/2`
+
+        :returns: model_uncertainties, shape (N,)
+        :rtype: ndarray(float)
+        """
+        variance = np.einsum('ni,ni->n',self.a,self.a)
+        for rows,b in self._second_order_blocks():
+            variance[rows] += 2*np.einsum('nij,nji->n',b,b)
+        return np.sqrt(variance)/2
+
+    def is_linear(self,tolerance=1.0e-12):
+        """Checks whether the second order terms of every response surface are negligible
+
+        :key tolerance: The largest allowed ratio between the largest second order term and the largest first order term
+        :type tolerance: float
+        :returns: True if the stacked response surfaces are linear in the parameters
+        :rtype: bool
+        """
+        if not self.has_second_order or self.num_expts == 0 or self.pad_size == 0:
+            return True
+        #The scales are found once, since removing rows can only make the stack more linear
+        if self._scales is None:
+            a_scale = np.abs(self.a).max() if self.a.size > 0 else 0.0
+            b_scale = max([np.abs(b).max() for rows,b in self._second_order_blocks()])
+            self._scales = (a_scale,b_scale)
+        a_scale,b_scale = self._scales
+        return b_scale <= tolerance*max(a_scale,1.0)
+
+    def weighted_hessian(self,weights):
+        """Computes the weighted sum of the response surface Hessians, :math:`\\sum_i w_i \\frac{d^2 y_i}{dx^2} = 2\\sum_i w_i b_i`, in the Project parameter space
+
+        :param weights: The weight of each response surface
+        :type weights: ndarray(float), shape (N,)
+        :returns: hessian
+        :rtype: ndarray(float), shape (P,P)
+        """
+        hessian = np.zeros((self.num_params + 1,self.num_params + 1))
+        for rows,b in self._second_order_blocks():
+            if self._uniform:
+                #Every measurement uses the same parameters, so sum the local Hessians first and scatter once
+                index = self.index[0]
+                hessian[np.ix_(index,index)] += 2*np.tensordot(weights[rows],b,axes=1)
+            else:
+                np.add.at(hessian,(self.index[rows,:,None],self.index[rows,None,:]),2*weights[rows,None,None]*b)
+        return hessian[:self.num_params,:self.num_params]
@@ -0,0 +1,176 @@
+"""Monte Carlo propagation of the parameter uncertainty through the response surfaces.
+
+Parameter vectors are drawn from the constrained model as :math:`x = x_{\\text{opt}} + \\alpha\\xi`, where :math:`\\alpha` is the Cholesky factor in the :py:class:`.Solution` and :math:`\\xi` is a vector of independent standard normal variables, drawn either pseudo-randomly or from a scrambled Sobol sequence. The samples are drawn and evaluated in chunks, and the statistics of each response are gathered chunk by chunk by :py:class:`StreamingStatistics`, so that the samples are never all held in memory.
+
+"""
+import numpy as np
+from scipy import special
+from scipy.stats import qmc
+
+def parameter_samples(solution,num_samples,chunk_size,sobol=False,seed=None):
+    """Yields chunks of parameter vectors drawn from the constrained model
+
+    :param solution: The constrained model
+    :param num_samples: The total number of parameter vectors
+    :param chunk_size: The number of parameter vectors in each chunk. Only the last chunk can be smaller
+    :key sobol: If True, draw the samples from a scrambled Sobol sequence instead of a pseudo-random generator. num_samples and chunk_size should then be powers of 2
+    :key seed: The seed of the random generator or of the scrambling
+    :type solution: :py:class:`.Solution`
+    :type num_samples: int
+    :type chunk_size: int
+    :type sobol: bool
+    :type seed: int
+    :returns: Arrays of parameter vectors, shape (chunk_size,P)
+    :rtype: generator
+    """
+    alpha = solution.alpha
+    num_params = alpha.shape[0]
+    if sobol:
+        sequence = qmc.Sobol(d=num_params,scramble=True,seed=seed)
+    else:
+        generator = np.random.default_rng(seed)
+
+    for start in range(0,num_samples,chunk_size):
+        number = min(chunk_size,num_samples - start)
+        if sobol:
+            normal = special.ndtri(sequence.random(number))
+        else:
+            normal = generator.standard_normal((number,num_params))
+        yield solution.x + np.dot(normal,alpha.T)
+
+class StreamingStatistics(object):
+    """The moments and quantiles of many responses, gathered from chunks of samples.
+
+    The mean and the second, third and fourth central moments are merged exactly from one chunk to the next. The quantiles are estimated from a histogram of each response with num_bins bins. The range of the histogram is set from the first chunk, as its range widened by half on each side, and samples outside of it are counted in an underflow or an overflow bin whose edges are the smallest and largest sample. The error in a quantile is therefore no more than one bin width unless the quantile lies outside of the histogram range.
+
+    :param num_responses: The number of responses
+    :key num_bins: The number of histogram bins for each response
+    :type num_responses: int
+    :type num_bins: int
+
+    """
+    def __init__(self,num_responses,num_bins=1024):
+        self.num_responses = num_responses
+        self.num_bins = num_bins
+
+        self.count = 0 #: The number of samples so far
+        self.mean = np.zeros(num_responses) #: The mean of each response
+        #The sums of the second, third and fourth powers of the deviations from the mean
+        self._m2 = np.zeros(num_responses)
+        self._m3 = np.zeros(num_responses)
+        self._m4 = np.zeros(num_responses)
+        self.minimum = np.full(num_responses,np.inf) #: The smallest sample of each response
+        self.maximum = np.full(num_responses,-np.inf) #: The largest sample of each response
+
+        #The lower edge and the bin width of each histogram, and the counts with an underflow bin first and an overflow bin last
+        self._low = None
+        self._width = None
+        self._counts = np.zeros((num_responses,num_bins + 2),dtype=np.int64)
+        self._work = None
+        return
+
+    def update(self,values):
+        """Adds a chunk of samples
+
+        :param values: The samples, one row per sample and one column per response
+        :type values: ndarray(float), shape (S,N)
+        """
+        number = values.shape[0]
+        if number == 0:
+            return
+        self.minimum = np.minimum(self.minimum,values.min(axis=0))
+        self.maximum = np.maximum(self.maximum,values.max(axis=0))
+
+        #The work arrays are kept from one chunk to the next, since allocating them takes about as long as filling them
+        if self._work is None or self._work[0].shape != values.shape:
+            self._work = (np.empty(values.shape),np.empty(values.shape),np.empty(values.shape,dtype=np.int64))
+        deviation,power,bins = self._work
+
+        #Merge the central moments of the chunk with those of the earlier samples
+        mean = values.mean(axis=0)
+        np.subtract(values,mean,out=deviation)
+        np.multiply(deviation,deviation,out=power)
+        m2 = power.sum(axis=0)
+        m3 = np.einsum('sn,sn->n',power,deviation)
+        m4 = np.einsum('sn,sn->n',power,power)
+
+        count_a = float(self.count)
+        count_b = float(number)
+        count = count_a + count_b
+        delta = mean - self.mean
+        self._m4 += (m4 + delta**4*count_a*count_b*(count_a**2 - count_a*count_b + count_b**2)/count**3
+                     + 6*delta**2*(count_a**2*m2 + count_b**2*self._m2)/count**2
+                     + 4*delta*(count_a*m3 - count_b*self._m3)/count)
+        self._m3 += (m3 + delta**3*count_a*count_b*(count_a - count_b)/count**2
+                     + 3*delta*(count_a*m2 - count_b*self._m2)/count)
+        self._m2 += m2 + delta**2*count_a*count_b/count
+        self.mean += delta*count_b/count
+        self.count += number
+
+        if self._low is None:
+            span = self.maximum - self.minimum
+            #Responses that did not vary get a tiny range around their value
+            span = np.where(span > 0,span,1.0e-12*np.maximum(np.abs(self.maximum),1.0))
+            self._low = self.minimum - span/2
+            self._width = 2*span/self.num_bins
+
+        #Bin 0 is the underflow bin, so the bin of each sample is the integer part of (value - low)/width + 1, limited to the overflow bin
+        np.subtract(values,self._low,out=power)
+        np.divide(power,self._width,out=power)
+        np.add(power,1,out=power)
+        np.maximum(power,0,out=power)
+        np.minimum(power,self.num_bins + 1,out=power)
+        bins[...] = power
+        np.add(bins,(self.num_bins + 2)*np.arange(self.num_responses),out=bins)
+        self._counts += np.bincount(bins.ravel(),minlength=self._counts.size).reshape(self._counts.shape)
+        return
+
+    @property
+    def variance(self):
+        """The sample variance of each response"""
+        return self._m2/max(self.count - 1,1)
+
+    @property
+    def std(self):
+        """The sample standard deviation of each response"""
+        return np.sqrt(self.variance)
+
+    @property
+    def skewness(self):
+        """The skewness of each response, nan if the response did not vary"""
+        with np.errstate(divide='ignore',invalid='ignore'):
+            return np.sqrt(self.count)*self._m3/self._m2**1.5
+
+    @property
+    def kurtosis(self):
+        """The excess kurtosis of each response, nan if the response did not vary"""
+        with np.errstate(divide='ignore',invalid='ignore'):
+            return self.count*self._m4/self._m2**2 - 3
+
+    def quantiles(self,probabilities):
+        """Estimates quantiles of each response from its histogram
+
+        :param probabilities: The probabilities of the quantiles, each between 0 and 1
+        :type probabilities: list of floats
+        :returns: quantiles, shape (N,len(probabilities))
+        :rtype: ndarray(float)
+        """
+        probabilities = np.atleast_1d(probabilities)
+        cumulative = np.cumsum(self._counts,axis=1)
+        responses = np.arange(self.num_responses)
+
+        #The edges of every bin, including the underflow and overflow bins
+        edges = self._low[:,None] + self._width[:,None]*np.arange(-1,self.num_bins + 2)
+        edges[:,0] = np.minimum(self.minimum,self._low)
+        edges[:,-1] = np.maximum(self.maximum,edges[:,-2])
+
+        quantiles = np.empty((self.num_responses,len(probabilities)))
+        for column,probability in enumerate(probabilities):
+            target = probability*self.count
+            #The first bin whose cumulative count reaches the target
+            bins = np.minimum((cumulative < target).sum(axis=1),self.num_bins + 1)
+            before = np.where(bins > 0,cumulative[responses,bins - 1],0)
+            in_bin = self._counts[responses,bins]
+            fraction = np.where(in_bin > 0,(target - before)/np.maximum(in_bin,1),0.0)
+            quantiles[:,column] = edges[responses,bins] + fraction*(edges[responses,bins + 1] - edges[responses,bins])
+        return np.clip(quantiles,self.minimum[:,None],self.maximum[:,None])
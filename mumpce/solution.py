@@ -1,40 +1,171 @@
 import numpy as np
+from scipy import linalg
+
+def prior_factor(initial_covariance):
+    """Computes a square root :math:`W` of the prior precision matrix, :math:`W^{\\text{T}}W = \\Sigma_{\\text{init}}^{-1}`, without inverting the prior covariance matrix
+    
+    :param initial_covariance: The prior parameter covariance, given as one of the following:
+       
+       * A vector of variances, for a diagonal prior. :math:`W` is then diagonal
+       * A covariance matrix. :math:`W = L^{-1}`, where :math:`\\Sigma_{\\text{init}} = LL^{\\text{T}}`, is found by a triangular solve
+       * A list of diagonal blocks, each either a vector of variances or a covariance matrix. :math:`W` is then block diagonal
+    :type initial_covariance: ndarray(float) or list
+    :returns: W, lower triangular
+    :rtype: ndarray(float)
+    """
+    if isinstance(initial_covariance,(list,tuple)):
+        return linalg.block_diag(*[prior_factor(block) for block in initial_covariance])
+    
+    covariance = np.atleast_1d(np.asarray(initial_covariance,dtype=float))
+    if covariance.ndim == 1:
+        return np.diag(1/np.sqrt(covariance))
+    lower = linalg.cholesky(covariance,lower=True)
+    return linalg.solve_triangular(lower,np.eye(len(covariance)),lower=True)
 
 class Solution(object):
     """A top level class for a constrained model with uncertainty
     
+    The prior is stored as cov_i, the prior covariance :math:`\\Sigma_{\\text{init}}`, and alpha_i, a square root of the prior precision with :math:`\\alpha_i^{\\text{T}}\\alpha_i = \\Sigma_{\\text{init}}^{-1}`. Solutions saved by earlier versions stored the prior precision matrix as cov_i and its lower triangular Cholesky factor as alpha_i; these are converted when such a Solution is loaded.
+    
+    The covariance matrix can be given directly or as a factor of the precision matrix, such as the R factor of the QR decomposition of the stacked Jacobian. When a factor is given, the covariance matrix and its Cholesky decomposition are only computed the first time that they are used, and :py:func:`solve`, :py:func:`marginal` and :py:func:`quadratic_form` work from the factor by triangular solves.
+    
     :param solution_x: The solution vector
     :param covariance_x: The covariance matrix among the elements of the solution vector
     :param second_order_x: A structure describing the second order variation in the elements of the solution vector
+    :param initial_x: The initial guess vector
+    :param initial_covariance: The initial covariance, in any of the forms accepted by :py:func:`prior_factor`
+    :param precision_factor: An upper triangular matrix :math:`R` where :math:`\\Sigma^{-1} = R^{\\text{T}}R`, used instead of covariance_x
     :type solution_x: ndarray,float
     :type covariance_x: ndarray,float
     :type second_order_x:
+    :type initial_x: ndarray,float
+    :type initial_covariance: ndarray,float or list
+    :type precision_factor: ndarray,float
     
     """
     def __init__(self,
-                solution_x,covariance_x=None,second_order_x=None,initial_x=None,initial_covariance=None):
+                solution_x,covariance_x=None,second_order_x=None,initial_x=None,initial_covariance=None,precision_factor=None):
         self.x     = solution_x #: The solution vector, :math:`x_{opt}`
-        self.cov   = covariance_x #: The covariance matrix, :math:`\Sigma`
-        self.alpha = np.linalg.cholesky(covariance_x) #: The lower triangular decomposition :math:`\alpha` where :math:`\Sigma = \alpha \alpha^{\text{T}}` 
+        self._set_covariance(covariance_x,precision_factor)
         self.beta  = second_order_x
         
-        self.x_i   = initial_x
-        #"""The initial guess vector :math:`x_{init}` used to start the optimization, if not zero"""
-        self.cov_i = initial_covariance
-        #"""The initial covariance matrix :math:`\Sigma_{init}` used to start the optimization, if not zero"""
-        self.alpha_i = None
+        self.x_i   = initial_x #: The initial guess vector :math:`x_{init}` used to start the optimization, if not zero
+        self.cov_i = initial_covariance #: The prior covariance :math:`\Sigma_{init}`, in the form it was given
+        self.alpha_i = None #: The square root of the prior precision matrix, :math:`\\alpha_i^{\\text{T}}\\alpha_i = \Sigma_{init}^{-1}`, from :py:func:`prior_factor`
         if initial_covariance is not None:
-            self.alpha_i = np.linalg.cholesky(initial_covariance)
+            self.alpha_i = prior_factor(initial_covariance)
         
+        self.solver = None #: The name of the solver that found the solution vector
+        self.iterations = None #: The number of iterations the solver took
+        self.solve_time = None #: The wall-clock time in seconds the solver took
         
         return
     
-    def update(self,new_x=None,new_cov=None):
+    def __setstate__(self,state):
+        #Solutions saved before the factorization was kept hold cov and alpha directly
+        if 'cov' in state:
+            state = dict(state)
+            state['_cov'] = state.pop('cov')
+            state['_alpha'] = state.pop('alpha',None)
+            state['_factor'] = None
+            #They also hold the prior precision matrix as cov_i and its lower Cholesky factor L as alpha_i
+            #The prior covariance is its inverse, and since L L^T is the precision, L^T is a square root of it as prior_factor defines
+            if state.get('alpha_i') is not None:
+                lower = state['alpha_i']
+                state['cov_i'] = linalg.cho_solve((lower,True),np.eye(len(lower)))
+                state['alpha_i'] = lower.T
+        self.__dict__.update(state)
+        return
+    
+    def _set_covariance(self,covariance,factor):
+        self._cov = covariance
+        self._factor = factor
+        self._alpha = None
+        return
+    
+    @property
+    def cov(self):
+        """The covariance matrix, :math:`\\Sigma`"""
+        if self._cov is None and self._factor is not None:
+            factor_inverse = linalg.solve_triangular(self._factor,np.eye(len(self._factor)))
+            self._cov = np.dot(factor_inverse,factor_inverse.T)
+        return self._cov
+    
+    @cov.setter
+    def cov(self,covariance):
+        self._set_covariance(covariance,None)
+    
+    @property
+    def alpha(self):
+        """The lower triangular decomposition :math:`\\alpha` where :math:`\\Sigma = \\alpha \\alpha^{\\text{T}}`"""
+        if self._alpha is None and self.cov is not None:
+            self._alpha = np.linalg.cholesky(self.cov)
+        return self._alpha
+    
+    @alpha.setter
+    def alpha(self,alpha):
+        self._alpha = alpha
+    
+    @property
+    def precision_factor(self):
+        """The upper triangular factor :math:`R` of the precision matrix, :math:`\\Sigma^{-1} = R^{\\text{T}}R`, or None if the covariance matrix was given directly"""
+        return self._factor
+    
+    def solve(self,b):
+        """Solves :math:`\\Sigma^{-1}y = b`, that is, computes :math:`y = \\Sigma b`
+        
+        :param b: The right hand side
+        :type b: ndarray(float), shape (P,) or (P,M)
+        :returns: y, the same shape as b
+        :rtype: ndarray(float)
+        """
+        if self._cov is None and self._factor is not None:
+            y = linalg.solve_triangular(self._factor,b,trans='T')
+            return linalg.solve_triangular(self._factor,y)
+        return np.dot(self.cov,b)
+    
+    def marginal(self,indices):
+        """Returns the covariance matrix among some elements of the solution vector
+        
+        :param indices: The positions of the elements in the solution vector
+        :type indices: int or list of ints
+        :returns: The rows and columns of :math:`\\Sigma` for those elements
+        :rtype: ndarray(float), len(indices) x len(indices)
+        """
+        indices = np.atleast_1d(indices)
+        if self._cov is None and self._factor is not None:
+            #Sigma[i,j] is the dot product of columns i and j of R^-T
+            unit = np.zeros((len(self._factor),len(indices)))
+            unit[indices,np.arange(len(indices))] = 1
+            columns = linalg.solve_triangular(self._factor,unit,trans='T')
+            return np.dot(columns.T,columns)
+        return self.cov[np.ix_(indices,indices)]
+    
+    def quadratic_form(self,v):
+        """Computes :math:`v^{\\text{T}}\\Sigma v`, such as the variance of a linear function of the solution vector
+        
+        :param v: One vector, or one vector per row
+        :type v: ndarray(float), shape (P,) or (M,P)
+        :returns: The quadratic form of each vector
+        :rtype: float or ndarray(float), shape (M,)
+        """
+        v = np.asarray(v,dtype=float)
+        if self._cov is None and self._factor is not None:
+            columns = linalg.solve_triangular(self._factor,v.T,trans='T')
+            return np.sum(columns**2,axis=0)
+        return np.einsum('...i,ij,...j->...',v,self.cov,v)
+    
+    def update(self,new_x=None,new_cov=None,new_factor=None):
         """Updates the solution and covariance in the Solution
+        
+        :key new_x: The new solution vector
+        :key new_cov: The new covariance matrix
+        :key new_factor: The new upper triangular factor of the precision matrix, used instead of new_cov
         """
         if new_x is not None:
             self.x = new_x
-        if new_cov is not None:
-            self.cov = new_cov
-            self.alpha = np.linalg.cholesky(new_cov)
-        return
\ No newline at end of file
+        if new_factor is not None:
+            self._set_covariance(None,new_factor)
+        elif new_cov is not None:
+            self._set_covariance(new_cov,None)
+        return
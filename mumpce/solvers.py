@@ -0,0 +1,90 @@
+"""Solvers for the MUM-PCE optimization problem.
+
+Each solver minimizes the sum of squares of the objective function computed by :py:func:`.Project._obj_fun` and is called as::
+
+   result = solver(obj_fun,x_start,stack)
+
+where obj_fun returns the residual vector :math:`f` and its Jacobian :math:`J`, x_start is the point at which to start the search, and stack is the :py:class:`.ResponseStack` of the measurements. The first rows of :math:`f` are the prior residuals and the remaining rows are the measurement residuals in the same order as the stack. Each solver returns a :py:class:`scipy.optimize.OptimizeResult` with at least the attributes x, success, message, and nit (the number of iterations).
+
+"""
+import numpy as np
+from scipy import optimize as spopt
+
+def linear_solver(obj_fun,x_start,stack=None):
+    """Finds the optimum with a single linear least-squares solve.
+
+    This is exact when every response surface is linear in the parameters, because the Jacobian is then constant and the objective function is :math:`f(x) = f(x_{\\text{start}}) + J(x - x_{\\text{start}})`.
+    """
+    f,df = obj_fun(x_start)
+    step = np.linalg.lstsq(df,-f,rcond=None)[0]
+
+    return spopt.OptimizeResult(x=x_start + step,success=True,nit=1,nfev=1,
+                                message='Linear least-squares solution')
+
+def newton_solver(obj_fun,x_start,stack,gtol=1.0e-10,maxiter=200):
+    """Finds the optimum with a trust-region Newton method using the analytic Hessian of the response surfaces.
+
+    The Hessian of :math:`\\frac{1}{2}f^{\\text{T}}f` is :math:`J^{\\text{T}}J + \\sum_i f_i \\frac{d^2 f_i}{dx^2}`, where the second term is assembled by :py:func:`.ResponseStack.weighted_hessian`. Only the measurement residuals have second derivatives.
+
+    :key gtol: The gradient norm at which the search is considered converged
+    :key maxiter: The maximum number of iterations
+    """
+    num_params = len(x_start)
+    weight = 1/stack.uncertainty
+
+    #Cache the last evaluation because minimize asks for the function, gradient, and Hessian at the same point separately
+    last = {}
+    def evaluate(x):
+        if 'x' not in last or not np.array_equal(last['x'],x):
+            f,df = obj_fun(x)
+            last['x'] = np.array(x)
+            last['f'] = f
+            last['df'] = df
+        return last['f'],last['df']
+
+    def fun(x):
+        f,df = evaluate(x)
+        return 0.5*np.dot(f,f),np.dot(df.T,f)
+
+    def hess(x):
+        f,df = evaluate(x)
+        return np.dot(df.T,df) + stack.weighted_hessian(f[num_params:]*weight)
+
+    return spopt.minimize(fun,x_start,jac=True,hess=hess,method='trust-exact',
+                          options=dict(gtol=gtol,maxiter=maxiter))
+
+def lm_solver(obj_fun,x_start,stack=None):
+    """Finds the optimum with the Levenberg-Marquardt algorithm from :py:func:`scipy.optimize.root`
+    """
+    opt_output = spopt.root(obj_fun,x_start,method='lm',jac=True)
+    #The MINPACK driver reports function evaluations rather than iterations
+    opt_output.nit = opt_output.nfev
+    return opt_output
+
+def auto_solver(obj_fun,x_start,stack):
+    """Chooses a solver based on the response surfaces.
+
+    Uses :py:func:`linear_solver` if all of the second order terms are negligible, otherwise :py:func:`newton_solver`. If the Newton iteration does not converge, finishes with :py:func:`lm_solver` starting from wherever it stopped.
+    """
+    if stack.is_linear():
+        result = linear_solver(obj_fun,x_start,stack)
+        result.solver = 'linear'
+        return result
+
+    result = newton_solver(obj_fun,x_start,stack)
+    result.solver = 'newton'
+    if result.success:
+        return result
+
+    newton_iterations = result.nit
+    result = lm_solver(obj_fun,result.x,stack)
+    result.nit += newton_iterations
+    result.solver = 'newton+lm'
+    return result
+
+#: The solvers that can be selected by name in :py:func:`.Project.run_optimization`
+solvers = {'auto':auto_solver,
+           'linear':linear_solver,
+           'newton':newton_solver,
+           'lm':lm_solver,
+          }
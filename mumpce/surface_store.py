@@ -0,0 +1,202 @@
+"""A memory-mapped store of response surfaces for very large projects.
+
+The terms of every response surface in a :py:class:`.Project` are packed into a few contiguous arrays, one .npy file per term, which are opened as memory maps. The second order terms take up most of the space, :math:`N\\times K^2` numbers for N measurements with K active parameters, and are only read from disk when they are used. Each measurement's response surface becomes a :py:class:`StoredResponseSurface`, which holds no arrays of its own and returns views into the store.
+
+When every measurement in a :py:class:`.ResponseStack` has a stored response surface from the same store, the stack reads the second order terms from the store in blocks of rows instead of copying them into memory, so that :py:func:`.Project.run_optimization`, :py:func:`.Project.validate_solution` and :py:func:`.Project.calculate_entropy` can work on projects whose response surfaces do not fit in memory.
+
+"""
+import os
+import shutil
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from response_surface import ResponseSurface
+
+#The stores that have been opened in this process, keyed by path, so that stored response surfaces that are unpickled share one set of memory maps
+_open_stores = {}
+
+def open_store(path):
+    """Returns the store in path, opening it the first time that it is needed in this process
+
+    :param path: The store directory
+    :type path: str
+    :rtype: :py:class:`ResponseSurfaceStore`
+    """
+    path = os.path.abspath(path)
+    store = _open_stores.get(path)
+    if store is None:
+        store = _open_stores[path] = ResponseSurfaceStore(path)
+    return store
+
+def _stored_surface(path,row):
+    return open_store(path).surface(row)
+
+class ResponseSurfaceStore(object):
+    """The response surfaces of many measurements, stored in memory-mapped arrays on disk.
+
+    Row i of each array holds the terms of response surface i, padded with zeros to the largest number of active parameters K. A new store is written by :py:func:`create`, and an existing store is opened with :py:func:`open_store`.
+
+    :param path: The store directory
+    :type path: str
+
+    """
+    #: The arrays in the store, each saved as <name>.npy
+    array_names = ['z','a','b','d','size','active_parameters','has_b','has_d','has_active']
+
+    def __init__(self,path):
+        self.path = os.path.abspath(path)
+        for name in self.array_names:
+            setattr(self,name,np.load(os.path.join(self.path,name + '.npy'),mmap_mode='r'))
+        self.num_surfaces,self.pad_size = self.a.shape
+        return
+
+    def __len__(self):
+        return self.num_surfaces
+
+    def __reduce__(self):
+        #Only the path is pickled. The store is opened again when it is unpickled
+        return (open_store,(self.path,))
+
+    def surface(self,row):
+        """Returns a stored response surface
+
+        :param row: The position of the response surface in the store
+        :type row: int
+        :rtype: :py:class:`StoredResponseSurface`
+        """
+        return StoredResponseSurface(self,row)
+
+    def second_order_rows(self,rows,size):
+        """Returns the second order terms of some response surfaces
+
+        If the rows are consecutive, as they are unless measurements have been removed from a stack, the result is a view into the memory map, so the terms are only read from disk as they are used. Otherwise the terms are copied into memory.
+
+        :param rows: The positions of the response surfaces in the store
+        :param size: The number of active parameters to keep. It must be no larger than pad_size
+        :type rows: ndarray(int)
+        :type size: int
+        :returns: b_terms, shape (len(rows),size,size)
+        :rtype: ndarray(float)
+        """
+        rows = np.asarray(rows)
+        if len(rows) > 0 and (np.diff(rows) == 1).all():
+            return self.b[rows[0]:rows[-1] + 1,:size,:size]
+        return self.b[rows,:size,:size]
+
+    @classmethod
+    def create(cls,path,responses):
+        """Writes a new store from a list of response surfaces
+
+        The store is written row by row, so the response surfaces can themselves be stored response surfaces from a store that is being replaced. Any existing store in path is replaced once the new store is complete.
+
+        :param path: The store directory
+        :param responses: The response surfaces
+        :type path: str
+        :type responses: list of :py:class:`.ResponseSurface`
+        :returns: The new store, opened for reading
+        :rtype: :py:class:`ResponseSurfaceStore`
+        """
+        path = os.path.abspath(path)
+        num_surfaces = len(responses)
+        pad_size = max([len(np.ravel(response.a)) for response in responses] + [0])
+
+        partial = path + '.partial'
+        if os.path.isdir(partial):
+            shutil.rmtree(partial)
+        os.makedirs(partial)
+
+        shapes = {'z':((num_surfaces,),float),
+                  'a':((num_surfaces,pad_size),float),
+                  'b':((num_surfaces,pad_size,pad_size),float),
+                  'd':((num_surfaces,pad_size,pad_size),float),
+                  'size':((num_surfaces,),int),
+                  'active_parameters':((num_surfaces,pad_size),int),
+                  'has_b':((num_surfaces,),bool),
+                  'has_d':((num_surfaces,),bool),
+                  'has_active':((num_surfaces,),bool),
+                 }
+        arrays = {}
+        for name in cls.array_names:
+            shape,dtype = shapes[name]
+            arrays[name] = open_memmap(os.path.join(partial,name + '.npy'),mode='w+',dtype=dtype,shape=shape)
+
+        for row,response in enumerate(responses):
+            a_terms = np.ravel(response.a)
+            size = len(a_terms)
+            arrays['z'][row] = float(response.z)
+            arrays['a'][row,:size] = a_terms
+            arrays['size'][row] = size
+            for name in ['b','d']:
+                terms = getattr(response,name)
+                arrays['has_' + name][row] = terms is not None
+                if terms is not None:
+                    arrays[name][row,:size,:size] = terms
+            arrays['has_active'][row] = response.active_parameters is not None
+            if response.active_parameters is not None:
+                arrays['active_parameters'][row,:size] = response.active_parameters
+
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        #Files are removed rather than overwritten, so that memory maps of the old store stay valid
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.rename(partial,path)
+
+        store = _open_stores[path] = cls(path)
+        return store
+
+class StoredResponseSurface(ResponseSurface):
+    """A :py:class:`.ResponseSurface` whose terms are views into a :py:class:`ResponseSurfaceStore`.
+
+    The terms are read-only. Pickling a stored response surface only saves the path of the store and its row.
+
+    :param store: The store
+    :param row: The position of the response surface in the store
+    :type store: :py:class:`ResponseSurfaceStore`
+    :type row: int
+
+    """
+    c = None
+
+    def __init__(self,store,row):
+        self.store = store
+        self.row = row
+        return
+
+    def __reduce__(self):
+        return (_stored_surface,(self.store.path,self.row))
+
+    @property
+    def size(self):
+        """The number of active parameters of this response surface"""
+        return int(self.store.size[self.row])
+
+    @property
+    def z(self):
+        return float(self.store.z[self.row])
+
+    @property
+    def a(self):
+        return self.store.a[self.row,:self.size]
+
+    @property
+    def b(self):
+        if not self.store.has_b[self.row]:
+            return None
+        size = self.size
+        return self.store.b[self.row,:size,:size]
+
+    @property
+    def d(self):
+        if not self.store.has_d[self.row]:
+            return None
+        size = self.size
+        return self.store.d[self.row,:size,:size]
+
+    @property
+    def active_parameters(self):
+        if not self.store.has_active[self.row]:
+            return None
+        return self.store.active_parameters[self.row,:self.size]
@@ -4,6 +4,7 @@ sys.path.append('..')
 
 #import mumpce_py as mumpce
 import mumpce
+from mumpce.evaluation_cache import cached_evaluation,cached_sensitivity
 import numpy as np
 import pandas as pd
 
@@ -59,6 +60,7 @@ class toy_model(mumpce.Model):
         """
         return str(self.experiment_number)
     
+    @cached_evaluation
     def evaluate(self):
         """Run the model once and return a single value
         
@@ -85,6 +87,7 @@ class toy_model(mumpce.Model):
         #print value
         return np.exp(value[0])
     
+    @cached_sensitivity
     def sensitivity(self,perturbation=1.0e-3,parameter_list=None,logfile='file',**kwargs):
         """Evaluate the sensitivity of the model value with respect to the model parameters
         
@@ -156,25 +159,36 @@ class toy_model(mumpce.Model):
         self.parameter_vector[parameter_id] = np.log(factor)
         return
     
+    def perturb_parameters(self,parameter_ids,factors):
+        """Perturb several model parameters at once
+        
+        :param parameter_ids: The parameter identifiers whose values to modify
+        :param factors: The amount to change each parameter's value
+        :type parameter_ids: array_like
+        :type factors: array_like
+        """
+        self.parameter_vector[np.asarray(parameter_ids,dtype=int),0] = np.log(factors)
+        return
+    
     def reset_model(self):
         """Reset all model parameters to their original values"""
         self.parameter_vector = np.zeros((7,1))
         return
     
+    def cache_fingerprint(self):
+        """Returns the model class, the experiment number, and the parameter values, which are all that determine the model value
+        """
+        return [type(self).__name__,self.experiment_number,self.parameter_vector]
+    
     def get_model_parameter_info(self):
         """Get information about the parameters, which will go up to the hosting measurement. This is called during instantiation of the model and normally would not be called at any other time. 
 
         :returns: model_parameter_info
-        :rtype: list of dicts
+        :rtype: :py:class:`.ParameterTable`
         """
-        model_parameter_info = []
-        for parameter_number in range(self.number_parameters):
-            param_info = [{'parameter_number':parameter_number,
-                           'parameter_name':'Parameter ' + str(parameter_number+1),
-                           'parameter_value':1.0}]
-            model_parameter_info += param_info
-        #model_parameter_info = np.array(model_parameter_info)
-        return model_parameter_info
+        names = ['Parameter ' + str(parameter_number+1) for parameter_number in range(self.number_parameters)]
+        model_parameter_info = mumpce.ParameterTable(names,values=np.ones(self.number_parameters))
+        return model_parameter_info.shared()
 
 class toy_app(toy_model):
     """An example of a generic model for use with the MUMPCE program.
@@ -185,6 +199,7 @@ class toy_app(toy_model):
     :type experiment_number: int
     :returns: A MUM-PCE model object representing this experiment
     """
+    @cached_evaluation
     def evaluate(self):
         
         zero_term = zeros_app
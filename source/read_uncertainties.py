@@ -1,5 +1,6 @@
 import cantera as ct
 import numpy as np
+import mumpce
 
 def read_uncertainties(uncertainty_file=None,mumpce_cantera_model=None):
     #Read the uncertainty file
@@ -32,23 +33,20 @@ def read_uncertainties(uncertainty_file=None,mumpce_cantera_model=None):
     a_factor_uncertainties[0:31] = np.repeat(1.2,31) #1.2 is the default for the H2 submodel
     a_factor_uncertainties[reaction_numbers] = reaction_uncertainties #Replace defaults with the information from uncertainty_file
     
+    #Get the shared parameter table of the model, so that all parameters are handled at once
+    parameter_table = mumpce.as_parameter_table(mumpce_cantera_model.model_parameter_info)
+    uncertainty = a_factor_uncertainties[parameter_table.reaction_numbers]
+    value = np.abs(parameter_table.values)
+    
     #Create the blank parameter_uncertainties array
-    parameter_uncertainties = np.zeros(len(mumpce_cantera_model.model_parameter_info))
-    
-    #Iterate over all available parameters in the model
-    for param_number,param_info in enumerate(mumpce_cantera_model.model_parameter_info):
-        #Get this parameter's type and corresponding reaction number
-        parameter_type = param_info['parameter_type']
-        reaction_number = param_info['reaction_number']
-        value = np.abs(param_info['parameter_value'])
-        
-        uncertainty = a_factor_uncertainties[reaction_number]
-        if 'A' in parameter_type:
-            #For an A-factor, the uncertainty factor is just the number from uncertainty_file
-            parameter_uncertainties[param_number] = uncertainty
-        if 'E' in parameter_type:
-            #For an activation energy, assume that it contributes the same amount to the uncertainty as the A-factor at 1000 K
-            #This number is arbitrary
-            #value = np.abs(mumpce_cantera_model.get_parameter(param_number))
-            parameter_uncertainties[param_number] = min((value + 1000 * ct.gas_constant * np.log(uncertainty))/value,1.2)
+    parameter_uncertainties = np.zeros(len(parameter_table))
+    
+    #For an A-factor, the uncertainty factor is just the number from uncertainty_file
+    is_A = parameter_table.type_mask('A_factor','High_pressure_A','Low_pressure_A')
+    parameter_uncertainties[is_A] = uncertainty[is_A]
+    
+    #For an activation energy, assume that it contributes the same amount to the uncertainty as the A-factor at 1000 K
+    #This number is arbitrary. Third-body efficiencies are given uncertainties in the same way
+    is_E = parameter_table.type_mask('Energy','High_pressure_E','Low_pressure_E','Efficiency')
+    parameter_uncertainties[is_E] = np.minimum((value[is_E] + 1000 * ct.gas_constant * np.log(uncertainty[is_E]))/value[is_E],1.2)
     return parameter_uncertainties
\ No newline at end of file
@@ -0,0 +1,73 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+import io
+
+import numpy as np
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..')
+sys.path.insert(0,REPO)
+
+import mumpce
+import mumpce.toy as toy
+
+
+def toy_project():
+    """Builds the toy project of the documentation, with its response surfaces"""
+    source = os.path.join(REPO,'source')
+    measurement_list = toy.toy_initialize(os.path.join(source,'mumpce_toy_experiments.xlsx'),None)
+    application_list = toy.toy_initialize(os.path.join(source,'mumpce_toy_apps.xlsx'),None)
+    for meas in measurement_list + application_list:
+        meas.model.loglevel = False
+    project = mumpce.Project(measurement_list=measurement_list,application_list=application_list,
+                             parameter_uncertainties=toy.parameter_uncertainties)
+    project.find_sensitivity()
+    project.find_active_parameters(0.05)
+    project.set_active_parameters()
+    project.make_response()
+    return project
+
+
+class TestResponseStackRefresh(unittest.TestCase):
+    """The compiled response surfaces must follow changes to the measurements between calculations"""
+
+    def setUp(self):
+        #The response surface journals and logs are written to the working directory
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.mkdtemp()
+        os.chdir(self.tmpdir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.project = toy_project()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir)
+
+    def optimize(self,rebuild=False):
+        if rebuild:
+            self.project._stacks = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            x,cov = self.project.run_optimization()
+        return x
+
+    def test_changed_value_and_uncertainty(self):
+        x_old = self.optimize()
+        self.project.measurement_list[0].value = 2.0
+        self.project.measurement_list[0].uncertainty = 0.01
+        x_new = self.optimize()
+        self.assertFalse(np.allclose(x_new,x_old))
+        np.testing.assert_allclose(x_new,self.optimize(rebuild=True))
+
+    def test_response_surface_edited_in_place(self):
+        x_old = self.optimize()
+        self.project.measurement_list[1].response.a[0] += 0.5
+        x_new = self.optimize()
+        self.assertFalse(np.allclose(x_new,x_old))
+        np.testing.assert_allclose(x_new,self.optimize(rebuild=True))
+
+
+if __name__ == '__main__':
+    unittest.main()